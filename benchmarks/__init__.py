@@ -0,0 +1 @@
+"""Benchmarks for the build stages; run from the repo root as `python -m benchmarks.<name>`."""
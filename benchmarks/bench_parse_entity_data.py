@@ -0,0 +1,146 @@
+"""
+bench_parse_entity_data.py
+──────────────────────────
+Compares the compiled-plan parse_entity_data in fetch_data.py against the
+original DictReader + clean_value implementation on a synthetic category.
+Exits 1 if the outputs differ or the compiled plan is the slower of the two.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_parse_entity_data --rows 200000
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import fetch_data
+from benchmarks.synthetic import synthetic_schema, write_synthetic_csv
+
+# ─── Legacy implementation (pre compiled plan), kept for comparison ────────
+
+def legacy_clean_value(value, data_type):
+    if value is None or value == "" or value == "-1":
+        return None
+
+    s = str(value).strip()
+
+    if data_type == "INT":
+        s = s.replace("$", "").replace(",", "")
+        try:
+            return int(float(s))
+        except (ValueError, TypeError):
+            return None
+
+    if data_type == "FLOAT":
+        s = s.replace("$", "").replace(",", "")
+        try:
+            return round(float(s), 6)
+        except (ValueError, TypeError):
+            return None
+
+    if data_type == "CURRENCY":
+        s = s.replace("$", "").replace(",", "")
+        try:
+            return round(float(s), 2)
+        except (ValueError, TypeError):
+            return None
+
+    if data_type == "BOOLEAN":
+        return s.lower() in ("true", "1", "yes")
+
+    return s
+
+
+def legacy_parse_entity_data(csv_path, schema):
+    type_lookup = {}
+    for field in schema:
+        type_lookup[field["attributeKey"]] = field["dataType"]
+
+    name_col = "name"
+    for field in schema:
+        if field["logicType"] == "TARGET":
+            name_col = field["attributeKey"]
+            break
+
+    entities = []
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+
+        id_col = None
+        if reader.fieldnames:
+            for fn in reader.fieldnames:
+                if fn.strip().lower() == "id":
+                    id_col = fn.strip()
+                    break
+
+        for row in reader:
+            entity = {}
+            entity_name = row.get(name_col, "").strip()
+            entity_id = row.get(id_col, "").strip() if id_col else entity_name
+
+            if not entity_id or not entity_name:
+                continue
+
+            entity["id"] = entity_id
+            entity["name"] = entity_name
+
+            skip_cols = {name_col}
+            if id_col:
+                skip_cols.add(id_col)
+            for col, raw_val in row.items():
+                if col in skip_cols:
+                    continue
+                data_type = type_lookup.get(col, "STRING")
+                cleaned = legacy_clean_value(raw_val, data_type)
+                if cleaned is not None:
+                    entity[col] = cleaned
+
+            entities.append(entity)
+
+    return entities
+
+
+# ─── Timing ─────────────────────────────────────────────────────────────────
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    schema = synthetic_schema()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_enriched.csv")
+        write_synthetic_csv(path, args.rows)
+        print(f"Synthetic category: {args.rows:,} rows × {len(schema)} columns")
+
+        legacy_t, legacy = best_of(lambda: legacy_parse_entity_data(path, schema), args.repeat)
+        plan_t, planned = best_of(lambda: fetch_data.parse_entity_data(path, schema), args.repeat)
+
+    if planned != legacy:
+        print("MISMATCH: compiled plan output differs from the legacy parser")
+        sys.exit(1)
+
+    print(f"  legacy DictReader : {legacy_t:7.3f}s  {args.rows / legacy_t:>12,.0f} rows/s")
+    print(f"  compiled plan     : {plan_t:7.3f}s  {args.rows / plan_t:>12,.0f} rows/s")
+    print(f"  speedup           : {legacy_t / plan_t:.2f}×  (outputs identical)")
+    if plan_t > legacy_t:
+        print("REGRESSION: the compiled plan is slower than the legacy parser")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+bench_stream_memory.py
+──────────────────────
+Measures peak RSS of the buffered gameData writer vs fetch_data's --stream
+pipeline on synthetic categories of growing size. Each measurement runs in
+a fresh interpreter so ru_maxrss reflects only that build.
+
+Two more modes hold the whole category in memory, as --watch and the extra
+outputs need, but write it with the streaming writer: "dicts" keeps the
+list of entity dicts, "typed" the EntityTable of --typed. Their difference
+is the cost of the in-memory representation itself.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_stream_memory --rows 10000 50000 200000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import fetch_data
+from benchmarks.synthetic import synthetic_schema, write_synthetic_csv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_child(mode, data_path, out_path, compact):
+    """Build one synthetic category in this process and print its peak RSS."""
+    schema = synthetic_schema()
+    if mode in ("stream", "dicts", "typed"):
+        if mode == "stream":
+            entities = fetch_data.iter_entity_data(data_path, schema)
+        elif mode == "dicts":
+            entities = fetch_data.parse_entity_data(data_path, schema)
+        else:
+            entities = fetch_data.parse_entity_table(data_path, schema)
+        with open(out_path, "w", encoding="utf-8") as f:
+            fetch_data.write_payload_stream(f, {"synthetic": schema}, [("synthetic", entities)], compact)
+    else:
+        payload = {
+            "schemaConfig": {"synthetic": schema},
+            "categories": {"synthetic": fetch_data.parse_entity_data(data_path, schema)},
+        }
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(fetch_data.dump_json(payload, compact))
+    print(json.dumps({"peak_rss_mb": fetch_data.peak_rss_mb(), "bytes": os.path.getsize(out_path)}))
+
+
+def measure(mode, data_path, out_path, compact):
+    cmd = [sys.executable, "-m", __spec__.name, "--child", mode, data_path, out_path]
+    if compact:
+        cmd.append("--compact")
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=ROOT_DIR)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def generate(data_path, rows):
+    # Generated out of process: on Linux a child's ru_maxrss starts from the
+    # parent's RSS at fork time, so the parent must stay small.
+    subprocess.run([sys.executable, "-m", __spec__.name, "--generate", data_path, str(rows)], check=True, cwd=ROOT_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "DATA", "OUT"), help=argparse.SUPPRESS)
+    parser.add_argument("--generate", nargs=2, metavar=("DATA", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child, compact=args.compact)
+        return
+    if args.generate:
+        write_synthetic_csv(args.generate[0], int(args.generate[1]))
+        return
+
+    modes = ("buffered", "stream", "dicts", "typed")
+    print(f"{'rows':>10} {'output MB':>10}" + "".join(f" {m + ' MB':>12}" for m in modes))
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            data_path = os.path.join(tmp, f"synthetic_{rows}.csv")
+            generate(data_path, rows)
+            results = {m: measure(m, data_path, os.path.join(tmp, f"{m}.json"), args.compact) for m in modes}
+            digests = {fetch_data.file_digest(os.path.join(tmp, f"{m}.json")) for m in modes}
+            print(
+                f"{rows:>10,} {results['buffered']['bytes'] / 1e6:>10.1f}"
+                + "".join(f" {results[m]['peak_rss_mb']:>12.1f}" for m in modes)
+                + ("" if len(digests) == 1 else "   OUTPUT MISMATCH")
+            )
+
+
+if __name__ == "__main__":
+    main()
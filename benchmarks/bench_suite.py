@@ -0,0 +1,217 @@
+"""
+bench_suite.py
+──────────────
+Times every build stage on synthetic categories of growing size and checks
+the results against a saved baseline:
+
+  parse_schema_config   schema CSV → SchemaField list
+  parse_entity_data     enriched CSV → entities (compiled parse plan)
+  clean_value           per-cell cleaner, timed on up to 100k rows
+  categorize            categorize_countries COUNTRY_BINS on a DataFrame
+  dump_json             gameData serialisation, indent=2
+  dump_json_compact     gameData serialisation, compact separators
+
+Each stage reports the best of --repeat runs. --save writes the results as
+a JSON baseline; --baseline compares against one and exits 1 if any stage
+is slower than baseline × (1 + --threshold) and by more than 10 ms.
+Baselines are only comparable on the machine that recorded them.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_suite --sizes 1k 10k 100k --save benchmarks/baseline.json
+    python -m benchmarks.bench_suite --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --sizes 1m --repeat 1
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import fetch_data
+from benchmarks.bench_parse_entity_data import best_of
+from benchmarks.synthetic import SHAPES, write_category
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SIZES = ["1k", "10k", "100k"]
+DEFAULT_THRESHOLD = 0.25
+MIN_DELTA_S = 0.01  # slowdowns below this are timer noise, whatever the ratio
+CLEAN_VALUE_ROWS = 100_000
+SCHEMA_LOOPS = 200
+
+
+def parse_size(text):
+    """'10k' → 10000, '1m' → 1000000, '2500' → 2500."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+# ─── Stages ────────────────────────────────────────────────────────────────
+
+def read_cells(data_path, schema, limit):
+    """(raw, data_type) for every cell of the first `limit` rows."""
+    types = {field["attributeKey"]: field["dataType"] for field in schema}
+    with open(data_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header_types = [types.get(col, "STRING") for col in next(reader)]
+        cells = []
+        for i, row in enumerate(reader):
+            if i >= limit:
+                break
+            cells.extend(zip(row, header_types))
+    return cells
+
+
+def clean_cells(cells):
+    clean_value = fetch_data.clean_value
+    for raw, data_type in cells:
+        clean_value(raw, data_type)
+
+
+def load_categorize():
+    """categorize() + COUNTRY_BINS, or None when pandas is not installed."""
+    try:
+        import pandas as pd
+        from data.binning import categorize
+        from data.categorize_countries import COUNTRY_BINS
+    except ImportError:
+        return None
+    return pd, lambda df: categorize(df, COUNTRY_BINS)
+
+
+def run_size(rows, shape, repeat, tmp):
+    """Time every stage on one synthetic category; returns {stage: result}."""
+    schema_path, data_path = write_category(tmp, shape, rows)
+    results = {}
+
+    def record(stage, seconds, units, unit="rows"):
+        results[stage] = {"seconds": seconds, unit: units, f"{unit}_per_s": units / seconds if seconds else 0.0}
+
+    t, schema = best_of(lambda: [fetch_data.parse_schema_config(schema_path) for _ in range(SCHEMA_LOOPS)], repeat)
+    schema = schema[0]
+    record("parse_schema_config", t / SCHEMA_LOOPS, 1, "calls")
+
+    t, entities = best_of(lambda: fetch_data.parse_entity_data(data_path, schema), repeat)
+    record("parse_entity_data", t, rows)
+
+    cells = read_cells(data_path, schema, CLEAN_VALUE_ROWS)
+    t, _ = best_of(lambda: clean_cells(cells), repeat)
+    record("clean_value", t, len(cells), "cells")
+    del cells
+
+    categorizer = load_categorize() if shape == "countries" else None
+    if categorizer:
+        pd, categorize = categorizer
+        df = pd.read_csv(data_path)
+        t, _ = best_of(lambda: categorize(df), repeat)
+        record("categorize", t, rows)
+        del df
+
+    payload = {"schemaConfig": {shape: schema}, "categories": {shape: entities}}
+    t, text = best_of(lambda: fetch_data.dump_json(payload), repeat)
+    record("dump_json", t, rows)
+    results["dump_json"]["bytes"] = len(text.encode("utf-8"))
+    t, text = best_of(lambda: fetch_data.dump_json(payload, compact=True), repeat)
+    record("dump_json_compact", t, rows)
+    results["dump_json_compact"]["bytes"] = len(text.encode("utf-8"))
+
+    os.remove(data_path)
+    return results
+
+
+# ─── Baselines ─────────────────────────────────────────────────────────────
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Rows of (key, base_s, now_s, ratio, regressed) for stages in both runs."""
+    rows = []
+    for key, now in results.items():
+        base = baseline.get("results", {}).get(key)
+        if not base or not base["seconds"]:
+            continue
+        ratio = now["seconds"] / base["seconds"]
+        regressed = ratio > 1 + threshold and now["seconds"] - base["seconds"] > MIN_DELTA_S
+        rows.append((key, base["seconds"], now["seconds"], ratio, regressed))
+    return rows
+
+
+def print_results(results):
+    print(f"\n  {'stage@size':<32s} {'seconds':>10s} {'throughput':>18s}")
+    for key, r in results.items():
+        unit = "cells" if "cells" in r else "calls" if "calls" in r else "rows"
+        print(f"  {key:<32s} {r['seconds']:>10.4f} {r[f'{unit}_per_s']:>12,.0f} {unit}/s")
+
+
+def print_comparison(rows, threshold):
+    print(f"\n  {'stage@size':<32s} {'baseline':>10s} {'now':>10s} {'ratio':>7s}")
+    for key, base, now, ratio, regressed in rows:
+        flag = f"  REGRESSION (> {1 + threshold:.2f}×)" if regressed else ""
+        print(f"  {key:<32s} {base:>10.4f} {now:>10.4f} {ratio:>6.2f}×{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="Row counts, e.g. 1k 10k 100k 1m")
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="countries")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a baseline JSON")
+    parser.add_argument("--baseline", metavar="PATH", help=f"Compare against a baseline (e.g. {os.path.relpath(BASELINE_FILE)})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown before failing (default: {DEFAULT_THRESHOLD:.0%}%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            rows = parse_size(size)
+            print(f"Synthetic {args.shape}: {rows:,} rows ...")
+            for stage, result in run_size(rows, args.shape, args.repeat, tmp).items():
+                results[f"{stage}@{rows}"] = result
+    print_results(results)
+
+    report = {
+        "environment": environment(),
+        "shape": args.shape,
+        "repeat": args.repeat,
+        "recorded": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != report["environment"]:
+            print("\nWARNING — baseline was recorded on a different environment:")
+            print(f"  {baseline.get('environment')}")
+        rows = compare(results, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        regressions = [key for key, *_, regressed in rows if regressed]
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+synthetic.py
+────────────
+Generates synthetic schema_config + enriched CSV pairs shaped like the real
+categories, at any row count, for the benchmarks in this directory.
+
+Both shapes cover every data type (STRING, INT, FLOAT, CURRENCY, BOOLEAN,
+LIST) and logic type (TARGET, EXACT_MATCH, CATEGORY_MATCH, HIGHER_LOWER,
+GEO_DISTANCE, SET_INTERSECTION, NONE), linked category columns and the
+"-1" / "" missing-value sentinels. The countries shape also carries every
+source column categorize_countries.py bins.
+
+Usage (from the repo root):
+    python -m benchmarks.synthetic --shape countries --rows 100000 --out /tmp/synth
+"""
+
+import argparse
+import csv
+import os
+import random
+
+SCHEMA_HEADER = [
+    "category", "attribute_key", "display_label", "data_type", "logic_type", "display_format",
+    "is_folded", "is_virtual", "linked_category_col", "ui_color_logic",
+]
+
+CONTINENTS = ("Africa", "Americas", "Asia", "Europe", "Oceania")
+GOVERNMENTS = ("Republic", "Federal Republic", "Constitutional Monarchy", "Absolute Monarchy")
+LANGUAGES = ("English", "French", "Arabic", "Spanish", "Hindi", "Portuguese", "Russian", "Swahili")
+PHASES = ("Solid", "Liquid", "Gas")
+BLOCKS = ("Alkali metal", "Noble gas", "Transition metal", "Lanthanide", "Halogen")
+
+
+def column(key, data_type, gen, logic_type="NONE", display_format="HIDDEN",
+           linked="", ui_color="", virtual=False, missing=0.05):
+    """One synthetic column: schema fields plus gen(rng, i) -> raw CSV cell."""
+    return {
+        "key": key, "data_type": data_type, "logic_type": logic_type,
+        "display_format": display_format, "linked": linked, "ui_color": ui_color,
+        "virtual": virtual, "gen": gen, "missing": missing,
+    }
+
+
+SHAPES = {
+    "countries": [
+        column("id", "STRING", lambda r, i: f"C{i:07d}", "EXACT_MATCH", missing=0),
+        column("name", "STRING", lambda r, i: f"Country {i}", "TARGET", missing=0),
+        column("continent", "STRING", lambda r, i: r.choice(CONTINENTS), "CATEGORY_MATCH", "TEXT",
+               ui_color="DISTANCE_GRADIENT", missing=0),
+        column("Latitude", "FLOAT", lambda r, i: f"{r.uniform(-60, 70):.4f}"),
+        column("Longitude", "FLOAT", lambda r, i: f"{r.uniform(-180, 180):.4f}"),
+        column("distance_km", "FLOAT", None, "GEO_DISTANCE", "DISTANCE", virtual=True),
+        column("area", "INT", lambda r, i: str(int(10 ** r.uniform(0, 7))), "HIGHER_LOWER",
+               "PERCENTAGE_DIFF", linked="area_cat"),
+        column("population", "INT", lambda r, i: str(int(10 ** r.uniform(3, 9))), "HIGHER_LOWER",
+               "PERCENTAGE_DIFF", linked="population_cat"),
+        column("GDP", "INT", lambda r, i: str(int(10 ** r.uniform(8, 13)))),
+        column("exports", "CURRENCY", lambda r, i: f"${10 ** r.uniform(6, 12):,.2f}", "HIGHER_LOWER",
+               "CURRENCY"),
+        column("gdp_per_capita", "INT", lambda r, i: str(r.randint(300, 120_000)), missing=0.2),
+        column("Armed Forces size", "INT", lambda r, i: str(r.choice((0, r.randint(1, 2_000_000)))),
+               missing=0.2),
+        column("pop_density", "FLOAT", lambda r, i: f"{10 ** r.uniform(0, 4):.2f}"),
+        column("is_landlocked", "BOOLEAN", lambda r, i: r.choice(("True", "False")), "EXACT_MATCH", "TEXT"),
+        column("government_type", "STRING", lambda r, i: r.choice(GOVERNMENTS), "CATEGORY_MATCH", "TEXT"),
+        column("border_countries_count", "INT", lambda r, i: str(r.randint(0, 14)), "HIGHER_LOWER", "NUMBER"),
+        column("timezone_count", "INT", lambda r, i: str(r.choice((1, 1, 1, 2, 3, 6, 12))), "HIGHER_LOWER",
+               "NUMBER", missing=0),
+        column("unesco_sites", "INT", lambda r, i: str(r.randint(0, 60)), missing=0),
+        column("first_letter", "INT", lambda r, i: str(r.randint(1, 26)), "HIGHER_LOWER", "ALPHA_POSITION",
+               missing=0),
+        column("languages", "LIST", lambda r, i: ", ".join(r.sample(LANGUAGES, r.randint(1, 3))),
+               "SET_INTERSECTION", "TEXT"),
+        column("area_cat", "STRING", lambda r, i: r.choice(("Tiny", "Small", "Medium", "Large", "Huge"))),
+        column("population_cat", "STRING", lambda r, i: r.choice(("1K-1M", "1M-10M", "10M-100M", "100M+"))),
+    ],
+    "elements": [
+        column("id", "STRING", lambda r, i: f"X{i:07d}", "EXACT_MATCH", missing=0),
+        column("Name", "STRING", lambda r, i: f"Element {i}", "TARGET", missing=0),
+        column("AtomicNumber", "INT", lambda r, i: str(i + 1), "HIGHER_LOWER", "NUMBER", missing=0),
+        column("AtomicMass", "FLOAT", lambda r, i: f"{r.uniform(1, 300):.6f}", "HIGHER_LOWER",
+               linked="atomic_mass_range", missing=0),
+        column("Density", "FLOAT", lambda r, i: f"{r.uniform(0, 23):.4f}", "HIGHER_LOWER"),
+        column("ElectronAffinity", "FLOAT", lambda r, i: f"{r.uniform(-1, 4):.3f}", "HIGHER_LOWER",
+               missing=0.5),
+        column("YearDiscovered", "INT", lambda r, i: str(r.choice((0, r.randint(1600, 2010)))), "HIGHER_LOWER"),
+        column("StandardState", "STRING", lambda r, i: r.choice(PHASES), "CATEGORY_MATCH", "TEXT", missing=0),
+        column("is_radioactive", "BOOLEAN", lambda r, i: r.choice(("True", "False", "1", "0")),
+               "EXACT_MATCH", "TEXT", missing=0),
+        column("group", "INT", lambda r, i: str(r.randint(1, 18)), "HIGHER_LOWER", "NUMBER",
+               linked="GroupBlock"),
+        column("GroupBlock", "STRING", lambda r, i: r.choice(BLOCKS)),
+        column("oxidation_states", "LIST", lambda r, i: ",".join(map(str, r.sample(range(-4, 9), 3))),
+               "SET_INTERSECTION", "TEXT"),
+        column("atomic_mass_range", "STRING",
+               lambda r, i: r.choice(("Very Light (<10)", "Light (10-40)", "Medium (40-100)", "Heavy (100-200)"))),
+    ],
+}
+
+
+def schema_rows(category, columns):
+    for col in columns:
+        yield [
+            category, col["key"], col["key"].replace("_", " ").title(), col["data_type"],
+            col["logic_type"], col["display_format"], "False", str(col["virtual"]),
+            col["linked"], col["ui_color"],
+        ]
+
+
+def write_schema_csv(path, category, columns):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SCHEMA_HEADER)
+        writer.writerows(schema_rows(category, columns))
+
+
+def write_enriched_csv(path, columns, rows, seed=0):
+    """Write `rows` entities; virtual columns are computed at runtime and have no cells."""
+    rng = random.Random(seed)
+    real = [c for c in columns if not c["virtual"]]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([c["key"] for c in real])
+        for i in range(rows):
+            writer.writerow([
+                rng.choice(("", "-1")) if c["missing"] and rng.random() < c["missing"] else c["gen"](rng, i)
+                for c in real
+            ])
+
+
+def write_category(out_dir, shape, rows, seed=0):
+    """Write <shape>_schema_config.csv and <shape>_enriched.csv; return both paths."""
+    columns = SHAPES[shape]
+    schema_path = os.path.join(out_dir, f"{shape}_schema_config.csv")
+    data_path = os.path.join(out_dir, f"{shape}_enriched.csv")
+    write_schema_csv(schema_path, shape, columns)
+    write_enriched_csv(data_path, columns, rows, seed)
+    return schema_path, data_path
+
+
+def synthetic_schema(shape="countries"):
+    """The schema parse_schema_config() returns for a shape, without touching disk."""
+    schema = []
+    for row in schema_rows(shape, SHAPES[shape]):
+        record = dict(zip(SCHEMA_HEADER, row))
+        field = {
+            "attributeKey": record["attribute_key"],
+            "displayLabel": record["display_label"],
+            "dataType": record["data_type"],
+            "logicType": record["logic_type"],
+            "displayFormat": record["display_format"],
+            "isFolded": False,
+            "isVirtual": record["is_virtual"] == "True",
+        }
+        if record["linked_category_col"]:
+            field["linkedCategoryCol"] = record["linked_category_col"]
+        if record["ui_color_logic"]:
+            field["uiColorLogic"] = record["ui_color_logic"]
+        schema.append(field)
+    return schema
+
+
+def write_synthetic_csv(path, rows, seed=0, shape="countries"):
+    """Write only the enriched CSV of a shape (pair it with synthetic_schema())."""
+    write_enriched_csv(path, SHAPES[shape], rows, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="countries")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Directory to write the CSV pair to")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for path in write_category(args.out, args.shape, args.rows, args.seed):
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+binning.py
+──────────
+Declarative, vectorised binning for the *_cat / *_range columns that back
+linked_category_col in the schema configs.
+
+A category script describes each derived column as a spec and hands the
+whole table to categorize(), which evaluates every column with NumPy /
+pandas in one pass instead of looping over rows:
+
+  Bins          threshold bins — the vectorised form of an if/elif chain
+                over ascending edges, with exact-value sentinels such as
+                -1 → "Unknown" checked first
+  QuantileBins  roughly equal-count bins from pd.qcut, -1 → "Unknown"
+
+Used by categorize_countries.py and categorize_elements.py.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# ─── Specs ──────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Bins:
+    """
+    Threshold bins over `source`. `labels` has one more entry than `edges`.
+
+    closed="right" matches a chain of `v <= edge` tests, closed="left" a
+    chain of `v < edge` tests; values past the last edge (and NaN, which
+    fails every comparison) get the last label. `exact` values are tested
+    first, in order, like the leading `v == -1` branches of a chain.
+    """
+    source: str
+    edges: Sequence[float]
+    labels: Sequence[str]
+    closed: str = "right"
+    exact: Mapping[float, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if len(self.labels) != len(self.edges) + 1:
+            raise ValueError(f"{self.source}: {len(self.edges)} edges need {len(self.edges) + 1} labels")
+        if list(self.edges) != sorted(self.edges):
+            raise ValueError(f"{self.source}: edges must be ascending")
+        if self.closed not in ("left", "right"):
+            raise ValueError(f"{self.source}: closed must be 'left' or 'right'")
+
+
+@dataclass(frozen=True)
+class QuantileBins:
+    """
+    n_bins quantile buckets over `source`; `missing` values become `unknown`.
+    label_fn(low, high, i, total) -> str produces the label of each bin.
+    """
+    source: str
+    n_bins: int
+    label_fn: Callable[[float, float, int, int], str]
+    missing: float = -1
+    unknown: str = "Unknown"
+
+
+# ─── Evaluation ─────────────────────────────────────────────────────────────
+
+def threshold_labels(values: np.ndarray, spec: Bins) -> np.ndarray:
+    """Evaluate a Bins spec over a float array; returns an object array of labels."""
+    side = "left" if spec.closed == "right" else "right"
+    idx = np.searchsorted(np.asarray(spec.edges, dtype=np.float64), values, side=side)
+    labels = np.asarray(spec.labels, dtype=object)[idx]
+    if spec.exact:
+        labels = np.select(
+            [values == v for v in spec.exact],
+            list(spec.exact.values()),
+            default=labels,
+        )
+    return labels
+
+
+def quantile_labels(series: pd.Series, n_bins: int, label_fn,
+                    missing: float = -1, unknown: str = "Unknown") -> pd.Series:
+    """
+    Bin a numeric series into n_bins quantile buckets. Returns labeled categories.
+    Handles `missing` (-1) → "Unknown". Deduplicates bin edges.
+    label_fn(low, high, i, total) -> str  produces the human label for each bin.
+    """
+    valid_mask = series != missing
+    valid = series[valid_mask].copy()
+
+    # Get quantile edges
+    _, edges = pd.qcut(valid, q=n_bins, retbins=True, duplicates="drop")
+    actual_bins = len(edges) - 1
+
+    labels = [label_fn(edges[i], edges[i + 1], i, actual_bins) for i in range(actual_bins)]
+    result = pd.cut(valid, bins=edges, labels=labels, include_lowest=True)
+
+    # Merge back with Unknown for missing
+    out = pd.Series(unknown, index=series.index, dtype="object")
+    out[valid_mask] = result.astype(str)
+    return out
+
+
+def apply_spec(df: pd.DataFrame, spec) -> pd.Series:
+    """Evaluate one spec against df and return the label column."""
+    if isinstance(spec, QuantileBins):
+        return quantile_labels(df[spec.source], spec.n_bins, spec.label_fn, spec.missing, spec.unknown)
+    values = df[spec.source].to_numpy(dtype=np.float64)
+    return pd.Series(threshold_labels(values, spec), index=df.index, dtype="object")
+
+
+def categorize(df: pd.DataFrame, specs: Mapping[str, object]) -> pd.DataFrame:
+    """Evaluate every {column: spec} and return the new columns as one frame."""
+    return pd.DataFrame({col: apply_spec(df, spec) for col, spec in specs.items()}, index=df.index)
+
+
+def print_distribution(df: pd.DataFrame, columns, unit: str) -> None:
+    """Print the label counts of each derived column."""
+    for col_name in columns:
+        counts = df[col_name].value_counts()
+        print(f"\n  {col_name} ({len(counts)} categories):")
+        for label, count in counts.items():
+            print(f"    {label:.<40s} {count:>3} {unit}")
@@ -2,49 +2,36 @@
 categorize_countries.py
 ───────────────────────
 Adds categorical columns to countries_enriched.csv using quantile-based
-binning so each category has roughly equal country counts.
+binning so each category has roughly equal country counts, plus manual
+bins where the distribution calls for them. The bins are declared in
+COUNTRY_BINS and evaluated by binning.categorize().
 
 Reads  : data/countries_enriched.csv
 Writes : data/countries_enriched.csv (in-place update)
+
+Usage:
+    python -m data.categorize_countries [--profile [PATH]] [--cprofile PATH]
+    python -m data.categorize_countries --streaming [--chunksize 100000] [--csv PATH] [--report]
 """
 
-import math
-import numpy as np
+import argparse
+
 import pandas as pd
 from pathlib import Path
 
-DATA_DIR = Path(__file__).resolve().parent
-CSV_PATH = DATA_DIR / "countries_enriched.csv"
-
-# ─── Helpers ────────────────────────────────────────────────────────────────
-
-def quantile_labels(series: pd.Series, n_bins: int, label_fn) -> pd.Series:
-    """
-    Bin a numeric series into n_bins quantile buckets. Returns labeled categories.
-    Handles -1 as missing → "Unknown". Deduplicates bin edges.
-    label_fn(low, high, i, total) -> str  produces the human label for each bin.
-    """
-    valid_mask = series != -1
-    valid = series[valid_mask].copy()
-
-    # Get quantile edges
-    _, edges = pd.qcut(valid, q=n_bins, retbins=True, duplicates="drop")
-    actual_bins = len(edges) - 1
-
-    # Build labels
-    labels = []
-    for i in range(actual_bins):
-        low = edges[i]
-        high = edges[i + 1]
-        labels.append(label_fn(low, high, i, actual_bins))
+from data.binning import Bins, QuantileBins, categorize, print_distribution
+from data.merge_columns import detect_lineterminator, write_csv
+from data.repo_path import DATA_DIR, REPO_ROOT
+from data.streaming_bins import (
+    DEFAULT_CHUNKSIZE, DEFAULT_K, categorize_csv, print_counts, print_quantile_report, quantile_report,
+)
 
-    result = pd.cut(valid, bins=edges, labels=labels, include_lowest=True)
+from pipeline import profiling
 
-    # Merge back with Unknown for missing
-    out = pd.Series("Unknown", index=series.index, dtype="object")
-    out[valid_mask] = result.astype(str)
-    return out
+CSV_PATH = DATA_DIR / "countries_enriched.csv"
+PROFILE_PATH = REPO_ROOT / ".cache" / "profile_categorize_countries.json"
 
+# ─── Label formatting ───────────────────────────────────────────────────────
 
 def fmt_big(n: float) -> str:
     """Format a large number compactly: 1.2K, 3.4M, 5.6B, 7.8T"""
@@ -64,197 +51,171 @@ def fmt_int(n: float) -> str:
     return f"{int(n):,}"
 
 
-# ─── Column-specific bin configs ────────────────────────────────────────────
+# ─── Column bin specs ───────────────────────────────────────────────────────
 
-def categorize_population(df: pd.DataFrame) -> pd.Series:
-    """7 quantile bins with compact labels."""
-    return quantile_labels(
-        df["population"], 7,
+COUNTRY_BINS = {
+    # 7 quantile bins with compact labels
+    "population_cat": QuantileBins(
+        "population", 7,
         lambda lo, hi, i, t: f"{fmt_big(lo)}-{fmt_big(hi)}"
-    )
-
-
-def categorize_area(df: pd.DataFrame) -> pd.Series:
-    """7 quantile bins."""
-    return quantile_labels(
-        df["area"], 7,
+    ),
+    "area_cat": QuantileBins(
+        "area", 7,
         lambda lo, hi, i, t: f"{fmt_big(lo)}-{fmt_big(hi)} km²"
-    )
-
-
-def categorize_gdp(df: pd.DataFrame) -> pd.Series:
-    """7 quantile bins, skip -1."""
-    return quantile_labels(
-        df["GDP"], 7,
+    ),
+    "GDP_cat": QuantileBins(
+        "GDP", 7,
         lambda lo, hi, i, t: f"${fmt_big(lo)}-${fmt_big(hi)}"
-    )
+    ),
+    "gdp_per_capita_cat": QuantileBins(
+        "gdp_per_capita", 6,
+        lambda lo, hi, i, t: f"${fmt_big(lo)}-${fmt_big(hi)}"
+    ),
+    # Manual bins since many zeros and -1s
+    "armed_forces_cat": Bins(
+        "Armed Forces size",
+        edges=[10_000, 50_000, 150_000, 500_000],
+        labels=["1-10K", "10K-50K", "50K-150K", "150K-500K", "500K+"],
+        exact={-1: "Unknown", 0: "None"},
+    ),
+    "pop_density_cat": QuantileBins(
+        "pop_density", 7,
+        lambda lo, hi, i, t: f"{fmt_big(lo)}-{fmt_big(hi)} /km²"
+    ),
+    # 90% of countries have 1 timezone
+    "timezone_cat": Bins(
+        "timezone_count",
+        edges=[5],
+        labels=["3-5", "6+"],
+        exact={1: "1", 2: "2"},
+    ),
+    # Tuned for the right-skewed distribution
+    "unesco_cat": Bins(
+        "unesco_sites",
+        edges=[2, 5, 10, 25],
+        labels=["1-2", "3-5", "6-10", "11-25", "26+"],
+        exact={0: "0"},
+    ),
+    # Geographic bands
+    "latitude_cat": Bins(
+        "Latitude",
+        edges=[-30, -10, 10, 25, 40, 55],
+        labels=[
+            "Deep South (< -30°)",
+            "Southern (-30° to -10°)",
+            "Equatorial (-10° to 10°)",
+            "Tropical (10° to 25°)",
+            "Subtropical (25° to 40°)",
+            "Temperate (40° to 55°)",
+            "Northern (55°+)",
+        ],
+        closed="left",
+        exact={-1: "Unknown"},
+    ),
+    "longitude_cat": Bins(
+        "Longitude",
+        edges=[-100, -50, 0, 30, 60, 100, 140],
+        labels=[
+            "Far West (< -100°)",
+            "Americas (-100° to -50°)",
+            "Atlantic (-50° to 0°)",
+            "Europe/Africa (0° to 30°)",
+            "Middle East (30° to 60°)",
+            "Central Asia (60° to 100°)",
+            "East Asia (100° to 140°)",
+            "Pacific (140°+)",
+        ],
+        closed="left",
+    ),
+}
 
 
-def categorize_gdp_per_capita(df: pd.DataFrame) -> pd.Series:
-    """6 quantile bins."""
-    return quantile_labels(
-        df["gdp_per_capita"], 6,
-        lambda lo, hi, i, t: f"${fmt_big(lo)}-${fmt_big(hi)}"
+# ─── Main ───────────────────────────────────────────────────────────────────
+
+def first_letter(names: pd.Series) -> pd.Series:
+    """Ordinal position of the first character (A=1, B=2, ..., Z=26; 0 if not a letter)."""
+    return names.str.strip().str[0].str.upper().apply(
+        lambda ch: ord(ch) - ord('A') + 1 if ch.isalpha() else 0
     )
 
 
-def categorize_armed_forces(df: pd.DataFrame) -> pd.Series:
-    """Manual bins since many zeros and -1s."""
-    s = df["Armed Forces size"]
-    labels = []
-    for v in s:
-        if v == -1:
-            labels.append("Unknown")
-        elif v == 0:
-            labels.append("None")
-        elif v <= 10000:
-            labels.append("1-10K")
-        elif v <= 50000:
-            labels.append("10K-50K")
-        elif v <= 150000:
-            labels.append("50K-150K")
-        elif v <= 500000:
-            labels.append("150K-500K")
-        else:
-            labels.append("500K+")
-    return pd.Series(labels, index=df.index)
-
-
-def categorize_pop_density(df: pd.DataFrame) -> pd.Series:
-    """7 quantile bins."""
-    return quantile_labels(
-        df["pop_density"], 7,
-        lambda lo, hi, i, t: f"{fmt_big(lo)}-{fmt_big(hi)} /km²"
+def main_streaming(csv_path: Path, chunksize: int, report: bool, profiler) -> None:
+    """Bin a CSV too large for a DataFrame: sketch pass, then label pass, in chunks."""
+    print(f"Streaming {csv_path} in chunks of {chunksize:,} rows ...")
+    result = profiler.run(
+        "countries", "categorize_streaming", categorize_csv, csv_path, COUNTRY_BINS, None, chunksize,
+        DEFAULT_K, lambda chunk: {"first_letter": first_letter(chunk["name"])},
+        rows=lambda r: r["rows"], bytes_read=csv_path.stat().st_size,
     )
+    print_counts(result["counts"], "countries")
+    if report:
+        print_quantile_report(quantile_report(csv_path, COUNTRY_BINS, result))
+    print(f"\nDone — wrote {result['rows']:,} rows to {csv_path}")
 
 
-def categorize_timezone_count(df: pd.DataFrame) -> pd.Series:
-    """Manual bins — 90% of countries have 1 timezone."""
-    s = df["timezone_count"]
-    labels = []
-    for v in s:
-        if v == 1:
-            labels.append("1")
-        elif v == 2:
-            labels.append("2")
-        elif v <= 5:
-            labels.append("3-5")
-        else:
-            labels.append("6+")
-    return pd.Series(labels, index=df.index)
-
-
-def categorize_unesco(df: pd.DataFrame) -> pd.Series:
-    """Manual bins tuned for the right-skewed distribution."""
-    s = df["unesco_sites"]
-    labels = []
-    for v in s:
-        if v == 0:
-            labels.append("0")
-        elif v <= 2:
-            labels.append("1-2")
-        elif v <= 5:
-            labels.append("3-5")
-        elif v <= 10:
-            labels.append("6-10")
-        elif v <= 25:
-            labels.append("11-25")
-        else:
-            labels.append("26+")
-    return pd.Series(labels, index=df.index)
-
-
-def categorize_latitude(df: pd.DataFrame) -> pd.Series:
-    """Geographic latitude bands."""
-    s = df["Latitude"]
-    labels = []
-    for v in s:
-        if v == -1:
-            labels.append("Unknown")
-        elif v < -30:
-            labels.append("Deep South (< -30°)")
-        elif v < -10:
-            labels.append("Southern (-30° to -10°)")
-        elif v < 10:
-            labels.append("Equatorial (-10° to 10°)")
-        elif v < 25:
-            labels.append("Tropical (10° to 25°)")
-        elif v < 40:
-            labels.append("Subtropical (25° to 40°)")
-        elif v < 55:
-            labels.append("Temperate (40° to 55°)")
-        else:
-            labels.append("Northern (55°+)")
-    return pd.Series(labels, index=df.index)
-
-
-def categorize_longitude(df: pd.DataFrame) -> pd.Series:
-    """Geographic longitude bands."""
-    s = df["Longitude"]
-    labels = []
-    for v in s:
-        if v < -100:
-            labels.append("Far West (< -100°)")
-        elif v < -50:
-            labels.append("Americas (-100° to -50°)")
-        elif v < 0:
-            labels.append("Atlantic (-50° to 0°)")
-        elif v < 30:
-            labels.append("Europe/Africa (0° to 30°)")
-        elif v < 60:
-            labels.append("Middle East (30° to 60°)")
-        elif v < 100:
-            labels.append("Central Asia (60° to 100°)")
-        elif v < 140:
-            labels.append("East Asia (100° to 140°)")
-        else:
-            labels.append("Pacific (140°+)")
-    return pd.Series(labels, index=df.index)
-
+def finish_profile(args, profiler) -> None:
+    report = profiler.report()
+    profiling.print_report(report)
+    if args.cprofile and profiler.dump_hottest(args.cprofile):
+        print(f"  cProfile of the hottest stage saved to: {args.cprofile}")
+    profiling.write_report(report, args.profile)
+    print(f"Profile report saved to: {args.profile}")
 
-# ─── Main ───────────────────────────────────────────────────────────────────
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, default=CSV_PATH, help=f"CSV to update in place (default: {CSV_PATH.name})")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Bin in chunks with bounded memory (KLL-sketch quantiles)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk with --streaming (default: {DEFAULT_CHUNKSIZE:,})")
+    parser.add_argument("--report", action="store_true",
+                        help="With --streaming, compare the streamed bins with exact qcut bins "
+                             "(loads each quantile source column in full)")
+    parser.add_argument("--profile", nargs="?", const=str(PROFILE_PATH), metavar="PATH",
+                        help="Write a per-stage timing/allocation report (JSON) to PATH")
+    parser.add_argument("--cprofile", metavar="PATH",
+                        help="With --profile, re-run the hottest stage under cProfile and save the stats to PATH")
+    args = parser.parse_args()
+    profiler = profiling.StageProfiler(enabled=args.profile is not None)
+    csv_path = args.csv
+
+    if args.streaming:
+        main_streaming(csv_path, args.chunksize, args.report, profiler)
+        if args.profile:
+            finish_profile(args, profiler)
+        return
+
+    size = csv_path.stat().st_size
     print("Loading CSV ...")
-    df = pd.read_csv(CSV_PATH)
+    df = profiler.run("countries", "read", pd.read_csv, csv_path, rows=len, bytes_read=size)
     print(f"  {len(df)} rows, {len(df.columns)} columns")
 
     print("\nCreating categorical columns ...")
 
-    cats = {
-        "population_cat":     categorize_population,
-        "area_cat":           categorize_area,
-        "GDP_cat":            categorize_gdp,
-        "gdp_per_capita_cat": categorize_gdp_per_capita,
-        "armed_forces_cat":   categorize_armed_forces,
-        "pop_density_cat":    categorize_pop_density,
-        "timezone_cat":       categorize_timezone_count,
-        "unesco_cat":         categorize_unesco,
-        "latitude_cat":       categorize_latitude,
-        "longitude_cat":      categorize_longitude,
-    }
-
-    for col_name, fn in cats.items():
-        df[col_name] = fn(df)
-        counts = df[col_name].value_counts()
-        print(f"\n  {col_name} ({len(counts)} categories):")
-        for label, count in counts.items():
-            print(f"    {label:.<40s} {count:>3} countries")
+    binned = profiler.run("countries", "categorize", categorize, df, COUNTRY_BINS, rows=len)
+    df[list(binned.columns)] = binned
+    print_distribution(df, binned.columns, "countries")
 
     # Fun/Meta: first_letter — ordinal position of first character (A=1, B=2, ..., Z=26)
     print("\nComputing first_letter ...")
-    df["first_letter"] = df["name"].str.strip().str[0].str.upper().apply(
-        lambda ch: ord(ch) - ord('A') + 1 if ch.isalpha() else 0
-    )
+    df["first_letter"] = profiler.run("countries", "first_letter", first_letter, df["name"], rows=len)
     dist = df["first_letter"].value_counts().sort_index()
     print(f"  first_letter distribution ({len(dist)} unique values):")
     for val, count in dist.items():
         letter = chr(val + ord('A') - 1) if val > 0 else '?'
         print(f"    {letter} ({val}):{'.' * (30 - len(f'{letter} ({val})'))} {count:>3} countries")
 
-    # Write
-    df.to_csv(CSV_PATH, index=False)
-    print(f"\nDone — wrote {len(df)} rows × {len(df.columns)} cols to {CSV_PATH}")
+    # Write, keeping the file's line endings (countries_enriched.csv uses CRLF)
+    newline = detect_lineterminator(csv_path)
+    text = profiler.run("countries", "serialize", lambda: df.to_csv(index=False, lineterminator=newline),
+                        rows=len(df), bytes_written=lambda t: len(t.encode("utf-8")))
+    profiler.run("countries", "write", write_csv, csv_path, text, rows=len(df),
+                 bytes_written=len(text.encode("utf-8")))
+    print(f"\nDone — wrote {len(df)} rows × {len(df.columns)} cols to {csv_path}")
+
+    if args.profile:
+        finish_profile(args, profiler)
 
 
 if __name__ == "__main__":
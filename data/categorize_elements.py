@@ -0,0 +1,91 @@
+"""
+categorize_elements.py
+──────────────────────
+Adds the *_range columns that the elements schema links HIGHER_LOWER
+fields to (linked_category_col), using the declarative bins in binning.py.
+
+Reads  : data/elements_enriched.csv
+Writes : data/elements_enriched.csv (in-place update)
+
+Usage (from the repo root):
+    python -m data.categorize_elements
+"""
+
+import pandas as pd
+
+from data.binning import Bins, categorize, print_distribution
+from data.merge_columns import write_frame
+from data.repo_path import DATA_DIR
+
+CSV_PATH = DATA_DIR / "elements_enriched.csv"
+
+# ─── Column bin specs ───────────────────────────────────────────────────────
+
+ELEMENT_BINS = {
+    # Year 0 marks elements known since antiquity
+    "year_discovered_range": Bins(
+        "YearDiscovered",
+        edges=[1700, 1800, 1850, 1900, 1950],
+        labels=["Pre-1700", "1700s", "Early 1800s", "Late 1800s", "Early 1900s", "Modern (1950+)"],
+        closed="left",
+        exact={0: "Ancient"},
+    ),
+    "atomic_mass_range": Bins(
+        "AtomicMass",
+        edges=[10, 40, 100, 200],
+        labels=["Very Light (<10)", "Light (10-40)", "Medium (40-100)", "Heavy (100-200)", "Very Heavy (>200)"],
+        closed="left",
+    ),
+    # Gases are stored with density 0
+    "density_range": Bins(
+        "Density",
+        edges=[1, 5, 10, 15, 20],
+        labels=[
+            "Ultra Light (<1)", "Light (1-5)", "Medium (5-10)",
+            "Dense (10-15)", "Very Dense (15-20)", "Super Dense (>20)",
+        ],
+        closed="left",
+        exact={-1: "Unknown/Gas", 0: "Unknown/Gas"},
+    ),
+    "melting_point_range": Bins(
+        "MeltingPoint",
+        edges=[100, 500, 1000, 1500, 2500],
+        labels=[
+            "Cryogenic (<100K)", "Very Low (100-500K)", "Low (500-1000K)",
+            "Moderate (1000-1500K)", "High (1500-2500K)", "Extreme (>2500K)",
+        ],
+        closed="left",
+        exact={-1: "Unknown"},
+    ),
+    "boiling_point_range": Bins(
+        "BoilingPoint",
+        edges=[100, 500, 1500, 3000, 5000],
+        labels=[
+            "Cryogenic (<100K)", "Very Low (100-500K)", "Low (500-1500K)",
+            "Moderate (1500-3000K)", "High (3000-5000K)", "Extreme (>5000K)",
+        ],
+        closed="left",
+        exact={-1: "Unknown"},
+    ),
+}
+
+
+# ─── Main ───────────────────────────────────────────────────────────────────
+
+def main():
+    print("Loading CSV ...")
+    df = pd.read_csv(CSV_PATH)
+    print(f"  {len(df)} rows, {len(df.columns)} columns")
+
+    print("\nCreating range columns ...")
+    binned = categorize(df, ELEMENT_BINS)
+    df[list(binned.columns)] = binned
+    print_distribution(df, binned.columns, "elements")
+
+    # elements_enriched.csv uses CRLF; write_frame keeps it
+    write_frame(df, CSV_PATH)
+    print(f"\nDone — wrote {len(df)} rows × {len(df.columns)} cols to {CSV_PATH}")
+
+
+if __name__ == "__main__":
+    main()
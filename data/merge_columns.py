@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+merge_columns.py
+────────────────
+Joins enrichment columns into an *_enriched.csv by id in a single streaming
+pass. Enrichment data is a dict (id → tuple or dict of values) or a second
+CSV, loaded once into a hash index; the base CSV is never held in memory.
+
+Columns that already exist in the base are replaced, so re-running a merge
+is safe. New columns go right after `after` (or where the replaced column
+used to be, or at the end). The result is written to a temp file next to
+the target and renamed over it, so an interrupted run never leaves a
+half-written CSV behind. merge_frame() does the same join on a table that
+is already in memory (see refresh_countries.py). write_csv() and
+write_frame() give the other scripts in data/ the same temp-file-and-rename
+write; write_frame() keeps the target's line endings.
+
+Usage:
+    python -m data.merge_columns data/countries_enriched.csv extra.csv \\
+        --columns government_type,border_countries_count --after driving_side
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+
+# ─── Enrichment sources ─────────────────────────────────────────────────────
+
+def load_enrichment_csv(path, columns, key="id"):
+    """Hash-index a CSV by `key`; returns {id: tuple of values in `columns` order}."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = [c for c in [key, *columns] if c not in header]
+        if missing:
+            raise ValueError(f"{path}: missing columns {missing}")
+        key_idx = header.index(key)
+        value_idx = [header.index(c) for c in columns]
+        index = {}
+        for row in reader:
+            if row:
+                index[row[key_idx]] = tuple(row[i] if i < len(row) else "" for i in value_idx)
+    return index
+
+
+def normalise_enrichment(enrichment, columns):
+    """Accept {id: tuple} or {id: dict}; return {id: tuple of str} in `columns` order."""
+    index = {}
+    for entity_id, values in enrichment.items():
+        if isinstance(values, dict):
+            values = tuple(values.get(c, "") for c in columns)
+        elif not isinstance(values, (tuple, list)):
+            values = (values,)
+        if len(values) != len(columns):
+            raise ValueError(f"{entity_id}: expected {len(columns)} values, got {len(values)}")
+        index[entity_id] = tuple("" if v is None else str(v) for v in values)
+    return index
+
+
+# ─── Merge ──────────────────────────────────────────────────────────────────
+
+def plan_header(header, columns, after=None):
+    """
+    Work out the output header once.
+
+    Returns (out_header, keep_idx, insert_at): keep_idx are the base columns
+    kept in order and insert_at is where the new block goes among them.
+    """
+    keep_idx = [i for i, name in enumerate(header) if name not in columns]
+    kept = [header[i] for i in keep_idx]
+
+    if after is not None:
+        if after in columns:
+            raise ValueError(f"cannot insert after '{after}', it is being replaced")
+        if after not in kept:
+            raise ValueError(f"column '{after}' not found in header")
+        insert_at = kept.index(after) + 1
+    else:
+        replaced = [i for i, name in enumerate(header) if name in columns]
+        # Reuse the slot of the first replaced column, else append
+        insert_at = sum(1 for i in keep_idx if i < replaced[0]) if replaced else len(kept)
+
+    out_header = kept[:insert_at] + list(columns) + kept[insert_at:]
+    return out_header, keep_idx, insert_at
+
+
+def detect_lineterminator(path):
+    with open(path, "rb") as f:
+        return "\r\n" if f.readline().endswith(b"\r\n") else "\n"
+
+
+def merge_columns(base_path, enrichment, columns, out_path=None, key="id",
+                  after=None, defaults=None):
+    """
+    Stream base_path, join `enrichment` by `key` and write out_path atomically.
+
+    `enrichment` is {id: values} (see normalise_enrichment). Base rows without
+    enrichment get `defaults`; when it is None they keep their current value
+    of a replaced column, and new columns are left empty.
+    Returns a report dict with row counts and unmatched ids on both sides.
+    """
+    columns = list(columns)
+    out_path = out_path or base_path
+    index = normalise_enrichment(enrichment, columns)
+    fallback = normalise_enrichment({None: defaults}, columns)[None] if defaults is not None else None
+
+    report = {"rows": 0, "matched": 0, "unmatched": [], "unused": [], "duplicates": []}
+    seen = set()
+    lineterminator = detect_lineterminator(base_path)
+
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".merge-", suffix=".csv", dir=out_dir)
+    try:
+        with open(base_path, newline="", encoding="utf-8") as src, \
+                os.fdopen(fd, "w", newline="", encoding="utf-8") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst, lineterminator=lineterminator)
+
+            header = next(reader)
+            if key not in header:
+                raise ValueError(f"{base_path}: key column '{key}' not found")
+            key_idx = header.index(key)
+            width = len(header)
+            out_header, keep_idx, insert_at = plan_header(header, columns, after)
+            existing_idx = [header.index(c) if c in header else None for c in columns]
+            writer.writerow(out_header)
+
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                entity_id = row[key_idx]
+                values = index.get(entity_id)
+                if values is None:
+                    report["unmatched"].append(entity_id)
+                    values = fallback or [row[i] if i is not None else "" for i in existing_idx]
+                else:
+                    report["matched"] += 1
+                if entity_id in seen:
+                    report["duplicates"].append(entity_id)
+                seen.add(entity_id)
+
+                kept = [row[i] for i in keep_idx]
+                kept[insert_at:insert_at] = values
+                writer.writerow(kept)
+                report["rows"] += 1
+
+        copy_permissions(base_path, tmp_path)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    report["unused"] = sorted(set(index) - seen)
+    report["header"] = out_header
+    return report
+
+
+def merge_frame(df, enrichment, columns, key="id", after=None, defaults=None):
+    """
+    merge_columns() for a table already in memory (a pandas DataFrame).
+
+    Same placement, defaults and report as merge_columns(); returns
+    (merged frame, report). The input frame is not modified.
+    """
+    columns = list(columns)
+    index = normalise_enrichment(enrichment, columns)
+    fallback = normalise_enrichment({None: defaults}, columns)[None] if defaults is not None else None
+    header = list(df.columns)
+    if key not in header:
+        raise ValueError(f"key column '{key}' not found")
+    out_header, keep_idx, insert_at = plan_header(header, columns, after)
+
+    ids = df[key].tolist()
+    existing = [df[c].tolist() if c in header else [""] * len(df) for c in columns]
+    merged = [[] for _ in columns]
+    report = {"rows": len(ids), "matched": 0, "unmatched": [], "unused": [], "duplicates": []}
+    seen = set()
+    for row, entity_id in enumerate(ids):
+        values = index.get(entity_id)
+        if values is None:
+            report["unmatched"].append(entity_id)
+            values = fallback or [column[row] for column in existing]
+        else:
+            report["matched"] += 1
+        if entity_id in seen:
+            report["duplicates"].append(entity_id)
+        seen.add(entity_id)
+        for out, value in zip(merged, values):
+            out.append(value)
+
+    out = df[[header[i] for i in keep_idx]].copy()
+    for offset, (name, values) in enumerate(zip(columns, merged)):
+        out.insert(insert_at + offset, name, values)
+    report["unused"] = sorted(set(index) - seen)
+    report["header"] = out_header
+    return out, report
+
+
+# ─── Atomic writes ──────────────────────────────────────────────────────────
+
+def copy_permissions(src, dst):
+    """Keep the target's permissions (mkstemp creates files as 0600)."""
+    try:
+        os.chmod(dst, os.stat(src).st_mode & 0o777)
+    except OSError:
+        pass
+
+
+def write_csv(path, text):
+    """Replace path with text via a temp file in the same directory."""
+    fd, tmp_path = tempfile.mkstemp(prefix=".write-", suffix=".csv",
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            f.write(text)
+        copy_permissions(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_frame(df, path):
+    """Write df over the CSV at path, keeping that file's line endings."""
+    text = df.to_csv(index=False, lineterminator=detect_lineterminator(path))
+    write_csv(path, text)
+
+
+def print_report(report, columns):
+    print(f"Merged {', '.join(columns)} into {report['rows']} rows ({report['matched']} matched).")
+    if report["unmatched"]:
+        print(f"WARNING — no data for IDs: {report['unmatched']}")
+    if report["unused"]:
+        print(f"WARNING — enrichment IDs not in base: {report['unused']}")
+    if report["duplicates"]:
+        print(f"WARNING — duplicate base IDs: {report['duplicates']}")
+    if not (report["unmatched"] or report["unused"] or report["duplicates"]):
+        print("All IDs matched successfully.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="CSV to update, e.g. data/countries_enriched.csv")
+    parser.add_argument("enrichment", help="CSV holding the key column and the new columns")
+    parser.add_argument("--columns", required=True, help="Comma-separated columns to merge")
+    parser.add_argument("--key", default="id", help="Join column present in both files (default: id)")
+    parser.add_argument("--after", help="Place the merged columns right after this column")
+    parser.add_argument("--out", help="Output path (default: update base in place)")
+    args = parser.parse_args(argv)
+
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()]
+    enrichment = load_enrichment_csv(args.enrichment, columns, args.key)
+    report = merge_columns(args.base, enrichment, columns, args.out, args.key, args.after)
+    print_report(report, columns)
+    return 1 if report["unmatched"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
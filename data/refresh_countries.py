@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+refresh_countries.py
+────────────────────
+Runs the countries pipeline — enrichment (update_countries_csv.py),
+categorisation (categorize_countries.py) and JSON emission (fetch_data.py)
+— over one in-memory table, instead of three scripts that each re-read and
+re-write countries_enriched.csv.
+
+  1. Read countries_enriched.csv once and parse it into a DataFrame.
+  2. Enrich: merge DATA into government_type / border_countries_count.
+  3. Categorise: COUNTRY_BINS and first_letter.
+  4. Serialise the table once and, if the bytes changed, write the CSV
+     through a temp file renamed over it, so an interrupted run leaves
+     either the old or the new file, never a partial one.
+  5. Emit: parse the countries entities from the same in-memory text with
+     fetch_data's parser, store the fetch_data cache fragment, and write
+     gameData.json atomically (write_if_changed).
+
+A stage is skipped when its inputs and outputs are unchanged since the last
+run. Each stage records, in .cache/refresh_countries.json, a digest of
+what it reads (the columns it uses plus its own code and settings) and of
+what it wrote. An edited input column, changed bins or enrichment data, or
+a hand-edited output column all re-run the stage; a second run with
+nothing changed reads the CSV and writes nothing.
+
+Usage (from the repo root):
+    python -m data.refresh_countries            # run the stages that are out of date
+    python -m data.refresh_countries --force    # run every stage
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from data.binning import Bins, QuantileBins
+from data.categorize_countries import COUNTRY_BINS, categorize, first_letter
+from data.merge_columns import detect_lineterminator, merge_frame, print_report, write_csv
+from data.repo_path import DATA_DIR, REPO_ROOT
+from data.update_countries_csv import COLUMNS, DATA, DEFAULTS
+
+import fetch_data
+
+CSV_PATH = DATA_DIR / "countries_enriched.csv"
+STATE_PATH = REPO_ROOT / ".cache" / "refresh_countries.json"
+CAT_KEY = "countries"
+ENRICH_AFTER = "driving_side"
+
+STATE_VERSION = 1
+
+# Source files whose code decides a stage's output
+ENRICH_CODE = ["update_countries_csv.py", "merge_columns.py"]
+CATEGORIZE_CODE = ["categorize_countries.py", "binning.py"]
+
+
+# ─── Fingerprints ───────────────────────────────────────────────────────────
+
+def digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def code_digest(names) -> str:
+    return digest(*(fetch_data.file_digest(DATA_DIR / name) for name in names))
+
+
+def cells_digest(text: str, columns) -> str:
+    """Digest of the named columns' cells in CSV text (None if one is missing)."""
+    reader = csv.reader(io.StringIO(text, newline=""))
+    header = next(reader, [])
+    if any(c not in header for c in columns):
+        return None
+    idx = [header.index(c) for c in columns]
+    return digest(json.dumps([[row[i] for i in idx] for row in reader if row], ensure_ascii=False))
+
+
+def columns_digest(df: pd.DataFrame, columns) -> str:
+    """cells_digest() of the named columns as df would write them.
+
+    Cells are compared as text, not parsed values, so a merged "14" matches
+    the 14 read back from the file.
+    """
+    if any(c not in df.columns for c in columns):
+        return None
+    return cells_digest(df[list(columns)].to_csv(index=False), columns)
+
+
+def bin_sources(specs) -> list:
+    return sorted({spec.source for spec in specs.values() if isinstance(spec, (Bins, QuantileBins))})
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "stages": {}}
+
+
+def save_state(state: dict) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = str(STATE_PATH) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def up_to_date(state: dict, stage: str, inputs: str, outputs: str) -> bool:
+    recorded = state["stages"].get(stage)
+    return recorded is not None and outputs is not None and recorded == {"inputs": inputs, "outputs": outputs}
+
+
+# ─── Stages ─────────────────────────────────────────────────────────────────
+
+ENRICH_OUTPUTS = list(COLUMNS)
+CATEGORIZE_OUTPUTS = list(COUNTRY_BINS) + ["first_letter"]
+
+
+def enrich_inputs(df: pd.DataFrame) -> str:
+    return digest(code_digest(ENRICH_CODE), columns_digest(df, ["id"]), ENRICH_AFTER)
+
+
+def enrich(df: pd.DataFrame) -> pd.DataFrame:
+    df, report = merge_frame(df, DATA, COLUMNS, after=ENRICH_AFTER, defaults=DEFAULTS)
+    print(f"  Updated {report['rows']} country rows.")
+    print_report(report, COLUMNS)
+    return df
+
+
+def categorize_inputs(df: pd.DataFrame) -> str:
+    return digest(code_digest(CATEGORIZE_CODE), columns_digest(df, bin_sources(COUNTRY_BINS) + ["name"]))
+
+
+def categorize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    binned = categorize(df, COUNTRY_BINS)
+    df[list(binned.columns)] = binned
+    df["first_letter"] = first_letter(df["name"])
+    print(f"  {len(binned.columns) + 1} categorical columns over {len(df)} rows")
+    return df
+
+
+def emit(data: bytes, tasks) -> str:
+    """Build gameData.json text with the countries entities parsed from `data`.
+
+    Other categories come from fetch_data's cache (or are parsed as usual).
+    """
+    built = {}
+    for cat_key, schema_path, data_path in tasks:
+        if cat_key != CAT_KEY:
+            schema, entities, _ = fetch_data.build_category(cat_key, schema_path, data_path)
+            built[cat_key] = (schema, entities)
+            continue
+        schema = fetch_data.parse_schema_config(schema_path)
+        rows = fetch_data.decode_rows(data)
+        header = next(rows, None)
+        entities = [] if header is None else fetch_data.parse_rows(rows, fetch_data.compile_parse_plan(header, schema))
+        cache_key = fetch_data.category_cache_key(schema_path, data_path, hashlib.sha256(data).hexdigest())
+        fetch_data.store_cached_category(cat_key, cache_key, schema, entities)
+        built[cat_key] = (schema, entities)
+    return fetch_data.dump_json(fetch_data.assemble_payload(built))
+
+
+def emit_inputs(data: bytes, tasks) -> str:
+    keys = []
+    for cat_key, schema_path, data_path in tasks:
+        data_digest = hashlib.sha256(data).hexdigest() if cat_key == CAT_KEY else None
+        keys.append((cat_key, fetch_data.category_cache_key(schema_path, data_path, data_digest)))
+    return digest(json.dumps(keys), fetch_data.file_digest(__file__))
+
+
+def output_digest(path: str) -> str:
+    return fetch_data.file_digest(path) if os.path.exists(path) else None
+
+
+# ─── Main ───────────────────────────────────────────────────────────────────
+
+def run_stage(state, name, inputs, outputs, force, fn):
+    """Run fn() unless the stage is up to date; returns True if it ran."""
+    if not force and up_to_date(state, name, inputs, outputs):
+        print(f"{name}: unchanged — skipped")
+        return False
+    print(f"{name}:")
+    start = time.perf_counter()
+    fn()
+    print(f"  done in {time.perf_counter() - start:.3f}s")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="Run every stage, even if its inputs are unchanged")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    # fetch_data resolves its inputs and outputs relative to the repo root
+    os.chdir(REPO_ROOT)
+
+    state = load_state()
+    raw = CSV_PATH.read_bytes()
+    newline = detect_lineterminator(CSV_PATH)
+    # Only empty cells are missing: with pandas' default NA strings the
+    # armed_forces_cat label "None" would read back as NaN and be written
+    # out empty whenever a stage that does not own that column rewrites the file
+    frame = {"df": pd.read_csv(io.BytesIO(raw), keep_default_na=False, na_values=[""])}
+    print(f"Loaded {CSV_PATH.name}: {len(frame['df'])} rows, {len(frame['df'].columns)} columns")
+
+    text = raw.decode("utf-8")
+
+    def stage(name, inputs, outputs, fn):
+        # Outputs are checked against the file, recorded from the table
+        ran = run_stage(state, name, inputs, cells_digest(text, outputs), args.force,
+                        lambda: frame.update(df=fn(frame["df"])))
+        if ran:
+            state["stages"][name] = {"inputs": inputs, "outputs": columns_digest(frame["df"], outputs)}
+        return ran
+
+    changed = stage("enrich", enrich_inputs(frame["df"]), ENRICH_OUTPUTS, enrich)
+    changed |= stage("categorize", categorize_inputs(frame["df"]), CATEGORIZE_OUTPUTS, categorize_frame)
+
+    data = raw
+    if changed:
+        data = frame["df"].to_csv(index=False, lineterminator=newline).encode("utf-8")
+        if data != raw:
+            write_csv(CSV_PATH, data.decode("utf-8"))
+            print(f"Wrote {CSV_PATH.name}: {len(frame['df'])} rows × {len(frame['df'].columns)} cols")
+        else:
+            print(f"{CSV_PATH.name} already up to date")
+
+    tasks = fetch_data.collect_categories()
+    inputs = emit_inputs(data, tasks)
+
+    def emit_stage():
+        text = emit(data, tasks)
+        wrote = fetch_data.write_if_changed(fetch_data.OUTPUT_FILE, text)
+        print(f"  {'Wrote' if wrote else 'Unchanged'}: {fetch_data.OUTPUT_FILE}")
+
+    run_stage(state, "emit", inputs, output_digest(fetch_data.OUTPUT_FILE), args.force, emit_stage)
+    state["stages"]["emit"] = {"inputs": inputs, "outputs": output_digest(fetch_data.OUTPUT_FILE)}
+    save_state(state)
+    print(f"\nDone in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
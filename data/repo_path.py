@@ -0,0 +1,14 @@
+"""
+repo_path.py
+────────────
+Paths shared by the scripts in data/. The scripts run as modules from the
+repo root (`python -m data.<script>`), so fetch_data, the pipeline package
+and the data.* modules import normally and nothing touches sys.path.
+
+    from data.repo_path import DATA_DIR, REPO_ROOT
+"""
+
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent
+REPO_ROOT = DATA_DIR.parent
@@ -2,9 +2,15 @@
 """
 Adds government_type and border_countries_count columns to countries_enriched.csv.
 Data verified via research (corrections applied vs initial AI draft).
+
+The merge itself (keyed by id, streaming, atomic) lives in merge_columns.py.
+
+Usage (from the repo root):
+    python -m data.update_countries_csv
 """
 
-import csv
+from data.merge_columns import merge_columns, print_report
+from data.repo_path import DATA_DIR
 
 # Maps ISO-3 country code → (government_type, border_countries_count)
 # Government types (8 categories):
@@ -239,66 +245,18 @@ DATA = {
     'VAT': ('Theocracy',               1),
 }
 
-INPUT_FILE  = '/Users/samirhusain/Personal/code_projects/Scalar/data/countries_enriched.csv'
-OUTPUT_FILE = '/Users/samirhusain/Personal/code_projects/Scalar/data/countries_enriched.csv'
-
-
-def main():
-    with open(INPUT_FILE, newline='', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        rows = list(reader)
-
-    header = rows[0]
+CSV_PATH = DATA_DIR / "countries_enriched.csv"
 
-    # Remove existing columns if re-running
-    for col_name in ['government_type', 'border_countries_count']:
-        if col_name in header:
-            idx = header.index(col_name)
-            for row in rows:
-                if idx < len(row):
-                    del row[idx]
-            print(f"Removed existing column '{col_name}' at index {idx}")
-            header = rows[0]
+COLUMNS = ["government_type", "border_countries_count"]
+DEFAULTS = ("Unknown", -1)
 
-    # Find driving_side column index
-    try:
-        ds_idx = header.index('driving_side')
-    except ValueError:
-        print("ERROR: 'driving_side' column not found in header!")
-        return
 
-    insert_at = ds_idx + 1  # insert right after driving_side
-
-    # Update header
-    rows[0].insert(insert_at,     'government_type')
-    rows[0].insert(insert_at + 1, 'border_countries_count')
-
-    missing = []
-    for row in rows[1:]:
-        country_id = row[0]
-        if country_id not in DATA:
-            missing.append(country_id)
-            row.insert(insert_at,     'Unknown')
-            row.insert(insert_at + 1, '-1')
-        else:
-            gov_type, border_cnt = DATA[country_id]
-            row.insert(insert_at,     gov_type)
-            row.insert(insert_at + 1, str(border_cnt))
-
-    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
-
-    print(f"\nDone! Updated {len(rows) - 1} country rows.")
-    if missing:
-        print(f"WARNING — no data for IDs: {missing}")
-    else:
-        print("All country IDs matched successfully.")
+def main():
+    # Replaces the columns if they already exist, so re-running is safe
+    report = merge_columns(CSV_PATH, DATA, COLUMNS, after="driving_side", defaults=DEFAULTS)
 
-    # Quick sample
-    print("\n--- Sample (first 10 rows) ---")
-    for row in rows[1:11]:
-        print(f"  {row[0]}: gov={row[insert_at]}, borders={row[insert_at + 1]}")
+    print(f"\nDone! Updated {report['rows']} country rows.")
+    print_report(report, COLUMNS)
 
 
 if __name__ == '__main__':
@@ -1,10 +1,40 @@
+import argparse
 import csv
+import hashlib
+import io
 import json
+import mmap
 import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from pipeline import artifacts, columnar, continuum_ranks, delta, profiling, search_index
+from pipeline.entity_table import EntityTable
 
 # --- CONFIGURATION ---
 OUTPUT_FILE = "./src/assets/data/gameData.json"
+SHARD_DIR = "./public/data"
+COLUMNAR_FILE = "./public/data/gameData.columnar.json"
+STATS_FILE = "./public/data/gameData.stats.json"
+PROFILE_FILE = "./.cache/profile.json"
+MANIFEST_FILE = "manifest.json"
 DATA_DIR = "./data"
+CACHE_DIR = "./.cache/fetch_data"
+
+# Bump whenever clean_value / parse_schema_config / parse_entity_data change
+# their output, so stale cache fragments are never reused.
+PARSER_VERSION = "1"
+
+# Rows per batch handed to EntityTable by parse_entity_table.
+PARSE_BATCH_ROWS = 4096
+
+# --chunk-jobs: files smaller than this are always parsed serially, and each
+# worker gets about CHUNKS_PER_JOB byte ranges so uneven rows balance out.
+CHUNK_MIN_BYTES = 8 << 20
+CHUNKS_PER_JOB = 4
 
 # Map category keys to their CSV files
 CATEGORY_MAP = {
@@ -19,41 +49,56 @@ CATEGORY_MAP = {
 }
 
 
-def clean_value(value, data_type):
-    """Parse a CSV value based on its declared data_type."""
-    if value is None or value == "" or value == "-1":
+# Raw cell values that always mean "no data".
+NULL_VALUES = frozenset(("", "-1"))
+
+
+def _to_int(s):
+    try:
+        return int(float(s.replace("$", "").replace(",", "")))
+    except (ValueError, TypeError):
         return None
 
-    s = str(value).strip()
 
-    if data_type == "INT":
-        s = s.replace("$", "").replace(",", "")
-        try:
-            return int(float(s))
-        except (ValueError, TypeError):
-            return None
+def _to_float(s):
+    try:
+        return round(float(s.replace("$", "").replace(",", "")), 6)
+    except (ValueError, TypeError):
+        return None
 
-    if data_type == "FLOAT":
-        s = s.replace("$", "").replace(",", "")
-        try:
-            return round(float(s), 6)
-        except (ValueError, TypeError):
-            return None
 
-    if data_type == "CURRENCY":
-        s = s.replace("$", "").replace(",", "")
-        try:
-            return round(float(s), 2)
-        except (ValueError, TypeError):
-            return None
+def _to_currency(s):
+    try:
+        return round(float(s.replace("$", "").replace(",", "")), 2)
+    except (ValueError, TypeError):
+        return None
 
-    if data_type == "BOOLEAN":
-        return s.lower() in ("true", "1", "yes")
 
-    # STRING, LIST, etc.
+def _to_bool(s):
+    return s.lower() in ("true", "1", "yes")
+
+
+def _to_str(s):
     return s
 
 
+# data_type -> converter for an already-stripped, non-null cell.
+# Anything not listed (STRING, LIST, ...) is kept as a string.
+CONVERTERS = {
+    "INT": _to_int,
+    "FLOAT": _to_float,
+    "CURRENCY": _to_currency,
+    "BOOLEAN": _to_bool,
+}
+
+
+def clean_value(value, data_type):
+    """Parse a CSV value based on its declared data_type."""
+    if value is None or value in NULL_VALUES:
+        return None
+    return CONVERTERS.get(data_type, _to_str)(str(value).strip())
+
+
 def parse_schema_config(csv_path):
     """Read a schema_config CSV and return a list of SchemaField objects."""
     schema = []
@@ -82,9 +127,16 @@ def parse_schema_config(csv_path):
     return schema
 
 
-def parse_entity_data(csv_path, schema):
-    """Read an enriched CSV and return entity records with all columns."""
-    # Build a lookup: column_name -> data_type from schema
+def compile_parse_plan(header, schema):
+    """Compile a header row + schema into positional cell converters.
+
+    Mirrors csv.DictReader semantics: when a header name repeats, the last
+    cell wins but the column keeps its first position. Returns a dict with
+    the TARGET/id column indices, the header width, a list of
+    (column, index, converter) for every remaining column and their data
+    types. The converter takes a stripped, non-null cell, like the
+    CONVERTERS; it is None for columns kept as strings.
+    """
     type_lookup = {}
     for field in schema:
         type_lookup[field["attributeKey"]] = field["dataType"]
@@ -96,57 +148,531 @@ def parse_entity_data(csv_path, schema):
             name_col = field["attributeKey"]
             break
 
-    entities = []
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    # Find the actual id column name (case-insensitive), or None if absent
+    id_col = None
+    for fn in header:
+        if fn.strip().lower() == "id":
+            id_col = fn.strip()
+            break
 
-        # Find the actual id column name (case-insensitive), or None if absent
-        id_col = None
-        if reader.fieldnames:
-            for fn in reader.fieldnames:
-                if fn.strip().lower() == "id":
-                    id_col = fn.strip()
-                    break
+    positions = {}
+    for idx, col in enumerate(header):
+        positions[col] = idx
+
+    columns = []
+    types = []
+    for col, idx in positions.items():
+        if col == name_col or col == id_col:
+            continue
+        # Use schema data type if known, otherwise keep as string
+        data_type = type_lookup.get(col, "STRING")
+        convert = CONVERTERS.get(data_type)
+        columns.append((col, idx, convert))
+        types.append(data_type)
+
+    return {
+        "name_idx": positions.get(name_col),
+        "id_idx": positions.get(id_col) if id_col else None,
+        "has_id": id_col is not None,
+        "width": len(header),
+        "columns": columns,
+        "types": types,
+    }
+
+
+def plan_keys(plan):
+    """Entity keys in output order: id, name, then every converted column."""
+    return ("id", "name") + tuple(col for col, _, _ in plan["columns"])
+
+
+def split_row(row, plan):
+    """Pad or trim a csv.reader row to the header width.
+
+    Returns (row, entity_id, entity_name, extra), with extra the surplus
+    cells (or None), or None for rows parse_entity_data skips.
+    """
+    width = plan["width"]
+    extra = None
+    n = len(row)
+    if n != width:
+        if not row:
+            return None  # DictReader skips blank lines
+        if n < width:
+            row = row + [""] * (width - n)
+        else:
+            extra = row[width:]
+
+    # Always keep id and name as strings
+    name_idx = plan["name_idx"]
+    entity_name = row[name_idx].strip() if name_idx is not None else ""
+    if plan["has_id"]:
+        id_idx = plan["id_idx"]
+        entity_id = row[id_idx].strip() if id_idx is not None else ""
+    else:
+        entity_id = entity_name
+
+    if not entity_id or not entity_name:
+        return None
+    return row, entity_id, entity_name, extra
 
-        for row in reader:
-            entity = {}
 
-            # Always keep id and name as strings
-            entity_name = row.get(name_col, "").strip()
-            entity_id = row.get(id_col, "").strip() if id_col else entity_name
+def iter_parsed_rows(rows, plan):
+    """Apply a compiled parse plan to csv.reader rows, yielding entity records."""
+    columns = plan["columns"]
+    for row in rows:
+        split = split_row(row, plan)
+        if split is None:
+            continue
+        row, entity_id, entity_name, extra = split
 
-            if not entity_id or not entity_name:
+        entity = {"id": entity_id, "name": entity_name}
+        for col, idx, convert in columns:
+            raw = row[idx]
+            if raw in NULL_VALUES:
                 continue
+            if convert is None:
+                entity[col] = raw.strip()
+            else:
+                value = convert(raw.strip())
+                if value is not None:
+                    entity[col] = value
+        if extra is not None:
+            # DictReader files surplus cells under a None key
+            entity[None] = str(extra)
+        yield entity
 
-            entity["id"] = entity_id
-            entity["name"] = entity_name
 
-            # Process all columns from the CSV
-            skip_cols = {name_col}
-            if id_col:
-                skip_cols.add(id_col)
-            for col, raw_val in row.items():
-                if col in skip_cols:
-                    continue
+def iter_parsed_batches(rows, plan, batch_size=PARSE_BATCH_ROWS):
+    """Apply a compiled parse plan to csv.reader rows, one batch of columns at a time.
+
+    Yields (converted, extras) per batch of up to batch_size rows: converted
+    holds one list per plan_keys() entry (None marks a missing value) and
+    extras maps a row's position in the batch to its surplus cells. This is
+    the input EntityTable.from_batches() takes.
+    """
+    columns = plan["columns"]
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        records = []
+        extras = {}
+        for row in batch:
+            split = split_row(row, plan)
+            if split is None:
+                continue
+            row, entity_id, entity_name, extra = split
+            record = [entity_id, entity_name]
+            for _, idx, convert in columns:
+                raw = row[idx]
+                if raw in NULL_VALUES:
+                    record.append(None)
+                elif convert is None:
+                    record.append(raw.strip())
+                else:
+                    record.append(convert(raw.strip()))
+            if extra is not None:
+                extras[len(records)] = extra
+            records.append(record)
+        if records:
+            yield [list(values) for values in zip(*records)], extras
+
+
+def parse_rows(rows, plan):
+    """Apply a compiled parse plan to csv.reader rows and return entity records."""
+    return list(iter_parsed_rows(rows, plan))
+
+
+def iter_entity_data(csv_path, schema):
+    """Stream entity records from an enriched CSV without materialising the list."""
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        plan = compile_parse_plan(header, schema)
+        yield from iter_parsed_rows(reader, plan)
+
 
-                # Use schema data type if known, otherwise keep as string
-                data_type = type_lookup.get(col, "STRING")
-                cleaned = clean_value(raw_val, data_type)
+def parse_entity_data(csv_path, schema, jobs=1):
+    """Read an enriched CSV and return entity records with all columns.
 
-                if cleaned is not None:
-                    entity[col] = cleaned
+    With jobs > 1, large files are split into byte ranges and parsed in a
+    process pool (see parse_entity_data_chunked); the records are identical.
+    """
+    if jobs > 1 and os.path.getsize(csv_path) >= CHUNK_MIN_BYTES:
+        entities = parse_entity_data_chunked(csv_path, schema, jobs)
+        if entities is not None:
+            return entities
+    return list(iter_entity_data(csv_path, schema))
 
-            entities.append(entity)
 
+def parse_entity_table(csv_path, schema):
+    """parse_entity_data() into a compact EntityTable instead of a list of dicts."""
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return EntityTable(("id", "name"), ("STRING", "STRING")).finish()
+        plan = compile_parse_plan(header, schema)
+        return EntityTable.from_batches(plan_keys(plan), ["STRING", "STRING"] + plan["types"],
+                                        iter_parsed_batches(reader, plan))
+
+
+# --- CHUNKED INGESTION ---
+
+# A quoted field as csv.writer/pandas write it: opens at the start of a field,
+# doubles embedded quotes and closes at the end of a field.
+QUOTED_FIELD = re.compile(rb'(?<![^,\r\n])"(?:[^"]|"")*"(?![^,\r\n])')
+
+
+def next_record_start(buf, pos, in_quotes=False):
+    """Offset just past the first newline at or after pos that ends a record.
+
+    Quote parity tells whether a newline sits inside a quoted field; that is
+    exact as long as every quote belongs to a well-formed quoted field, which
+    the workers check (chunk_is_well_quoted) before trusting a split.
+    Returns (offset, in_quotes) with in_quotes for the scanned prefix.
+    """
+    size = len(buf)
+    while pos < size:
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            return size, in_quotes
+        if buf[pos:nl].count(b'"') % 2:
+            in_quotes = not in_quotes
+        pos = nl + 1
+        if not in_quotes:
+            return pos, False
+    return size, in_quotes
+
+
+def split_record_ranges(buf, start, chunks):
+    """Split buf[start:] into up to `chunks` (begin, end) ranges on record boundaries."""
+    size = len(buf)
+    step = max((size - start) // chunks, 1)
+    ranges = []
+    begin = start
+    in_quotes = False
+    scanned = start
+    while begin < size:
+        target = begin + step
+        if target >= size:
+            ranges.append((begin, size))
+            break
+        # Carry quote parity forward from the end of the previous scan
+        if buf[scanned:target].count(b'"') % 2:
+            in_quotes = not in_quotes
+        end, in_quotes = next_record_start(buf, target, in_quotes)
+        scanned = end
+        ranges.append((begin, end))
+        begin = end
+    return ranges
+
+
+def chunk_is_well_quoted(data):
+    """True when every quote in data belongs to a complete, well-formed quoted field."""
+    return b'"' not in QUOTED_FIELD.sub(b"", data)
+
+
+def decode_rows(data):
+    """csv.reader rows from raw bytes, decoded exactly like open(path, encoding="utf-8")."""
+    return csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"))
+
+
+def parse_csv_chunk(csv_path, begin, end, header, schema):
+    """Worker: parse one byte range of csv_path; None if its quoting cannot be trusted."""
+    with open(csv_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        data = buf[begin:end]
+    if not chunk_is_well_quoted(data):
+        return None
+    return parse_rows(decode_rows(data), compile_parse_plan(header, schema))
+
+
+def parse_entity_data_chunked(csv_path, schema, jobs):
+    """Parse a CSV in record-aligned byte ranges across `jobs` processes.
+
+    The file is memory-mapped to find split points. Each worker parses its
+    range with the same compiled plan, and chunks are concatenated in file
+    order, so the output equals parse_entity_data(csv_path, schema). Returns
+    None (caller falls back to the serial parser) when a quote outside a
+    well-formed quoted field makes the split points unreliable.
+    """
+    with open(csv_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        header_end, _ = next_record_start(buf, 0)
+        header = next(decode_rows(buf[:header_end]), None)
+        if header is None:
+            return []
+        ranges = split_record_ranges(buf, header_end, jobs * CHUNKS_PER_JOB)
+
+    entities = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(parse_csv_chunk, csv_path, begin, end, header, schema) for begin, end in ranges]
+        for future in futures:
+            chunk = future.result()
+            if chunk is None:
+                for pending in futures:
+                    pending.cancel()
+                return None
+            entities.extend(chunk)
     return entities
 
 
-def main():
-    payload = {
-        "schemaConfig": {},
-        "categories": {},
-    }
+# --- BUILD CACHE ---
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def category_cache_key(schema_path, data_path, data_digest=None):
+    """Content hash of a category's inputs plus the parser version.
+
+    data_digest is the SHA-256 of the data file's bytes, for callers that
+    already hold them.
+    """
+    h = hashlib.sha256()
+    h.update(PARSER_VERSION.encode())
+    h.update(file_digest(schema_path).encode())
+    h.update((data_digest or file_digest(data_path)).encode())
+    return h.hexdigest()
+
+
+def load_cached_category(cat_key, cache_key):
+    """Return the cached {schema, entities} fragment for cat_key, or None if stale."""
+    path = os.path.join(CACHE_DIR, f"{cat_key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            fragment = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if fragment.get("key") != cache_key:
+        return None
+    return fragment
+
+
+def store_cached_category(cat_key, cache_key, schema, entities):
+    """Persist a parsed category fragment under its cache key."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"{cat_key}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"key": cache_key, "schema": schema, "entities": entities}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def build_category(cat_key, schema_path, data_path, use_cache=True, chunk_jobs=1):
+    """Parse one category, reusing the cached fragment when its inputs are unchanged.
+
+    Returns (schema, entities, cache_hit).
+    """
+    cache_key = category_cache_key(schema_path, data_path)
+    if use_cache:
+        fragment = load_cached_category(cat_key, cache_key)
+        if fragment is not None:
+            return fragment["schema"], fragment["entities"], True
+
+    schema = parse_schema_config(schema_path)
+    entities = parse_entity_data(data_path, schema, chunk_jobs)
+    store_cached_category(cat_key, cache_key, schema, entities)
+    return schema, entities, False
+
+
+def write_if_changed(path, text):
+    """Write text to path unless the file already holds exactly that content.
+
+    The new content goes to a temp file that is renamed over path, so readers
+    such as the Vite dev server never see a partially written file.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+# --- STREAMING OUTPUT ---
+
+def dump_json(obj, compact=False):
+    """Serialise like the gameData.json writer: indent=2, or compact separators."""
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def entity_texts(entities, compact=False):
+    """dump_json() of each entity; an EntityTable serialises its columns directly."""
+    if isinstance(entities, EntityTable):
+        return entities.iter_json(compact)
+    return (dump_json(entity, compact) for entity in entities)
+
+
+def write_payload_stream(f, schema_config, entity_streams, compact=False):
+    """Write a gameData payload to f one entity at a time.
+
+    schema_config is the (small) {cat_key: schema} mapping; entity_streams
+    yields (cat_key, iterable_of_entities or EntityTable). The bytes written
+    are identical to dump_json({"schemaConfig": ..., "categories": ...}, compact).
+    """
+    if compact:
+        f.write('{"schemaConfig":')
+        f.write(dump_json(schema_config, compact=True))
+        f.write(',"categories":{')
+        for i, (cat_key, entities) in enumerate(entity_streams):
+            f.write(("," if i else "") + dump_json(cat_key, compact=True) + ":[")
+            for j, text in enumerate(entity_texts(entities, compact=True)):
+                f.write(("," if j else "") + text)
+            f.write("]")
+        f.write("}}")
+        return
 
+    # indent=2 layout: categories at depth 2, entities at depth 3
+    f.write('{\n  "schemaConfig": ')
+    f.write(dump_json(schema_config).replace("\n", "\n  "))
+    f.write(',\n  "categories": {')
+    cat_count = 0
+    for cat_key, entities in entity_streams:
+        f.write(("," if cat_count else "") + "\n    " + dump_json(cat_key) + ": [")
+        entity_count = 0
+        for text in entity_texts(entities):
+            f.write(("," if entity_count else "") + "\n      ")
+            f.write(text.replace("\n", "\n      "))
+            entity_count += 1
+        f.write("\n    ]" if entity_count else "]")
+        cat_count += 1
+    f.write("\n  }\n}" if cat_count else "}\n}")
+
+
+def iter_reported_entities(cat_key, data_path, schema):
+    """iter_entity_data with the same per-category progress report as build_all."""
+    print(f"Processing {cat_key}...")
+    start = time.perf_counter()
+    count = 0
+    for entity in iter_entity_data(data_path, schema):
+        count += 1
+        yield entity
+    print(f"Processed {cat_key} in {time.perf_counter() - start:.3f}s")
+    print(f"  Schema: {len(schema)} fields")
+    print(f"  Entities: {count} records (streamed)")
+
+
+def stream_build(tasks, output_file, compact=False):
+    """Parse and write every category without holding its entities in memory.
+
+    Schemas are parsed up front (they precede categories in the output);
+    entities are streamed from each CSV straight into a temp file that
+    replaces output_file only if its content changed. The build cache is
+    bypassed because cached fragments are whole-category. Returns True if
+    output_file was rewritten.
+    """
+    schema_config = {}
+    for cat_key, schema_path, _ in tasks:
+        schema_config[cat_key] = parse_schema_config(schema_path)
+
+    def category_streams():
+        for cat_key, _, data_path in tasks:
+            yield cat_key, iter_reported_entities(cat_key, data_path, schema_config[cat_key])
+
+    return write_stream_if_changed(output_file, schema_config, category_streams(), compact)
+
+
+def write_stream_if_changed(output_file, schema_config, entity_streams, compact=False):
+    """write_payload_stream() into a temp file that replaces output_file only if it changed."""
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    tmp_path = output_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write_payload_stream(f, schema_config, entity_streams, compact)
+
+    if os.path.exists(output_file) and file_digest(output_file) == file_digest(tmp_path):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, output_file)
+    return True
+
+
+def build_tables(tasks):
+    """Parse every category into an EntityTable; returns {cat_key: (schema, table)}.
+
+    The build cache is bypassed: its fragments hold entity dicts.
+    """
+    built = {}
+    for cat_key, schema_path, data_path in tasks:
+        print(f"Processing {cat_key}...")
+        start = time.perf_counter()
+        schema = parse_schema_config(schema_path)
+        table = parse_entity_table(data_path, schema)
+        report_category(cat_key, schema, table, False, time.perf_counter() - start)
+        print(f"  Typed columns: ~{table.nbytes() / 1e6:.1f} MB")
+        built[cat_key] = (schema, table)
+    return built
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- SHARDED OUTPUT ---
+
+def write_shards(built, shard_dir=SHARD_DIR):
+    """Write one compact JSON file per category plus a manifest for lazy loading.
+
+    Each shard holds {"schemaConfig": [...], "entities": [...]} for a single
+    category. The manifest lists, in CATEGORY_MAP order, every shard's file
+    name, field/entity counts and the SHA-256 of its bytes so clients can
+    fetch only the active category and skip unchanged ones.
+    """
+    manifest = {"categories": {}}
+    for cat_key, (schema, entities) in built.items():
+        file_name = f"{cat_key}.json"
+        # json.dumps({"schemaConfig": ..., "entities": ...}) compact, one entity at a time
+        text = ('{"schemaConfig":' + dump_json(schema, compact=True) + ',"entities":['
+                + ",".join(entity_texts(entities, compact=True)) + "]}")
+        write_if_changed(os.path.join(shard_dir, file_name), text)
+        manifest["categories"][cat_key] = {
+            "file": file_name,
+            "fields": len(schema),
+            "entities": len(entities),
+            "bytes": len(text.encode("utf-8")),
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        }
+
+    write_if_changed(os.path.join(shard_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    return manifest
+
+
+def build_category_timed(cat_key, schema_path, data_path, use_cache=True, chunk_jobs=1):
+    """build_category plus wall time; top-level so a process pool can pickle it."""
+    start = time.perf_counter()
+    schema, entities, cache_hit = build_category(cat_key, schema_path, data_path, use_cache, chunk_jobs)
+    return schema, entities, cache_hit, time.perf_counter() - start
+
+
+def report_category(cat_key, schema, entities, cache_hit, elapsed):
+    print(f"Processed {cat_key} in {elapsed:.3f}s")
+    if cache_hit:
+        print("  Unchanged — using cached fragment")
+    print(f"  Schema: {len(schema)} fields")
+    print(f"  Entities: {len(entities)} records")
+
+
+def collect_categories():
+    """Resolve CATEGORY_MAP to (cat_key, schema_path, data_path), skipping missing files."""
+    tasks = []
     for cat_key, files in CATEGORY_MAP.items():
         schema_path = os.path.join(DATA_DIR, files["schema"])
         data_path = os.path.join(DATA_DIR, files["data"])
@@ -158,24 +684,480 @@ def main():
             print(f"  Warning: Data file not found: {data_path}. Skipping {cat_key}.")
             continue
 
-        print(f"Processing {cat_key}...")
+        tasks.append((cat_key, schema_path, data_path))
+    return tasks
 
-        # Parse schema
-        schema = parse_schema_config(schema_path)
-        payload["schemaConfig"][cat_key] = schema
+
+def build_all(tasks, use_cache=True, jobs=1, chunk_jobs=1):
+    """Build every category and return {cat_key: (schema, entities)} in task order.
+
+    With jobs > 1 categories are parsed concurrently in a process pool and
+    reported as they finish; the result is still ordered like CATEGORY_MAP so
+    the JSON output is byte-identical to the serial path.
+    """
+    results = {}
+    if jobs <= 1 or len(tasks) <= 1:
+        for cat_key, schema_path, data_path in tasks:
+            print(f"Processing {cat_key}...")
+            schema, entities, cache_hit, elapsed = build_category_timed(
+                cat_key, schema_path, data_path, use_cache, chunk_jobs
+            )
+            report_category(cat_key, schema, entities, cache_hit, elapsed)
+            results[cat_key] = (schema, entities)
+    else:
+        workers = min(jobs, len(tasks))
+        print(f"Processing {len(tasks)} categories with {workers} workers...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(build_category_timed, cat_key, schema_path, data_path, use_cache): cat_key
+                for cat_key, schema_path, data_path in tasks
+            }
+            for future in as_completed(futures):
+                cat_key = futures[future]
+                schema, entities, cache_hit, elapsed = future.result()
+                report_category(cat_key, schema, entities, cache_hit, elapsed)
+                results[cat_key] = (schema, entities)
+
+    return {cat_key: results[cat_key] for cat_key, _, _ in tasks}
+
+
+# --- PROFILING ---
+
+def read_csv_rows(csv_path):
+    """Read every row of a CSV, header included, without converting values."""
+    with open(csv_path, "r", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def parse_csv_rows(rows, schema):
+    """parse_entity_data over rows already read by read_csv_rows."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return []
+    return parse_rows(rows, compile_parse_plan(header, schema))
+
+
+def build_all_profiled(tasks, profiler):
+    """build_all with the cache bypassed and each stage run through the profiler."""
+    built = {}
+    for cat_key, schema_path, data_path in tasks:
+        print(f"Profiling {cat_key}...")
+        schema = profiler.run(
+            cat_key, "schema", parse_schema_config, schema_path,
+            rows=len, bytes_read=os.path.getsize(schema_path),
+        )
+        rows = profiler.run(
+            cat_key, "read", read_csv_rows, data_path,
+            rows=lambda r: max(len(r) - 1, 0), bytes_read=os.path.getsize(data_path),
+        )
+        entities = profiler.run(cat_key, "clean", parse_csv_rows, rows, schema, rows=len)
         print(f"  Schema: {len(schema)} fields")
+        print(f"  Entities: {len(entities)} records")
+        built[cat_key] = (schema, entities)
+    return built
+
+
+def profile_outputs(args, built, payload, profiler):
+    """Serialise and write through the profiler; returns True if gameData.json changed."""
+    total = sum(len(entities) for _, entities in built.values())
+    text = profiler.run(
+        "all", "serialize", dump_json, payload, args.compact,
+        rows=total, bytes_written=lambda t: len(t.encode("utf-8")),
+    )
+    size = len(text.encode("utf-8"))
+    changed = profiler.run(
+        "all", "write", write_if_changed, OUTPUT_FILE, text,
+        rows=total, bytes_written=lambda changed: size if changed else 0,
+    )
+    if wants_extra_outputs(args):
+        profiler.run("all", "extras", write_extra_outputs, args, built, payload, text, rows=total)
+    return changed
+
+
+def finish_profile(args, profiler):
+    report = profiler.report()
+    profiling.print_report(report)
+    if args.cprofile:
+        record = profiler.dump_hottest(args.cprofile)
+        if record:
+            report["cprofile"] = {"path": args.cprofile, "category": record["category"], "stage": record["stage"]}
+            print(f"  cProfile of {record['category']} / {record['stage']} saved to: {args.cprofile}")
+    profiling.write_report(report, args.profile)
+    print(f"Profile report saved to: {args.profile}")
+
+
+def write_outputs(args, built, payload, text=None):
+    """Write gameData.json plus every optional output requested on the command line.
+
+    text is the already serialised payload, if the caller has it.
+    Returns True if gameData.json changed.
+    """
+    if text is None:
+        text = dump_json(payload, compact=args.compact)
+    changed = write_if_changed(OUTPUT_FILE, text)
+    write_extra_outputs(args, built, payload, text)
+    return changed
+
 
-        # Parse entity data
-        entities = parse_entity_data(data_path, schema)
+def wants_extra_outputs(args):
+    return (args.shard or args.columnar or args.distances or args.stats or args.search or args.ranks
+            or args.neighbors or args.map or args.artifacts
+            or args.patches)
+
+
+def shard_only(args):
+    """True when --shard is the only extra output requested."""
+    return not (args.columnar or args.distances or args.stats or args.search or args.ranks
+                or args.neighbors or args.map or args.artifacts or args.patches)
+
+
+def write_extra_outputs(args, built, payload, text):
+    """Write the optional --shard/--columnar/--distances/--stats/--search/--ranks/--neighbors/--map outputs.
+
+    With --artifacts, gameData.json and every file written here are then
+    published as content-hashed, pre-compressed copies. With --patches,
+    gameData.json becomes the latest release of the patch chain.
+    """
+    outputs = []
+    if args.shard:
+        manifest = write_shards(built)
+        for cat_key, entry in manifest["categories"].items():
+            print(f"  Shard: {entry['file']} ({entry['entities']} records, {entry['bytes']:,} bytes)")
+            outputs.append(os.path.join(SHARD_DIR, entry["file"]))
+        print(f"Shards + {MANIFEST_FILE} saved to: {SHARD_DIR}")
+
+    if args.columnar:
+        # Round-trip through JSON so the encoder sees exactly what clients load
+        encoded = columnar.encode_payload(json.loads(text))
+        columnar_text = columnar.dumps_compact(encoded)
+        decoded = columnar.decode_payload(json.loads(columnar_text))
+        if dump_json(decoded, compact=args.compact) != text:
+            raise ValueError(f"columnar payload does not decode to {OUTPUT_FILE}")
+        write_if_changed(COLUMNAR_FILE, columnar_text)
+        outputs.append(COLUMNAR_FILE)
+        print(f"Columnar payload saved to: {COLUMNAR_FILE} (decodes to {os.path.basename(OUTPUT_FILE)} exactly)")
+
+    if args.distances:
+        from pipeline import distances  # numpy is only needed for this stage
+
+        for cat_key, (path, count) in distances.build_distance_matrices(payload, SHARD_DIR).items():
+            print(f"  Distances: {cat_key} {count}×{count} uint16 matrix (parity with geo.ts OK) → {path}")
+            outputs.append(path)
+
+    if args.stats:
+        from pipeline import column_stats  # numpy is only needed for this stage
+
+        stats = column_stats.build_stats(payload)
+        write_if_changed(STATS_FILE, json.dumps(stats, indent=2))
+        outputs.append(STATS_FILE)
+        for cat_key, cat in stats["categories"].items():
+            eligible = [k for k, col in cat["columns"].items() if col["eligible"]["continuum"]]
+            print(f"  Stats: {cat_key} {len(cat['columns'])} columns, Continuum-eligible: {', '.join(eligible)}")
+        print(f"Column stats saved to: {STATS_FILE}")
+
+    if args.search:
+        for cat_key, (path, count, grams) in search_index.build_search_indexes(payload, SHARD_DIR).items():
+            print(f"  Search index: {cat_key} {count} entities, {grams:,} postings "
+                  f"(parity with getSuggestions OK) → {path}")
+            outputs.append(path)
+
+    if args.ranks:
+        for cat_key, (path, tables) in continuum_ranks.build_rank_indexes(payload, SHARD_DIR).items():
+            continuum_ranks.print_ties(payload, cat_key, tables)
+            outputs.append(path)
+        print(f"Continuum rank tables saved to: {SHARD_DIR}")
+
+    if args.neighbors:
+        from pipeline import similarity  # numpy is only needed for this stage
+
+        for cat_key, (path, count, fields) in similarity.build_neighbor_indexes(payload, SHARD_DIR).items():
+            print(f"  Neighbours: {cat_key} top {similarity.DEFAULT_K} of {count} entities over {fields} fields "
+                  f"(sampled rows match the pairwise reference) → {path}")
+            outputs.append(path)
+
+    if args.map:
+        from pipeline import world_map  # numpy is only needed for this stage
+
+        path, stats = world_map.write_world_map(payload, SHARD_DIR)
+        world_map.print_stats(path, stats)
+        outputs.append(path)
+
+    if args.artifacts:
+        sources = {os.path.basename(OUTPUT_FILE): text.encode("utf-8")}
+        for path in outputs:
+            with open(path, "rb") as f:
+                sources[os.path.basename(path)] = f.read()
+        manifest = artifacts.publish_artifacts(sources, SHARD_DIR)
+        for logical_name in sources:
+            entry = manifest["artifacts"][logical_name]
+            sizes = ", ".join(f"{enc} {e['bytes']:,}" for enc, e in entry["encodings"].items())
+            print(f"  Artifact: {logical_name} → {entry['file']} ({entry['bytes']:,} bytes; {sizes})")
+        print(f"Hashed artifacts + {artifacts.MANIFEST_NAME} saved to: {SHARD_DIR}")
+
+    if args.patches:
+        entry = delta.publish_patch(text, SHARD_DIR)
+        if entry:
+            print(f"  Patch: {entry['from']} → {entry['to']} {entry['bytes']:,} bytes "
+                  f"(full payload {entry['fullBytes']:,}; reproduces it byte for byte) → {entry['file']}")
+        print(f"Release {delta.release_id(text)} + {delta.MANIFEST_NAME} saved to: {SHARD_DIR}")
+
+
+def assemble_payload(built):
+    payload = {
+        "schemaConfig": {},
+        "categories": {},
+    }
+    for cat_key, (schema, entities) in built.items():
+        payload["schemaConfig"][cat_key] = schema
         payload["categories"][cat_key] = entities
-        print(f"  Entities: {len(entities)} records")
+    return payload
+
+
+# --- WATCH MODE ---
+
+def input_state(path):
+    """Cheap change probe: (mtime_ns, size) of a file."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def poll_changed_categories(files, states, digests):
+    """Return {cat_key: [paths]} whose content changed since the last poll.
+
+    Files are only hashed when their mtime or size moved, and a touched but
+    byte-identical file (e.g. an editor re-save) does not count as a change.
+    """
+    dirty = {}
+    for path, cat_key in files.items():
+        try:
+            state = input_state(path)
+        except OSError:
+            continue  # mid-save by an editor that replaces the file
+        if state == states[path]:
+            continue
+        states[path] = state
+        digest = file_digest(path)
+        if digest != digests[path]:
+            digests[path] = digest
+            dirty.setdefault(cat_key, []).append(path)
+    return dirty
+
+
+def watch(tasks, built, args):
+    """Poll the inputs of every category and rebuild only the ones that changed.
+
+    Parsed categories stay in memory, so a change costs one CSV parse plus
+    re-serialising the payload; outputs are replaced atomically.
+    """
+    task_by_cat = {cat_key: (schema_path, data_path) for cat_key, schema_path, data_path in tasks}
+    files = {path: cat_key for cat_key, paths in task_by_cat.items() for path in paths}
+    states = {path: input_state(path) for path in files}
+    digests = {path: file_digest(path) for path in files}
+
+    print(f"\nWatching {len(files)} input files every {args.interval}s (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(args.interval)
+            dirty = poll_changed_categories(files, states, digests)
+            if not dirty:
+                continue
+
+            start = time.perf_counter()
+            rebuilt = []
+            for cat_key, paths in dirty.items():
+                names = ", ".join(os.path.basename(p) for p in paths)
+                try:
+                    schema, entities, _ = build_category(
+                        cat_key, *task_by_cat[cat_key], chunk_jobs=args.chunk_jobs
+                    )
+                except Exception as e:  # keep watching; the previous output stays in place
+                    print(f"[watch] {cat_key}: rebuild failed after editing {names}: {e}")
+                    continue
+                built[cat_key] = (schema, entities)
+                rebuilt.append(f"{cat_key} ({names}, {len(entities)} records)")
+            if not rebuilt:
+                continue
+            parsed = time.perf_counter()
+
+            changed = write_outputs(args, built, assemble_payload(built))
+            done = time.perf_counter()
+            status = "written" if changed else "unchanged"
+            print(
+                f"[watch] Rebuilt {'; '.join(rebuilt)} in {(done - start) * 1000:.1f} ms "
+                f"(parse {(parsed - start) * 1000:.1f} ms, write {(done - parsed) * 1000:.1f} ms) "
+                f"— {OUTPUT_FILE} {status}"
+            )
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build gameData.json from the CSVs in data/.")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help=f"Ignore the per-category build cache in {CACHE_DIR} and re-parse every CSV.",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, metavar="N",
+        help="Parse up to N categories in parallel worker processes (default: 1, serial).",
+    )
+    parser.add_argument(
+        "--chunk-jobs", type=int, default=1, metavar="N",
+        help="Split each enriched CSV of at least "
+             f"{CHUNK_MIN_BYTES >> 20} MB into record-aligned byte ranges and parse them in N worker "
+             "processes; output is identical to the serial parser (default: 1, serial).",
+    )
+    parser.add_argument(
+        "--shard", action="store_true",
+        help=f"Also write one JSON file per category plus {MANIFEST_FILE} to {SHARD_DIR}.",
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="Write gameData.json without indentation or spaces after separators.",
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Stream entities from each CSV straight to disk with bounded memory "
+             "(bypasses the build cache; not combinable with --jobs/--shard/--columnar).",
+    )
+    parser.add_argument(
+        "--typed", action="store_true",
+        help="Hold each category as typed column arrays (pipeline/entity_table.py) instead of one "
+             "dict per entity and serialise from them; same output, a fraction of the memory "
+             "(bypasses the build cache; only combinable with --shard and --compact).",
+    )
+    parser.add_argument(
+        "--columnar", action="store_true",
+        help=f"Also write the compact columnar, dictionary-encoded payload to {COLUMNAR_FILE}.",
+    )
+    parser.add_argument(
+        "--distances", action="store_true",
+        help=f"Also write a verified uint16 capital-to-capital distance matrix to {SHARD_DIR} "
+             "for every category with a GEO_DISTANCE field (requires numpy).",
+    )
+    parser.add_argument(
+        "--stats", action="store_true",
+        help=f"Also write per-column coverage/uniqueness/quantile/tie statistics and "
+             f"Continuum eligibility for every category to {STATS_FILE} (requires numpy).",
+    )
+    parser.add_argument(
+        "--search", action="store_true",
+        help=f"Also write a verified n-gram autocompletion index per category to {SHARD_DIR}.",
+    )
+    parser.add_argument(
+        "--ranks", action="store_true",
+        help=f"Also write verified Continuum rank tables (sorted order, entity→rank, tie groups) "
+             f"for every CONTINUUM_METRICS attribute to {SHARD_DIR}, listing each tie group.",
+    )
+    parser.add_argument(
+        "--neighbors", action="store_true",
+        help=f"Also write a k-nearest-neighbour similarity index over the HIGHER_LOWER and "
+             f"CATEGORY_MATCH columns of every category to {SHARD_DIR} (requires numpy).",
+    )
+    parser.add_argument(
+        "--map", action="store_true",
+        help=f"Also write the simplified, quantized world map keyed by country id, with bounding "
+             f"boxes and centroids, to {SHARD_DIR}; map shapes that match no country fail the build "
+             "(requires numpy).",
+    )
+    parser.add_argument(
+        "--artifacts", action="store_true",
+        help=f"Also publish gameData.json and the other outputs of this run to {SHARD_DIR} as "
+             f"content-hashed files with gzip/zlib level-9 variants, listed in {artifacts.MANIFEST_NAME}.",
+    )
+    parser.add_argument(
+        "--patches", action="store_true",
+        help=f"Also diff gameData.json against the previous release and write an entity-level patch "
+             f"plus the version chain ({delta.MANIFEST_NAME}) to {SHARD_DIR}.",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="After building, keep polling the input CSVs and rebuild only the categories "
+             "whose content changed, logging the latency of each rebuild.",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=0.2, metavar="SECONDS",
+        help="Polling interval for --watch (default: 0.2).",
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const=PROFILE_FILE, metavar="PATH",
+        help="Re-parse every category (bypassing the cache) and record wall time, rows/s, bytes "
+             "read/written and tracemalloc peak per category and stage; the JSON report goes "
+             f"to PATH (default: {PROFILE_FILE}).",
+    )
+    parser.add_argument(
+        "--cprofile", metavar="PATH",
+        help="With --profile, re-run the hottest stage under cProfile and save the stats to PATH.",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs > 1 and args.chunk_jobs > 1:
+        parser.error("use either --jobs (categories in parallel) or --chunk-jobs (chunks of one CSV)")
+    if args.stream and args.chunk_jobs > 1:
+        parser.error("--stream parses each CSV lazily in order; drop --chunk-jobs")
+    if args.cprofile and not args.profile:
+        parser.error("--cprofile needs --profile")
+    if args.profile and (args.stream or args.jobs > 1 or args.chunk_jobs > 1):
+        parser.error("--profile measures one stage at a time; drop --stream/--jobs/--chunk-jobs")
+    if args.stream and (args.jobs > 1 or wants_extra_outputs(args)):
+        parser.error("--stream writes gameData.json only; drop --jobs and the extra output flags")
+    if args.stream and args.watch:
+        parser.error("--watch keeps parsed categories in memory; it cannot be combined with --stream")
+    if args.typed and (args.stream or args.watch or args.profile or args.jobs > 1 or args.chunk_jobs > 1):
+        parser.error("--typed is a serial build of its own; drop --stream/--watch/--profile/--jobs/--chunk-jobs")
+    if args.typed and not shard_only(args):
+        parser.error("--typed writes gameData.json and --shard only; drop the other extra output flags")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.stream:
+        start = time.perf_counter()
+        changed = stream_build(collect_categories(), OUTPUT_FILE, compact=args.compact)
+        status = f"Data saved to: {OUTPUT_FILE}" if changed else f"{OUTPUT_FILE} is already up to date."
+        print(f"\nDone in {time.perf_counter() - start:.3f}s! {status}")
+        print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+        return
+
+    if args.typed:
+        start = time.perf_counter()
+        built = build_tables(collect_categories())
+        schema_config = {cat_key: schema for cat_key, (schema, _) in built.items()}
+        tables = ((cat_key, table) for cat_key, (_, table) in built.items())
+        changed = write_stream_if_changed(OUTPUT_FILE, schema_config, tables, compact=args.compact)
+        if args.shard:
+            # --shard reads only `built`; the other outputs need a dict payload
+            write_extra_outputs(args, built, None, None)
+        status = f"Data saved to: {OUTPUT_FILE}" if changed else f"{OUTPUT_FILE} is already up to date."
+        print(f"\nDone in {time.perf_counter() - start:.3f}s! {status}")
+        print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+        return
+
+    start = time.perf_counter()
+    tasks = collect_categories()
+    if args.profile:
+        profiler = profiling.StageProfiler()
+        built = build_all_profiled(tasks, profiler)
+        payload = assemble_payload(built)
+        changed = profile_outputs(args, built, payload, profiler)
+    else:
+        built = build_all(tasks, use_cache=not args.no_cache, jobs=args.jobs, chunk_jobs=args.chunk_jobs)
+        payload = assemble_payload(built)
+        # Write output (skipped when the assembled payload is byte-identical)
+        changed = write_outputs(args, built, payload)
+
+    if changed:
+        print(f"\nDone in {time.perf_counter() - start:.3f}s! Data saved to: {OUTPUT_FILE}")
+    else:
+        print(f"\nDone in {time.perf_counter() - start:.3f}s! {OUTPUT_FILE} is already up to date.")
 
-    # Write output
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+    if args.profile:
+        finish_profile(args, profiler)
 
-    print(f"\nDone! Data saved to: {OUTPUT_FILE}")
+    if args.watch:
+        watch(tasks, built, args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Build stages and output formats used by fetch_data.py."""
@@ -0,0 +1,211 @@
+"""
+artifacts.py
+────────────
+Content-addressed, pre-compressed copies of the build outputs.
+
+Each artifact is published as
+
+    <stem>.<hash><ext>        identity bytes
+    <stem>.<hash><ext>.gz     gzip, level 9 (Content-Encoding: gzip)
+    <stem>.<hash><ext>.zz     zlib, level 9 (Content-Encoding: deflate)
+
+where <hash> is the first HASH_CHARS hex digits of the SHA-256 of the
+identity bytes. A hashed name never changes content, so these files can be
+served with `Cache-Control: public, max-age=31536000, immutable`, and a host
+can send the .gz/.zz bytes as-is instead of compressing per request. The
+gzip header carries no timestamp or file name, so identical inputs always
+produce identical files.
+
+The manifest (artifacts.json, fixed name, short cache) maps logical names to
+the current hashed files:
+
+    {
+      "version": 1,
+      "artifacts": {
+        "gameData.json": {
+          "file": "gameData.1a2b3c4d5e6f7a8b.json",
+          "bytes": 357581,
+          "sha256": "1a2b...",
+          "encodings": {
+            "gzip":    {"file": "gameData.1a2b3c4d5e6f7a8b.json.gz", "bytes": 31544},
+            "deflate": {"file": "gameData.1a2b3c4d5e6f7a8b.json.zz", "bytes": 31532}
+          },
+          "previous": ["gameData.9f8e7d6c5b4a3f2e.json", ...]
+        }
+      }
+    }
+
+A client that loaded an older page or a cached manifest may still ask for
+a superseded hash, and it was told those files never change. So the last
+KEEP_GENERATIONS superseded files of each logical name stay published
+("previous", newest first, each with its .gz/.zz variants). Only files
+that fall off that list are deleted. load_artifact() is the reference
+reader; it decodes any encoding and checks the SHA-256.
+
+Usage (from the repo root):
+    python -m pipeline.artifacts src/assets/data/gameData.json --out public/data
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import zlib
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "artifacts.json"
+HASH_CHARS = 16
+LEVEL = 9
+
+# Superseded generations of each artifact kept for clients with an older manifest
+KEEP_GENERATIONS = 5
+
+# encoding → (file suffix, compressor)
+ENCODINGS = {
+    "gzip": (".gz", lambda data: gzip.compress(data, LEVEL, mtime=0)),
+    "deflate": (".zz", lambda data: zlib.compress(data, LEVEL)),
+}
+DECODERS = {
+    "identity": lambda data: data,
+    "gzip": gzip.decompress,
+    "deflate": zlib.decompress,
+}
+
+
+def hashed_name(logical_name, digest):
+    stem, ext = os.path.splitext(logical_name)
+    return f"{stem}.{digest[:HASH_CHARS]}{ext}"
+
+
+def hashed_pattern(logical_name):
+    """Matches every hashed file (any encoding) published for logical_name."""
+    stem, ext = os.path.splitext(logical_name)
+    suffixes = "|".join(re.escape(s) for s, _ in ENCODINGS.values())
+    return re.compile(rf"{re.escape(stem)}\.[0-9a-f]{{{HASH_CHARS}}}{re.escape(ext)}(?:{suffixes})?")
+
+
+def write_once(path, data):
+    """Write data unless path exists; a hashed name implies identical content."""
+    if os.path.exists(path):
+        return False
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def publish_artifact(logical_name, data, out_dir):
+    """Write the identity and compressed variants of one artifact; return its manifest entry."""
+    digest = hashlib.sha256(data).hexdigest()
+    file_name = hashed_name(logical_name, digest)
+    write_once(os.path.join(out_dir, file_name), data)
+
+    encodings = {}
+    for encoding, (suffix, compress) in ENCODINGS.items():
+        variant = file_name + suffix
+        path = os.path.join(out_dir, variant)
+        if not os.path.exists(path):
+            write_once(path, compress(data))
+        encodings[encoding] = {"file": variant, "bytes": os.path.getsize(path)}
+
+    return {"file": file_name, "bytes": len(data), "sha256": digest, "encodings": encodings}
+
+
+def retained_generations(old_entry, entry, keep=KEEP_GENERATIONS):
+    """The superseded identity files to keep after entry replaces old_entry, newest first."""
+    if old_entry is None:
+        return []
+    previous = list(old_entry.get("previous", []))
+    if old_entry["file"] != entry["file"]:
+        previous.insert(0, old_entry["file"])
+    return [name for name in previous if name != entry["file"]][:keep]
+
+
+def prune_stale(out_dir, logical_name, entry):
+    """Delete hashed files of logical_name that entry references neither as current nor as previous."""
+    keep = {entry["file"], *(e["file"] for e in entry["encodings"].values())}
+    for name in entry.get("previous", []):
+        keep.update([name, *(name + suffix for suffix, _ in ENCODINGS.values())])
+    pattern = hashed_pattern(logical_name)
+    removed = []
+    for name in os.listdir(out_dir):
+        if pattern.fullmatch(name) and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+            removed.append(name)
+    return removed
+
+
+def publish_artifacts(sources, out_dir):
+    """Publish {logical_name: bytes} into out_dir and write the manifest.
+
+    Entries for other logical names already in the manifest are kept, so
+    separate builds can publish separate outputs. Returns the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError
+    except (OSError, ValueError):
+        manifest = {"version": FORMAT_VERSION, "artifacts": {}}
+
+    for logical_name, data in sources.items():
+        entry = publish_artifact(logical_name, data, out_dir)
+        entry["previous"] = retained_generations(manifest["artifacts"].get(logical_name), entry)
+        prune_stale(out_dir, logical_name, entry)
+        manifest["artifacts"][logical_name] = entry
+    manifest["artifacts"] = dict(sorted(manifest["artifacts"].items()))
+
+    text = json.dumps(manifest, indent=2) + "\n"
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            unchanged = f.read() == text
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def load_artifact(out_dir, logical_name, encoding="identity"):
+    """Read an artifact through the manifest, decode it and verify its hash."""
+    with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        entry = json.load(f)["artifacts"][logical_name]
+    file_name = entry["file"] if encoding == "identity" else entry["encodings"][encoding]["file"]
+    with open(os.path.join(out_dir, file_name), "rb") as f:
+        data = DECODERS[encoding](f.read())
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise ValueError(f"{file_name}: content does not match the manifest hash")
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="Files to publish under their base names")
+    parser.add_argument("--out", default="./public/data", help="Output directory (default: ./public/data)")
+    args = parser.parse_args(argv)
+
+    sources = {}
+    for path in args.files:
+        with open(path, "rb") as f:
+            sources[os.path.basename(path)] = f.read()
+    manifest = publish_artifacts(sources, args.out)
+    for logical_name in sources:
+        entry = manifest["artifacts"][logical_name]
+        for encoding in ("identity", *entry["encodings"]):
+            load_artifact(args.out, logical_name, encoding)
+        sizes = ", ".join(f"{enc} {e['bytes']:,}" for enc, e in entry["encodings"].items())
+        print(f"{logical_name} → {entry['file']} ({entry['bytes']:,} bytes; {sizes})")
+    print(f"Manifest: {os.path.join(args.out, MANIFEST_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
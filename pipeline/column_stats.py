@@ -0,0 +1,168 @@
+"""
+column_stats.py
+───────────────
+Per-column statistics for every schema field of a category, computed in one
+pass over the parsed entities and vectorised with NumPy:
+
+  coverage       share of entities with a value (absent keys are nulls)
+  distinctRatio  distinct values / present values ("uniqueness")
+  min/max        and quantiles, for numeric columns
+  ties           groups of entities sharing a value, and the largest one
+  top            most common values, for non-numeric columns
+
+Each column also gets the eligibility verdicts that continuumConfig.ts
+documents: a Continuum metric must be numeric and continuous with >65%
+uniqueness and >70% coverage; a HIGHER_LOWER field needs numeric values.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.column_stats
+"""
+
+import json
+import sys
+
+import numpy as np
+
+from pipeline.daily_schedule import load_continuum_metrics
+
+GAME_DATA_FILE = "./src/assets/data/gameData.json"
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+TOP_VALUES = 5
+
+# Thresholds from the header comment of src/utils/continuumConfig.ts
+CONTINUUM_MIN_UNIQUENESS = 0.65
+CONTINUUM_MIN_COVERAGE = 0.70
+
+NUMERIC_TYPES = frozenset(("INT", "FLOAT", "CURRENCY"))
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def collect_columns(entities, keys):
+    """Gather the present values of every key in a single pass over the entities."""
+    columns = {key: [] for key in keys}
+    for entity in entities:
+        for key, value in entity.items():
+            column = columns.get(key)
+            if column is not None and value is not None:
+                column.append(value)
+    return columns
+
+
+def tie_stats(counts):
+    tied = counts[counts > 1]
+    return {
+        "groups": int(tied.size),
+        "entities": int(tied.sum()),
+        "largest": int(counts.max()) if counts.size else 0,
+    }
+
+
+def numeric_stats(values):
+    arr = np.asarray(values, dtype=np.float64)
+    arr = arr[np.isfinite(arr)]
+    if arr.size == 0:
+        return {}
+    _, counts = np.unique(arr, return_counts=True)
+    return {
+        "distinct": int(counts.size),
+        "min": float(arr.min()),
+        "max": float(arr.max()),
+        "quantiles": dict(zip((f"p{round(q * 100)}" for q in QUANTILES),
+                              np.quantile(arr, QUANTILES).tolist())),
+        "ties": tie_stats(counts),
+    }
+
+
+def categorical_stats(values):
+    labels, counts = np.unique(np.asarray([str(v) for v in values], dtype=str), return_counts=True)
+    order = np.argsort(-counts, kind="stable")[:TOP_VALUES]
+    return {
+        "distinct": int(labels.size),
+        "ties": tie_stats(counts),
+        "top": [[str(labels[i]), int(counts[i])] for i in order],
+    }
+
+
+def column_stats(field, values, n_entities):
+    """Stats and eligibility for one schema field given its present values."""
+    numeric = field["dataType"] in NUMERIC_TYPES and all(map(is_number, values))
+    stats = {
+        "dataType": field["dataType"],
+        "logicType": field["logicType"],
+        "present": len(values),
+        "coverage": len(values) / n_entities if n_entities else 0.0,
+        "distinctRatio": 0.0,
+        "distinct": 0,
+    }
+    if values:
+        stats.update(numeric_stats(values) if numeric else categorical_stats(values))
+        stats["distinctRatio"] = stats["distinct"] / len(values)
+
+    continuous = numeric and field.get("displayFormat") != "ALPHA_POSITION"
+    stats["eligible"] = {
+        "continuum": bool(
+            continuous
+            and stats["distinctRatio"] > CONTINUUM_MIN_UNIQUENESS
+            and stats["coverage"] > CONTINUUM_MIN_COVERAGE
+        ),
+        "higherLower": bool(numeric and stats["distinct"] > 1),
+    }
+    return stats
+
+
+def category_stats(schema, entities):
+    """{attributeKey: stats} for every schema field, in schema order."""
+    keys = [field["attributeKey"] for field in schema]
+    columns = collect_columns(entities, keys)
+    return {
+        field["attributeKey"]: column_stats(field, columns[field["attributeKey"]], len(entities))
+        for field in schema
+    }
+
+
+def build_stats(payload):
+    """Stats for every category of a gameData payload."""
+    return {
+        "categories": {
+            cat_key: {
+                "entities": len(entities),
+                "columns": category_stats(payload["schemaConfig"][cat_key], entities),
+            }
+            for cat_key, entities in payload["categories"].items()
+        }
+    }
+
+
+def print_audit(stats, continuum_metrics=None):
+    """Print the Continuum / HIGHER_LOWER audit for every numeric column."""
+    continuum_metrics = continuum_metrics or {}
+    for cat_key, cat in stats["categories"].items():
+        configured = set(continuum_metrics.get(cat_key, []))
+        print(f"\n  {cat_key} ({cat['entities']} entities):")
+        for key, col in cat["columns"].items():
+            if "min" not in col:
+                continue
+            verdict = "continuum" if col["eligible"]["continuum"] else ""
+            if key in configured and not verdict:
+                verdict = "IN CONTINUUM_METRICS BUT FAILS AUDIT"
+            print(
+                f"    {key:.<28s} {col['distinctRatio']:>4.0%} unique, "
+                f"{col['present']:>4}/{cat['entities']:<4} present, "
+                f"ties {col['ties']['groups']:>3} (max {col['ties']['largest']:>3})  {verdict}"
+            )
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else GAME_DATA_FILE
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    print_audit(build_stats(payload), load_continuum_metrics())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+columnar.py
+───────────
+Compact columnar, dictionary-encoded alternative to the gameData.json
+"categories" layout.
+
+Each category becomes:
+
+    {
+      "count": 195,
+      "ids":   ["IND", ...],
+      "names": ["India", ...],
+      "columns": [
+        {"key": "continent", "dict": ["Asia", ...], "codes": [0, ...]},
+        {"key": "population", "values": [1428627663, ...], "nulls": "AAAg..."}
+      ]
+    }
+
+Columns follow the entity key order: every entity's keys, missing ones
+skipped, appear in column order. An entity whose keys cannot (their order
+conflicts with another entity's) has its full key order stored in
+"keyOrders", {"<entity index>": ["id", "name", ...]}; the parser only
+produces consistent orders, so that map is normally absent.
+Low-cardinality string/boolean columns
+store a dictionary plus one integer code per present value; everything else
+stores its present values directly. A missing attribute is marked in the
+optional base64 null bitmap (bit i set = entity i has no value), and is
+skipped in "codes"/"values".
+
+decode_categories() is the reference decoder: it rebuilds the exact
+"categories" structure, key order included.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.columnar            # size / parse-time comparison
+"""
+
+import base64
+import gzip
+import heapq
+import json
+import sys
+import time
+
+FORMAT_NAME = "scalar-columnar"
+FORMAT_VERSION = 2
+
+# A string/boolean column is dictionary-encoded when it has at most this many
+# distinct values, or when distinct values are at most half its length.
+MAX_DICT_SIZE = 256
+
+
+# ─── Null bitmap ────────────────────────────────────────────────────────────
+
+def pack_bitmap(flags):
+    """Pack booleans LSB-first into bytes and return them base64-encoded."""
+    buf = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            buf[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(buf)).decode("ascii")
+
+
+def unpack_bitmap(encoded, count):
+    buf = base64.b64decode(encoded)
+    return [bool(buf[i >> 3] & (1 << (i & 7))) for i in range(count)]
+
+
+# ─── Encoder ────────────────────────────────────────────────────────────────
+
+def column_order(entities):
+    """Attribute keys (excluding id/name) in an order every entity agrees with.
+
+    Each entity's consecutive keys give an ordering constraint; keys are
+    taken in constraint order, ties broken by first appearance. Keys left
+    in a conflicting cycle follow in first-appearance order, and the
+    entities involved get a stored key order (see key_orders()).
+    """
+    first_seen, after, blockers = {}, {}, {}
+    for entity in entities:
+        previous = None
+        for key in entity:
+            if key in ("id", "name"):
+                continue
+            if key not in first_seen:
+                first_seen[key] = len(first_seen)
+                after[key], blockers[key] = set(), 0
+            if previous is not None and key not in after[previous]:
+                after[previous].add(key)
+                blockers[key] += 1
+            previous = key
+
+    ready = [(rank, key) for key, rank in first_seen.items() if blockers[key] == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, key = heapq.heappop(ready)
+        order.append(key)
+        for successor in after[key]:
+            blockers[successor] -= 1
+            if blockers[successor] == 0:
+                heapq.heappush(ready, (first_seen[successor], successor))
+    placed = set(order)
+    return order + [key for key in first_seen if key not in placed]
+
+
+def key_orders(entities, order):
+    """{entity index: key list} for entities whose keys do not follow id, name, order."""
+    position = {key: i for i, key in enumerate(order)}
+    orders = {}
+    for i, entity in enumerate(entities):
+        keys = list(entity)
+        rest = [position[key] for key in keys[2:]]
+        if keys[:2] != ["id", "name"] or any(a >= b for a, b in zip(rest, rest[1:])):
+            orders[str(i)] = keys
+    return orders
+
+
+def _dict_key(value):
+    # True == 1 == 1.0 as dict keys, so tell them apart by type
+    return type(value).__name__, value
+
+
+def encode_column(key, entities):
+    present = [key in entity for entity in entities]
+    values = [entity[key] for entity in entities if key in entity]
+
+    column = {"key": key}
+    dictionary = {}
+    if all(isinstance(v, (str, bool)) for v in values):
+        for v in values:
+            dictionary.setdefault(_dict_key(v), len(dictionary))
+    if dictionary and (len(dictionary) <= MAX_DICT_SIZE or 2 * len(dictionary) <= len(values)):
+        column["dict"] = [value for _, value in dictionary]
+        column["codes"] = [dictionary[_dict_key(v)] for v in values]
+    else:
+        column["values"] = values
+
+    if not all(present):
+        column["nulls"] = pack_bitmap([not p for p in present])
+    return column
+
+
+def encode_category(entities):
+    """Encode one category's entity list into the columnar layout."""
+    order = column_order(entities)
+    encoded = {
+        "count": len(entities),
+        "ids": [entity["id"] for entity in entities],
+        "names": [entity["name"] for entity in entities],
+        "columns": [encode_column(key, entities) for key in order],
+    }
+    orders = key_orders(entities, order)
+    if orders:
+        encoded["keyOrders"] = orders
+    return encoded
+
+
+def encode_payload(payload):
+    """Encode a full {"schemaConfig", "categories"} payload."""
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "schemaConfig": payload["schemaConfig"],
+        "categories": {
+            cat_key: encode_category(entities)
+            for cat_key, entities in payload["categories"].items()
+        },
+    }
+
+
+# ─── Reference decoder ──────────────────────────────────────────────────────
+
+def decode_category(encoded):
+    """Rebuild the list of entity dicts from an encoded category."""
+    count = encoded["count"]
+    entities = [
+        {"id": entity_id, "name": name}
+        for entity_id, name in zip(encoded["ids"], encoded["names"])
+    ]
+
+    for column in encoded["columns"]:
+        key = column["key"]
+        if "dict" in column:
+            dictionary = column["dict"]
+            values = iter([dictionary[code] for code in column["codes"]])
+        else:
+            values = iter(column["values"])
+
+        if "nulls" in column:
+            for entity, is_null in zip(entities, unpack_bitmap(column["nulls"], count)):
+                if not is_null:
+                    entity[key] = next(values)
+        else:
+            for entity in entities:
+                entity[key] = next(values)
+
+    for index, keys in encoded.get("keyOrders", {}).items():
+        entity = entities[int(index)]
+        entities[int(index)] = {key: entity[key] for key in keys}
+    return entities
+
+
+def decode_categories(columnar):
+    """Rebuild the gameData.json "categories" mapping from a columnar payload."""
+    if columnar.get("format") != FORMAT_NAME or columnar.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Not a {FORMAT_NAME} v{FORMAT_VERSION} payload")
+    return {
+        cat_key: decode_category(encoded)
+        for cat_key, encoded in columnar["categories"].items()
+    }
+
+
+def decode_payload(columnar):
+    return {
+        "schemaConfig": columnar["schemaConfig"],
+        "categories": decode_categories(columnar),
+    }
+
+
+# ─── Comparison ─────────────────────────────────────────────────────────────
+
+def dumps_compact(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def best_time(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_formats(payload):
+    """Return size / parse-time rows for the current format vs columnar."""
+    columnar = encode_payload(payload)
+    if dumps_compact(decode_payload(columnar)) != dumps_compact(payload):
+        raise AssertionError("columnar round trip does not reproduce the payload")
+
+    variants = {
+        "gameData.json (indent=2)": json.dumps(payload, indent=2, ensure_ascii=False),
+        "gameData.json (compact)": dumps_compact(payload),
+        "columnar (compact)": dumps_compact(columnar),
+    }
+    rows = []
+    for label, text in variants.items():
+        raw = text.encode("utf-8")
+        rows.append({
+            "format": label,
+            "bytes": len(raw),
+            "gzip_bytes": len(gzip.compress(raw, 9)),
+            "parse_ms": best_time(lambda: json.loads(text)) * 1000,
+        })
+    decode_ms = best_time(lambda: decode_categories(json.loads(variants["columnar (compact)"]))) * 1000
+    rows[-1]["parse_decode_ms"] = decode_ms
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else "./src/assets/data/gameData.json"
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    rows = compare_formats(payload)
+    base = rows[0]
+    print(f"{'format':<28} {'bytes':>10} {'gzip':>9} {'parse ms':>9}")
+    for row in rows:
+        print(
+            f"{row['format']:<28} {row['bytes']:>10,} {row['gzip_bytes']:>9,} {row['parse_ms']:>9.2f}"
+            f"   ({row['bytes'] / base['bytes']:.0%} size, {row['parse_ms'] / base['parse_ms']:.0%} parse)"
+        )
+    print(f"{'columnar parse + decode':<28} {'':>10} {'':>9} {rows[-1]['parse_decode_ms']:>9.2f}")
+    print("Round trip: decoded categories match exactly.")
+
+
+if __name__ == "__main__":
+    main()
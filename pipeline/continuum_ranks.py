@@ -0,0 +1,221 @@
+"""
+continuum_ranks.py
+──────────────────
+Precomputed rank tables for every CONTINUUM_METRICS attribute, so placing a
+card compares two integers instead of re-reading and re-sorting raw values.
+
+One file per category, <cat>.ranks.json:
+
+    {
+      "version": 1,
+      "ids": ["AFG", ...],                 entity order of gameData.json
+      "metrics": {
+        "Density": {
+          "order": [0, 1, ...],            entity indices by ascending value
+          "rank":  [3, null, ...],         dense rank per entity, null if missing
+          "ties":  [[12, 40], ...],        entities sharing a value, by rank
+          "distinct": 90
+        }
+      }
+    }
+
+Entities without a finite numeric value are left out of "order" and get a
+null rank, the same entities startGame() filters out. Every entity the
+client can deal has an integer rank. That includes values equal to the CSV
+"no data" sentinel -1: a cell written as "-1.0" is not in
+fetch_data.NULL_VALUES and reaches gameData.json as a number. startGame()
+deals such cards and placeCard() compares them as -1, so they are ranked
+as -1, the lowest value. Each one is also reported (sentinels) so the data
+can be fixed.
+
+Equal values share a rank, so rank[a] <= rank[b] exactly when
+value[a] <= value[b], and the `>=` check in placeCard() becomes a comparison
+with the two neighbours of the insert slot (placement_ok). "order" breaks
+ties by entity index, as the client's stable sort does.
+
+A tie group is a set of cards that may go in either order. Each group is
+listed at build time with its names and value, so a duplicate such as two
+elements with the same Density is seen before players run into it.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.continuum_ranks        # build, verify and list tie groups
+"""
+
+import json
+import os
+import sys
+
+from pipeline.daily_schedule import is_metric_value, load_continuum_metrics
+
+FORMAT_VERSION = 1
+
+# Raw CSV value meaning "no data" (see NULL_VALUES in fetch_data.py)
+MISSING_SENTINEL = -1
+
+
+# ─── Tables ─────────────────────────────────────────────────────────────────
+
+def has_metric_value(entity, attribute):
+    """True for the entities startGame() deals: a finite number, sentinel included."""
+    return is_metric_value(entity.get(attribute))
+
+
+def sentinels(entities, attribute):
+    """Entity indices whose value is the -1 sentinel rather than a measurement."""
+    return [i for i, e in enumerate(entities)
+            if is_metric_value(e.get(attribute)) and e[attribute] == MISSING_SENTINEL]
+
+
+def rank_table(entities, attribute):
+    """order / rank / ties for one metric; None if no entity has a value."""
+    present = [i for i, e in enumerate(entities) if has_metric_value(e, attribute)]
+    if not present:
+        return None
+    order = sorted(present, key=lambda i: entities[i][attribute])
+
+    rank = [None] * len(entities)
+    ties = []
+    group = [order[0]]
+    current = 0
+    rank[order[0]] = 0
+    for prev, i in zip(order, order[1:]):
+        if entities[i][attribute] != entities[prev][attribute]:
+            current += 1
+            if len(group) > 1:
+                ties.append(group)
+            group = []
+        group.append(i)
+        rank[i] = current
+    if len(group) > 1:
+        ties.append(group)
+
+    return {"order": order, "rank": rank, "ties": ties, "distinct": current + 1}
+
+
+def build_rank_tables(entities, attributes):
+    metrics = {}
+    for attribute in attributes:
+        table = rank_table(entities, attribute)
+        if table is not None:
+            metrics[attribute] = table
+    return {
+        "version": FORMAT_VERSION,
+        "ids": [e["id"] for e in entities],
+        "metrics": metrics,
+    }
+
+
+# ─── Lookups ────────────────────────────────────────────────────────────────
+
+def placement_ok(rank, placed, card, insert_index):
+    """placeCard()'s sortedness check for a board that is already in order.
+
+    placed holds entity indices; only the neighbours of the slot matter.
+    Every card startGame() deals has a rank (see verify_rank_table).
+    """
+    r = rank[card]
+    if insert_index > 0 and rank[placed[insert_index - 1]] > r:
+        return False
+    if insert_index < len(placed) and rank[placed[insert_index]] < r:
+        return False
+    return True
+
+
+def verify_rank_table(entities, attribute, table):
+    """Check the table against raw values; return a list of problems.
+
+    Along "order", values never decrease and the rank steps up exactly when
+    the value changes, which makes every pairwise rank comparison agree
+    with the value comparison.
+    """
+    problems = []
+    order, rank = table["order"], table["rank"]
+    expected = {i for i, e in enumerate(entities) if has_metric_value(e, attribute)}
+    if set(order) != expected or len(order) != len(expected):
+        problems.append("order does not list exactly the entities with a value")
+    for i, r in enumerate(rank):
+        # A dealable card without an integer rank would break placement_ok()
+        dealable = i in expected
+        if dealable != (isinstance(r, int) and not isinstance(r, bool)) or (not dealable and r is not None):
+            problems.append(f"{entities[i]['id']}: rank {r!r} but value {entities[i].get(attribute)!r}")
+    for prev, i in zip(order, order[1:]):
+        a, b = entities[prev][attribute], entities[i][attribute]
+        if a > b or (a == b) != (rank[prev] == rank[i]) or rank[i] - rank[prev] not in (0, 1):
+            problems.append(f"{entities[prev]['id']} → {entities[i]['id']}: values {a!r}, {b!r} "
+                            f"ranks {rank[prev]}, {rank[i]}")
+    return problems
+
+
+def describe_ties(entities, attribute, table):
+    """[(value, [names])] for every tie group."""
+    return [(entities[group[0]][attribute], [entities[i]["name"] for i in group])
+            for group in table["ties"]]
+
+
+# ─── Output ─────────────────────────────────────────────────────────────────
+
+def build_rank_indexes(payload, out_dir, metrics=None):
+    """Build, verify and write <cat>.ranks.json for every category with Continuum metrics.
+
+    Returns {cat_key: (file_path, tables)}. Raises ValueError if a table
+    disagrees with the raw values.
+    """
+    metrics = load_continuum_metrics() if metrics is None else metrics
+    written = {}
+    for cat_key, entities in payload["categories"].items():
+        attributes = metrics.get(cat_key, [])
+        if not attributes:
+            continue
+        tables = build_rank_tables(entities, attributes)
+        for attribute, table in tables["metrics"].items():
+            problems = verify_rank_table(entities, attribute, table)
+            if problems:
+                raise ValueError(f"{cat_key}.{attribute}: {len(problems)} rank errors, e.g. {problems[:3]}")
+        path = os.path.join(out_dir, f"{cat_key}.ranks.json")
+        os.makedirs(out_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(tables, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        written[cat_key] = (path, tables)
+    return written
+
+
+def print_ties(payload, cat_key, tables):
+    entities = payload["categories"][cat_key]
+    for attribute, table in tables["metrics"].items():
+        ranked = len(table["order"])
+        print(f"  Ranks: {cat_key}.{attribute} {ranked}/{len(entities)} ranked, "
+              f"{table['distinct']} distinct, {len(table['ties'])} tie groups")
+        flagged = sentinels(entities, attribute)
+        if flagged:
+            print(f"    {len(flagged)} entities hold the -1 no-data sentinel as a value (dealt and "
+                  f"ranked as -1, like the client): {', '.join(entities[i]['name'] for i in flagged)}")
+        for value, names in describe_ties(entities, attribute, table):
+            print(f"    tie at {value!r}: {', '.join(names)}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else "./src/assets/data/gameData.json"
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    metrics = load_continuum_metrics()
+    for cat_key, entities in payload["categories"].items():
+        tables = build_rank_tables(entities, metrics.get(cat_key, []))
+        for attribute in metrics.get(cat_key, []):
+            table = tables["metrics"].get(attribute)
+            if table is None:
+                print(f"  {cat_key}.{attribute}: no values — not a usable Continuum metric")
+                continue
+            problems = verify_rank_table(entities, attribute, table)
+            status = "ranks agree with values" if not problems else f"{len(problems)} PROBLEMS"
+            print(f"  {cat_key}.{attribute}: {status}")
+            for p in problems[:5]:
+                print(f"    {p}")
+        print_ties(payload, cat_key, tables)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+daily_schedule.py
+─────────────────
+Precomputes the daily puzzles for a date range with bit-exact Python ports
+of the client's seeding (hashString + mulberry32 in dailyUtils.ts and
+continuumStore.ts):
+
+  * Scalar daily target per category   — getDailyEntity()
+  * Continuum daily round per category — startDailyGameForCategory() →
+    attribute, the three anchors and the full deal order
+
+The result is a compact date-indexed table (entity indices instead of ids)
+plus an audit of target repeats and clustering.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.daily_schedule --start 2026-03-01 --days 1826
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import islice
+from operator import sub
+
+GAME_DATA_FILE = "./src/assets/data/gameData.json"
+CONTINUUM_CONFIG_FILE = "./src/utils/continuumConfig.ts"
+OUTPUT_FILE = "./public/data/schedule.json"
+LAUNCH_DATE = "2026-03-01"  # Puzzle #1, see EPOCH_DATE_STRING in dailyUtils.ts
+
+MAX_LIVES = 3  # continuumStore.ts
+MASK32 = 0xFFFFFFFF
+
+# Reference values produced by the TypeScript implementations under Node.
+KNOWN_HASHES = {
+    "": 0,
+    "abc": 96354,
+    "2026-03-01:countries": 1010360634,
+    "2026-03-01:continuum:elements:attr-picker": 1605578117,
+    "\u00e9\u2713\U0001f600": 18327085,  # surrogate pair hashes as two code units
+}
+KNOWN_MULBERRY32 = {
+    0: [0.26642920868471265, 0.0003297457005828619, 0.2232720274478197],
+    2087226002: [0.4743060111068189, 0.610588263720274, 0.26114590815268457],
+    4294967295: [0.8964226141106337, 0.189478256739676, 0.7156526781618595],
+}
+
+
+# ─── PRNG ports ─────────────────────────────────────────────────────────────
+
+def hash_string(s):
+    """Port of hashString(): djb2-style hash over UTF-16 code units, uint32."""
+    h = 0
+    data = s.encode("utf-16-le")
+    for i in range(0, len(data), 2):
+        h = (h * 31 + (data[i] | (data[i + 1] << 8))) & MASK32
+    return h
+
+
+def mulberry32(seed):
+    """Port of mulberry32(): returns a function producing floats in [0, 1).
+
+    Every JS operator involved (^, |, >>>, Math.imul, ToInt32 of a sum) agrees
+    with plain uint32 arithmetic modulo 2**32, so the port works on masked
+    Python ints. The seed itself is accumulated unmasked, like the JS double.
+    """
+    state = seed
+
+    def rand():
+        nonlocal state
+        state += 0x6D2B79F5
+        t = state & MASK32
+        t = ((t ^ (t >> 15)) * (t | 1)) & MASK32
+        t = (t ^ ((t + (((t ^ (t >> 7)) * (t | 61)) & MASK32)) & MASK32)) & MASK32
+        return ((t ^ (t >> 14)) & MASK32) / 4294967296
+
+    return rand
+
+
+def self_check():
+    """Verify the ports against the known TypeScript outputs; raise on mismatch."""
+    for s, expected in KNOWN_HASHES.items():
+        got = hash_string(s)
+        if got != expected:
+            raise AssertionError(f"hash_string({s!r}) = {got}, expected {expected}")
+    for seed, expected in KNOWN_MULBERRY32.items():
+        rand = mulberry32(seed)
+        got = [rand() for _ in expected]
+        if got != expected:
+            raise AssertionError(f"mulberry32({seed}) = {got}, expected {expected}")
+
+
+# ─── Scalar daily ───────────────────────────────────────────────────────────
+
+def locale_sort_key(s):
+    """Approximates String.prototype.localeCompare for ASCII ids.
+
+    Case-insensitive first, lowercase before uppercase on ties — the ICU
+    root collation order for the letter/digit ids used in gameData.
+    """
+    return s.casefold(), s.swapcase()
+
+
+def daily_index(category, sorted_ids, date_string):
+    """Port of getDailyEntity(); returns an index into sorted_ids."""
+    rand = mulberry32(hash_string(f"{date_string}:{category}"))
+    return math.floor(rand() * len(sorted_ids))
+
+
+# ─── Continuum daily ────────────────────────────────────────────────────────
+
+def is_metric_value(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def pick_anchors(sorted_entities, attribute, rand):
+    """Port of pickAnchors(); returns [bottom, mid, top] sorted by value."""
+    n = len(sorted_entities)
+    bot5_max = max(0, math.floor(n * 0.05))
+    top5_min = min(n - 1, math.floor(n * 0.95))
+    mid40 = math.floor(n * 0.40)
+    mid60 = min(n - 1, math.floor(n * 0.60))
+
+    bot_idx = math.floor(rand() * (bot5_max + 1))
+    top_idx = top5_min + math.floor(rand() * (n - top5_min))
+    mid_idx = mid40 + math.floor(rand() * (mid60 - mid40 + 1))
+
+    anchors = [sorted_entities[bot_idx], sorted_entities[top_idx], sorted_entities[mid_idx]]
+    anchors.sort(key=lambda e: e[attribute])  # JS sort is stable too
+    return anchors
+
+
+def compute_deal_sequence(sorted_entities, anchor_ids, attribute, rand, count):
+    """Port of computeDealSequence() (fuzzy bisection dealer).
+
+    The pool stays in value order, so each candidate filter of the original
+    is a contiguous slice found by bisection instead of a full scan.
+    """
+    pool = [e for e in sorted_entities if e["id"] not in anchor_ids]
+    pool_values = [e[attribute] for e in pool]
+    placed_values = sorted(e[attribute] for e in sorted_entities if e["id"] in anchor_ids)
+    gaps = list(map(sub, islice(placed_values, 1, None), placed_values))
+
+    sequence = []
+    while pool and len(sequence) < count:
+        # Find the largest internal gap (first one wins on ties, as in the loop)
+        gap_idx = gaps.index(max(gaps))
+
+        gap_low = placed_values[gap_idx]
+        gap_high = placed_values[gap_idx + 1]
+        wobble_low = gap_low + 0.25 * (gap_high - gap_low)
+        wobble_high = gap_high - 0.25 * (gap_high - gap_low)
+
+        lo = bisect_left(pool_values, wobble_low)
+        hi = bisect_right(pool_values, wobble_high)
+        if lo >= hi:
+            lo = bisect_right(pool_values, gap_low)
+            hi = bisect_left(pool_values, gap_high)
+        if lo >= hi:
+            lo, hi = 0, len(pool)
+
+        pick_idx = lo + math.floor(rand() * (hi - lo))
+        picked = pool.pop(pick_idx)
+        picked_val = pool_values.pop(pick_idx)
+        sequence.append(picked)
+
+        # findIndex(v => v > pickedVal), i.e. insert after equal values, then
+        # split the gap the new value landed in
+        at = bisect_right(placed_values, picked_val)
+        placed_values.insert(at, picked_val)
+        if at == 0:
+            gaps.insert(0, placed_values[1] - picked_val)
+        elif at == len(placed_values) - 1:
+            gaps.append(picked_val - placed_values[at - 1])
+        else:
+            gaps[at - 1] = picked_val - placed_values[at - 1]
+            gaps.insert(at, placed_values[at + 1] - picked_val)
+
+    return sequence
+
+
+def continuum_round(category, entities, attributes, date_string):
+    """Port of startDailyGameForCategory() + startGame().
+
+    Returns (attribute, anchors, deal) or None when the client would refuse
+    to start the round.
+    """
+    if not attributes:
+        return None
+    rand = mulberry32(hash_string(f"{date_string}:continuum:{category}:attr-picker"))
+    attribute = attributes[math.floor(rand() * len(attributes))]
+
+    valid = [e for e in entities if is_metric_value(e.get(attribute))]
+    if len(valid) < MAX_LIVES + 3:
+        return None
+    sorted_entities = sorted(valid, key=lambda e: e[attribute])
+
+    rand = mulberry32(hash_string(f"{date_string}:{category}:{attribute}"))
+    anchors = pick_anchors(sorted_entities, attribute, rand)
+    anchor_ids = {e["id"] for e in anchors}
+    deal = compute_deal_sequence(sorted_entities, anchor_ids, attribute, rand, len(valid))
+    return attribute, anchors, deal
+
+
+# ─── Schedule ───────────────────────────────────────────────────────────────
+
+def load_continuum_metrics(path=CONTINUUM_CONFIG_FILE):
+    """Read CONTINUUM_METRICS from continuumConfig.ts (the client's source of truth)."""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    block = re.search(r"CONTINUUM_METRICS[^=]*=\s*\{(.*?)\n\};", source, re.S)
+    if not block:
+        raise ValueError(f"CONTINUUM_METRICS not found in {path}")
+    metrics = {}
+    for cat_key, body in re.findall(r"(\w+)\s*:\s*\[(.*?)\]", block.group(1), re.S):
+        metrics[cat_key] = re.findall(r"['\"]([^'\"]+)['\"]", re.sub(r"//[^\n]*", "", body))
+    return metrics
+
+
+def date_range(start, days):
+    first = datetime.date.fromisoformat(start)
+    return [(first + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def build_schedule(payload, metrics, start=LAUNCH_DATE, days=365, deal_length=None):
+    """Build the date-indexed schedule table for every category.
+
+    Entities are referenced by index: Scalar targets index the id-sorted list
+    in "scalar.<cat>.ids", Continuum cards index gameData order in
+    "continuum.<cat>.ids". deal_length truncates each stored deal order
+    (None keeps all of it).
+    """
+    dates = date_range(start, days)
+    schedule = {"version": 1, "startDate": start, "days": days, "scalar": {}, "continuum": {}}
+
+    for cat_key, entities in payload["categories"].items():
+        sorted_ids = sorted((e["id"] for e in entities), key=locale_sort_key)
+        schedule["scalar"][cat_key] = {
+            "ids": sorted_ids,
+            "target": [daily_index(cat_key, sorted_ids, d) for d in dates],
+        }
+
+        attributes = metrics.get(cat_key, [])
+        if not attributes:
+            continue
+        position = {e["id"]: i for i, e in enumerate(entities)}
+        table = {
+            "ids": [e["id"] for e in entities],
+            "attributes": attributes,
+            "attribute": [],
+            "anchors": [],
+            "deal": [],
+        }
+        for d in dates:
+            round_ = continuum_round(cat_key, entities, attributes, d)
+            if round_ is None:
+                table["attribute"].append(-1)
+                table["anchors"].append([])
+                table["deal"].append([])
+                continue
+            attribute, anchors, deal = round_
+            if deal_length is not None:
+                deal = deal[:deal_length]
+            table["attribute"].append(attributes.index(attribute))
+            table["anchors"].append([position[e["id"]] for e in anchors])
+            table["deal"].append([position[e["id"]] for e in deal])
+        schedule["continuum"][cat_key] = table
+
+    return schedule
+
+
+def lookup(schedule, date_string):
+    """Return the decoded puzzles for one date from a schedule table."""
+    first = datetime.date.fromisoformat(schedule["startDate"])
+    day = (datetime.date.fromisoformat(date_string) - first).days
+    if not 0 <= day < schedule["days"]:
+        raise KeyError(f"{date_string} is outside the scheduled range")
+
+    result = {"scalar": {}, "continuum": {}}
+    for cat_key, table in schedule["scalar"].items():
+        result["scalar"][cat_key] = table["ids"][table["target"][day]]
+    for cat_key, table in schedule["continuum"].items():
+        attr_idx = table["attribute"][day]
+        if attr_idx < 0:
+            continue
+        ids = table["ids"]
+        result["continuum"][cat_key] = {
+            "attribute": table["attributes"][attr_idx],
+            "anchors": [ids[i] for i in table["anchors"][day]],
+            "deal": [ids[i] for i in table["deal"][day]],
+        }
+    return result
+
+
+def audit_schedule(schedule, window=30):
+    """Summarise target repeats and clustering per category."""
+    report = {}
+    for cat_key, table in schedule["scalar"].items():
+        targets = table["target"]
+        counts = Counter(targets)
+        last_seen = {}
+        gaps = []
+        for day, target in enumerate(targets):
+            if target in last_seen:
+                gaps.append(day - last_seen[target])
+            last_seen[target] = day
+        report[cat_key] = {
+            "entities": len(table["ids"]),
+            "distinctTargets": len(counts),
+            "neverPicked": len(table["ids"]) - len(counts),
+            "maxRepeats": max(counts.values()) if counts else 0,
+            "mostRepeated": [table["ids"][i] for i, _ in counts.most_common(3)],
+            "minRepeatGapDays": min(gaps) if gaps else None,
+            f"repeatsWithin{window}Days": sum(1 for g in gaps if g <= window),
+            "backToBack": sum(1 for g in gaps if g == 1),
+        }
+    for cat_key, table in schedule["continuum"].items():
+        attr_counts = Counter(table["attribute"])
+        report.setdefault(cat_key, {})["continuumAttributes"] = {
+            (table["attributes"][i] if i >= 0 else "unplayable"): n
+            for i, n in sorted(attr_counts.items())
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", default=LAUNCH_DATE, help=f"First date, YYYY-MM-DD (default: {LAUNCH_DATE}).")
+    parser.add_argument("--days", type=int, default=5 * 365 + 1, help="Number of days (default: 5 years).")
+    parser.add_argument("--deal-length", type=int, default=None, help="Store only the first N dealt cards per round.")
+    parser.add_argument("--data", default=GAME_DATA_FILE)
+    parser.add_argument("--out", default=OUTPUT_FILE)
+    args = parser.parse_args(argv)
+
+    self_check()
+    with open(args.data, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    metrics = load_continuum_metrics()
+
+    schedule = build_schedule(payload, metrics, args.start, args.days, args.deal_length)
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    text = json.dumps(schedule, separators=(",", ":"))
+    tmp_path = args.out + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, args.out)
+    print(f"Schedule for {args.days} days from {args.start} saved to: {args.out} ({len(text):,} bytes)")
+
+    for cat_key, stats in audit_schedule(schedule).items():
+        print(f"\n  {cat_key}:")
+        for key, value in stats.items():
+            print(f"    {key:.<28s} {value}")
+
+
+if __name__ == "__main__":
+    main()
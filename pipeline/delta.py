@@ -0,0 +1,335 @@
+"""
+delta.py
+────────
+Entity-level patches between gameData.json releases, so a returning client
+downloads what changed instead of the whole payload.
+
+A release is identified by the first HASH_CHARS hex digits of the SHA-256
+of its gameData.json bytes (the same hash as its hashed artifact). Each
+build that changes the payload diffs it against the previous release and
+writes patches/<from>-<to>.json:
+
+    {
+      "version": 1,
+      "from": "d63fa1ac087bedb1",
+      "to": "5e0c11d2a4b79f30",
+      "compact": false,                      serialisation of the result
+      "categories": {
+        "countries": {
+          "changed": {"FRA": {"set": {"government_type": "..."}, "unset": ["GDP"]}},
+          "added":   [{"id": "XKX", ...}],
+          "removed": ["ANT"],
+          "order":   ["AFG", ...]            only if entity order changed
+        }
+      },
+      "schema": {"countries": [...]},        full field list of changed schemas
+      "removedCategories": [],
+      "categoryOrder": ["countries", ...]    only if category order changed
+    }
+
+A changed entity may also carry "keys", its full key order, when set/unset
+alone would not reproduce it. apply_patch() is the reference client; a
+patch is only written after applying it to the previous release gives the
+new gameData.json byte for byte.
+
+patches.json (fixed name, short cache) holds the version chain, newest last:
+
+    {"version": 1, "latest": "5e0c...", "chain": [
+        {"from": "d63f...", "to": "5e0c...", "file": "patches/d63f...-5e0c....json",
+         "bytes": 412, "fullBytes": 357616}, ...]}
+
+A client on any `from` in the chain applies patches in order until it
+reaches `latest`; otherwise it downloads the full payload. A client may
+still hold an older patches.json, so patches that leave the chain (it is
+capped at MAX_CHAIN, and restarts when the previous release is missing)
+are not deleted at once: "retired" lists the last KEEP_GENERATIONS of
+them, newest first, the same retention as the hashed artifacts. The previous
+release is kept in .cache/releases so the next build has something to
+diff against.
+
+Usage (from the repo root):
+    python -m pipeline.delta OLD.json NEW.json     # diff two payloads, verify, print sizes
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+from pipeline.artifacts import KEEP_GENERATIONS
+
+FORMAT_VERSION = 1
+HASH_CHARS = 16
+MANIFEST_NAME = "patches.json"
+PATCH_DIR = "patches"
+RELEASE_DIR = "./.cache/releases"
+MAX_CHAIN = 30
+
+
+def release_id(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_CHARS]
+
+
+def dumps(payload, compact=False):
+    """Serialise like fetch_data.dump_json()."""
+    if compact:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+# ─── Diff ───────────────────────────────────────────────────────────────────
+
+def same(a, b):
+    """Equal as JSON: 1 and 1.0 or 1 and true differ, dict key order counts."""
+    return json.dumps(a, ensure_ascii=False) == json.dumps(b, ensure_ascii=False)
+
+
+def diff_entity(old, new):
+    """{"set", "unset", "keys"} turning old into new, or None if equal."""
+    if same(old, new):
+        return None
+    change = {}
+    changed = {k: v for k, v in new.items() if k not in old or not same(old[k], v)}
+    if changed:
+        change["set"] = changed
+    unset = [k for k in old if k not in new]
+    if unset:
+        change["unset"] = unset
+    if list(patch_entity(old, change)) != list(new):
+        change["keys"] = list(new)
+    return change
+
+
+def diff_category(old_entities, new_entities):
+    old_by_id = {e["id"]: e for e in old_entities}
+    new_ids = {e["id"] for e in new_entities}
+    delta = {}
+    changed = {}
+    added = []
+    for entity in new_entities:
+        previous = old_by_id.get(entity["id"])
+        if previous is None:
+            added.append(entity)
+            continue
+        change = diff_entity(previous, entity)
+        if change is not None:
+            changed[entity["id"]] = change
+    removed = [e["id"] for e in old_entities if e["id"] not in new_ids]
+    if changed:
+        delta["changed"] = changed
+    if added:
+        delta["added"] = added
+    if removed:
+        delta["removed"] = removed
+    kept = [e["id"] for e in old_entities if e["id"] in new_ids] + [e["id"] for e in added]
+    order = [e["id"] for e in new_entities]
+    if kept != order:
+        delta["order"] = order
+    return delta
+
+
+def diff_payloads(old, new, from_id, to_id, compact=False):
+    """Patch from payload old to payload new."""
+    patch = {"version": FORMAT_VERSION, "from": from_id, "to": to_id, "compact": compact, "categories": {}}
+    for cat_key, entities in new["categories"].items():
+        delta = diff_category(old["categories"].get(cat_key, []), entities)
+        if delta:
+            patch["categories"][cat_key] = delta
+    schema = {cat_key: fields for cat_key, fields in new["schemaConfig"].items()
+              if not same(old["schemaConfig"].get(cat_key), fields)}
+    if schema:
+        patch["schema"] = schema
+    removed = [cat_key for cat_key in old["categories"] if cat_key not in new["categories"]]
+    if removed:
+        patch["removedCategories"] = removed
+    kept = [c for c in old["categories"] if c in new["categories"]]
+    order = list(new["categories"])
+    if kept + [c for c in order if c not in old["categories"]] != order:
+        patch["categoryOrder"] = order
+    if list(new) != ["schemaConfig", "categories"]:
+        raise ValueError(f"unexpected top-level keys {list(new)}")
+    return patch
+
+
+# ─── Apply (reference client) ───────────────────────────────────────────────
+
+def patch_entity(entity, change):
+    out = {k: v for k, v in entity.items() if k not in change.get("unset", ())}
+    out.update(change.get("set", {}))
+    if "keys" in change:
+        out = {k: out[k] for k in change["keys"]}
+    return out
+
+
+def apply_patch(payload, patch):
+    """Return the payload `patch` produces from `payload` (which is not modified)."""
+    removed_cats = set(patch.get("removedCategories", ()))
+    categories = {c: list(entities) for c, entities in payload["categories"].items() if c not in removed_cats}
+    schema_config = {c: fields for c, fields in payload["schemaConfig"].items() if c not in removed_cats}
+
+    for cat_key, delta in patch["categories"].items():
+        removed = set(delta.get("removed", ()))
+        changed = delta.get("changed", {})
+        entities = [patch_entity(e, changed[e["id"]]) if e["id"] in changed else e
+                    for e in categories.get(cat_key, []) if e["id"] not in removed]
+        entities += delta.get("added", [])
+        if "order" in delta:
+            by_id = {e["id"]: e for e in entities}
+            entities = [by_id[i] for i in delta["order"]]
+        categories[cat_key] = entities
+    schema_config.update(patch.get("schema", {}))
+
+    order = patch.get("categoryOrder", list(categories))
+    return {
+        "schemaConfig": {c: schema_config[c] for c in order if c in schema_config},
+        "categories": {c: categories[c] for c in order},
+    }
+
+
+def apply_patch_text(text, patch):
+    """gameData.json text after the patch, byte-identical to a full rebuild."""
+    if release_id(text) != patch["from"]:
+        raise ValueError(f"patch starts at {patch['from']}, not at {release_id(text)}")
+    result = dumps(apply_patch(json.loads(text), patch), patch["compact"])
+    if release_id(result) != patch["to"]:
+        raise ValueError(f"patched payload is not release {patch['to']}")
+    return result
+
+
+def update(text, manifest, load_patch):
+    """Bring a cached gameData.json up to manifest["latest"] along the chain.
+
+    load_patch(file) returns a patch dict. Returns the new text, or None if
+    the cached release is not in the chain (download the full payload).
+    """
+    current = release_id(text)
+    if current == manifest["latest"]:
+        return text
+    steps = [entry["from"] for entry in manifest["chain"]]
+    if current not in steps:
+        return None
+    # A release can recur (a change reverted); start from its last appearance
+    start = len(steps) - 1 - steps[::-1].index(current)
+    for entry in manifest["chain"][start:]:
+        text = apply_patch_text(text, load_patch(entry["file"]))
+    return text
+
+
+# ─── Build stage ────────────────────────────────────────────────────────────
+
+def make_patch(old_text, new_text):
+    """Diff two gameData.json texts and check the patch reproduces new_text."""
+    new = json.loads(new_text)
+    compact = dumps(new, True) == new_text
+    if not compact and dumps(new) != new_text:
+        raise ValueError("new payload is not serialised like gameData.json")
+    patch = diff_payloads(json.loads(old_text), new, release_id(old_text), release_id(new_text), compact)
+    # Check the patch as a client receives it, after a JSON round trip
+    if apply_patch_text(old_text, json.loads(json.dumps(patch, ensure_ascii=False))) != new_text:
+        raise ValueError("patch does not reproduce the new payload")
+    return patch
+
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == FORMAT_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": FORMAT_VERSION, "latest": None, "chain": []}
+
+
+def retire_patches(manifest, dropped, out_dir, keep=KEEP_GENERATIONS):
+    """Move dropped chain entries to "retired"; delete patches that fall off it."""
+    retired = [old["file"] for old in reversed(dropped)] + manifest.get("retired", [])
+    live = {entry["file"] for entry in manifest["chain"]}
+    retired = [name for name in dict.fromkeys(retired) if name not in live]
+    manifest["retired"] = retired[:keep]
+    for name in retired[keep:]:
+        path = os.path.join(out_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def publish_patch(text, out_dir, release_dir=RELEASE_DIR):
+    """Record `text` as the latest release; write the patch from the previous one.
+
+    Returns the new chain entry, or None if there was no previous release
+    or nothing changed.
+    """
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    new_id = release_id(text)
+    previous = manifest["latest"]
+    entry = None
+
+    previous_path = os.path.join(release_dir, f"{previous}.json") if previous else None
+    if previous and previous != new_id and os.path.exists(previous_path):
+        with open(previous_path, "r", encoding="utf-8") as f:
+            old_text = f.read()
+        patch = make_patch(old_text, text)
+        patch_text = json.dumps(patch, ensure_ascii=False, separators=(",", ":"))
+        file_name = f"{PATCH_DIR}/{previous}-{new_id}.json"
+        write_file(os.path.join(out_dir, file_name), patch_text)
+        entry = {"from": previous, "to": new_id, "file": file_name,
+                 "bytes": len(patch_text.encode("utf-8")), "fullBytes": len(text.encode("utf-8"))}
+        manifest["chain"].append(entry)
+    elif previous != new_id:
+        # No previous release to diff against: start a new chain
+        manifest["chain"], dropped = [], manifest["chain"]
+        retire_patches(manifest, dropped, out_dir)
+
+    # Patches that fell off the chain are no longer offered, but stay
+    # downloadable for clients with an older patches.json
+    dropped = manifest["chain"][:-MAX_CHAIN]
+    manifest["chain"] = manifest["chain"][-MAX_CHAIN:]
+    if dropped:
+        retire_patches(manifest, dropped, out_dir)
+
+    if previous != new_id:
+        manifest["latest"] = new_id
+        write_file(os.path.join(release_dir, f"{new_id}.json"), text)
+        if previous_path and os.path.exists(previous_path):
+            os.remove(previous_path)
+        write_file(manifest_path, json.dumps(manifest, indent=2) + "\n")
+    return entry
+
+
+def gzip_bytes(text):
+    return len(gzip.compress(text.encode("utf-8"), 9, mtime=0))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit("usage: python -m pipeline.delta OLD.json NEW.json")
+    texts = []
+    for path in argv:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    old_text, new_text = texts
+    patch = make_patch(old_text, new_text)
+    patch_text = json.dumps(patch, ensure_ascii=False, separators=(",", ":"))
+    for cat_key, delta in patch["categories"].items():
+        print(f"  {cat_key}: {len(delta.get('changed', {}))} changed, {len(delta.get('added', []))} added, "
+              f"{len(delta.get('removed', []))} removed")
+    if patch.get("schema"):
+        print(f"  schema changed: {', '.join(patch['schema'])}")
+    print(f"{patch['from']} → {patch['to']}: patch {len(patch_text):,} bytes (gzip {gzip_bytes(patch_text):,}) "
+          f"vs full {len(new_text.encode('utf-8')):,} bytes (gzip {gzip_bytes(new_text):,}); "
+          "applying it reproduces NEW byte for byte")
+
+
+if __name__ == "__main__":
+    main()
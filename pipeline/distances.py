@@ -0,0 +1,163 @@
+"""
+distances.py
+────────────
+Precomputes the capital-to-capital distance matrix for categories with a
+GEO_DISTANCE field, so clients can look distances up instead of running
+haversine on every guess.
+
+The matrix is N×N little-endian uint16 kilometres, row-major by entity
+index in the category's entity list, rounded exactly like geo.ts
+(Math.round, i.e. half-up). Pairs involving an entity without coordinates
+hold MISSING_KM; gameLogic.ts's computeDistance reports those as 99999.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.distances
+"""
+
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+MISSING_KM = 0xFFFF
+UNKNOWN_DISTANCE_KM = 99999  # computeDistance() fallback in gameLogic.ts
+
+
+# ─── Scalar port of src/utils/geo.ts ────────────────────────────────────────
+
+def to_rad(deg):
+    return (deg * math.pi) / 180
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Python port of haversineDistance() in geo.ts, rounding included."""
+    d_lat = to_rad(lat2 - lat1)
+    d_lon = to_rad(lon2 - lon1)
+    a = (
+        math.sin(d_lat / 2) * math.sin(d_lat / 2)
+        + math.cos(to_rad(lat1)) * math.cos(to_rad(lat2))
+        * math.sin(d_lon / 2) * math.sin(d_lon / 2)
+    )
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return math.floor(EARTH_RADIUS_KM * c + 0.5)  # Math.round
+
+
+def compute_distance(target, guess):
+    """Python port of computeDistance() in gameLogic.ts."""
+    coords = [
+        entity.get(key)
+        for entity in (target, guess)
+        for key in ("Latitude", "Longitude")
+    ]
+    if any(not isinstance(v, (int, float)) or isinstance(v, bool) for v in coords):
+        return UNKNOWN_DISTANCE_KM
+    t_lat, t_lon, g_lat, g_lon = coords
+    return haversine_distance(g_lat, g_lon, t_lat, t_lon)
+
+
+# ─── Vectorised matrix ──────────────────────────────────────────────────────
+
+def has_geo_distance(schema):
+    return any(field["logicType"] == "GEO_DISTANCE" for field in schema)
+
+
+def coordinates(entities):
+    """Return (lat, lon, known) arrays; unknown coordinates are NaN."""
+    def column(key):
+        return np.array(
+            [
+                float(e[key]) if isinstance(e.get(key), (int, float)) and not isinstance(e.get(key), bool)
+                else np.nan
+                for e in entities
+            ],
+            dtype=np.float64,
+        )
+
+    lat = column("Latitude")
+    lon = column("Longitude")
+    return lat, lon, ~(np.isnan(lat) | np.isnan(lon))
+
+
+def distance_matrix(entities):
+    """N×N uint16 km matrix; matrix[i, j] is the distance from entity j's capital to i's."""
+    lat, lon, known = coordinates(entities)
+
+    # Same operation order as geo.ts: row = target (lat2), column = guess (lat1)
+    lat1, lat2 = lat[np.newaxis, :], lat[:, np.newaxis]
+    lon1, lon2 = lon[np.newaxis, :], lon[:, np.newaxis]
+    d_lat = ((lat2 - lat1) * math.pi) / 180
+    d_lon = ((lon2 - lon1) * math.pi) / 180
+    a = (
+        np.sin(d_lat / 2) * np.sin(d_lat / 2)
+        + np.cos((lat1 * math.pi) / 180) * np.cos((lat2 * math.pi) / 180)
+        * np.sin(d_lon / 2) * np.sin(d_lon / 2)
+    )
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    km = np.floor(EARTH_RADIUS_KM * c + 0.5)
+
+    km[~(known[:, np.newaxis] & known[np.newaxis, :])] = MISSING_KM
+    return km.astype("<u2")
+
+
+def verify_distance_matrix(entities, matrix):
+    """Compare every pair against the scalar port; return a list of mismatches."""
+    mismatches = []
+    for i, target in enumerate(entities):
+        for j, guess in enumerate(entities):
+            expected = compute_distance(target, guess)
+            got = int(matrix[i, j])
+            if got == MISSING_KM:
+                got = UNKNOWN_DISTANCE_KM
+            if got != expected:
+                mismatches.append((target["id"], guess["id"], expected, got))
+    return mismatches
+
+
+def write_distance_matrix(path, matrix):
+    """Write the matrix as raw little-endian uint16 bytes and return the byte count."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = matrix.astype("<u2").tobytes(order="C")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def build_distance_matrices(payload, out_dir):
+    """Build, verify and write a matrix for every GEO_DISTANCE category.
+
+    Returns {cat_key: (file_path, entity_count)}. Raises ValueError if any
+    pair disagrees with the geo.ts port.
+    """
+    written = {}
+    for cat_key, schema in payload["schemaConfig"].items():
+        if not has_geo_distance(schema):
+            continue
+        entities = payload["categories"][cat_key]
+        matrix = distance_matrix(entities)
+        mismatches = verify_distance_matrix(entities, matrix)
+        if mismatches:
+            raise ValueError(f"{cat_key}: {len(mismatches)} distance mismatches, e.g. {mismatches[:3]}")
+        path = os.path.join(out_dir, f"{cat_key}.distances.bin")
+        write_distance_matrix(path, matrix)
+        written[cat_key] = (path, len(entities))
+    return written
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else "./src/assets/data/gameData.json"
+    out_dir = argv[1] if len(argv) > 1 else "./public/data"
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    for cat_key, (file_path, count) in build_distance_matrices(payload, out_dir).items():
+        print(f"{cat_key}: {count}×{count} matrix matches geo.ts for all pairs → {file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+entity_table.py
+───────────────
+Compact, typed in-memory form of a category's entities, for builds that
+hold large categories in memory.
+
+parse_entity_data() returns one dict per entity. Every dict repeats its
+keys, and each value is a separate Python object: a 30-column row costs
+about 2 KB. EntityTable stores one column per key instead:
+
+  INT       array('q')   8 bytes a row
+  FLOAT     array('d')   8 bytes a row (CURRENCY too)
+  BOOLEAN   array('b')   1 byte a row
+  STRING    dictionary-coded: each distinct string is kept once and rows
+            hold a 1/2/4-byte code into it. Mostly-unique columns (ids,
+            names) are packed into one UTF-8 buffer with an offset per row
+
+Missing values (the keys a dict would leave out) go in a per-column
+bytearray mask, allocated only when the column has one. Values a typed
+array cannot hold, such as an INT beyond 64 bits, turn that column into a
+plain list, so every value round-trips unchanged.
+
+table[i] is an EntityRow, a read-only Mapping with __slots__ that reads
+the columns on access. iter_json() serialises the table column by column.
+It yields exactly the text fetch_data.dump_json(entity) gives for each
+entity, so gameData.json and the shards written from a table are
+byte-identical to the dict path.
+
+Usage (from the repo root):
+    python -m pipeline.entity_table [CSV SCHEMA]   # compare dict vs table size, check the JSON
+"""
+
+import json
+import math
+import sys
+from array import array
+from collections.abc import Mapping
+from itertools import accumulate, compress, repeat
+
+# Rows serialised per column-wise batch in iter_json()
+JSON_BATCH_ROWS = 4096
+
+# Typecode per data_type; anything else is a string column
+TYPECODES = {"INT": "q", "FLOAT": "d", "CURRENCY": "d", "BOOLEAN": "b"}
+
+# String codes widen from 1 to 2 to 4 bytes as the dictionary grows
+CODE_TYPECODES = (("B", 1 << 8), ("H", 1 << 16), ("I", 1 << 32))
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+# ─── Columns ────────────────────────────────────────────────────────────────
+
+class NumberColumn:
+    """INT / FLOAT / CURRENCY / BOOLEAN values in a typed array plus a null mask."""
+
+    __slots__ = ("typecode", "values", "nulls", "finite")
+
+    def __init__(self, typecode):
+        self.typecode = typecode
+        self.values = array(typecode)
+        self.nulls = None
+        self.finite = True
+
+    def __len__(self):
+        return len(self.values)
+
+    def extend(self, values):
+        if isinstance(self.values, list):
+            self.values.extend(values)
+            return
+        start = len(self.values)
+        if None in values:
+            if self.nulls is None:
+                self.nulls = bytearray(start)
+            self.nulls.extend(v is None for v in values)
+            present = [0 if v is None else v for v in values]
+        else:
+            if self.nulls is not None:
+                self.nulls.extend(bytes(len(values)))
+            present = values
+        try:
+            # Converted in full first: extend() stops half way on a bad value
+            self.values.extend(array(self.typecode, present))
+        except (OverflowError, TypeError):
+            self.values = self.get_slice(0, start) + list(values)
+            self.nulls = None
+            return
+        if self.typecode == "d" and self.finite:
+            self.finite = not any(map(math.isinf, present)) and not any(map(math.isnan, present))
+
+    def get(self, i):
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        value = self.values[i]
+        return bool(value) if self.typecode == "b" and not isinstance(self.values, list) else value
+
+    def get_slice(self, start, stop):
+        """Values of rows start..stop, None where missing."""
+        values = self.values[start:stop]
+        if isinstance(values, list):
+            return values
+        values = list(map(bool, values)) if self.typecode == "b" else values.tolist()
+        if self.nulls is not None:
+            for i in compress(range(len(values)), self.nulls[start:stop]):
+                values[i] = None
+        return values
+
+    def fragments(self, prefix, start, stop):
+        """prefix + JSON text of each value in rows start..stop, None where missing."""
+        values = self.values[start:stop]
+        if isinstance(values, list):
+            frags = [None if v is None else prefix + dumps(v) for v in values]
+        elif self.typecode == "b":
+            words = (prefix + "false", prefix + "true")
+            frags = list(map(words.__getitem__, values))
+        elif self.typecode == "d" and not self.finite:
+            frags = [prefix + dumps(v) for v in values]  # NaN / Infinity as json.dumps writes them
+        else:
+            frags = list(map(prefix.__add__, map(repr, values)))
+        if self.nulls is not None and not isinstance(values, list):
+            for i in compress(range(len(frags)), self.nulls[start:stop]):
+                frags[i] = None
+        return frags
+
+    def nbytes(self):
+        if isinstance(self.values, list):
+            return sys.getsizeof(self.values) + sum(map(sys.getsizeof, self.values))
+        return self.values.itemsize * len(self.values) + (len(self.nulls) if self.nulls is not None else 0)
+
+
+class StringColumn:
+    """Strings, dictionary-coded unless most of them are distinct. Code 0 is "missing".
+
+    A mostly-unique column (decided on its first batch) is packed instead:
+    the UTF-8 bytes of every value in one buffer plus an offset per row,
+    about a tenth of the size of a list of str objects for short values.
+    """
+
+    __slots__ = ("codes", "strings", "index", "encoded", "data", "offsets", "nulls")
+
+    def __init__(self):
+        self.codes = array("B")
+        self.strings = [None]
+        self.index = {None: 0}
+        self.encoded = None
+        self.data = None
+        self.offsets = None
+        self.nulls = None
+
+    def __len__(self):
+        return len(self.offsets) - 1 if self.data is not None else len(self.codes)
+
+    def extend(self, values):
+        if self.data is not None:
+            self.extend_packed(values)
+            return
+        new = set(values).difference(self.index)
+        if not self.codes and 2 * len(new) > len(values):
+            # Mostly unique: a dictionary would only add overhead
+            self.data, self.offsets, self.index, self.strings = bytearray(), array("I", [0]), None, None
+            self.extend_packed(values)
+            return
+        for value in new:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        typecode = next(tc for tc, limit in CODE_TYPECODES if len(self.strings) <= limit)
+        if typecode != self.codes.typecode:
+            self.codes = array(typecode, self.codes)
+        self.codes.extend(array(typecode, map(self.index.__getitem__, values)))
+        self.encoded = None
+
+    def extend_packed(self, values):
+        rows = len(self)
+        if None in values:
+            if self.nulls is None:
+                self.nulls = bytearray(rows)
+            self.nulls.extend(v is None for v in values)
+            values = ["" if v is None else v for v in values]
+        elif self.nulls is not None:
+            self.nulls.extend(bytes(len(values)))
+        encoded = [v.encode("utf-8") for v in values]
+        ends = list(accumulate(map(len, encoded), initial=len(self.data)))[1:]
+        if ends and ends[-1] >= 1 << 32 and self.offsets.typecode == "I":
+            self.offsets = array("Q", self.offsets)
+        self.data += b"".join(encoded)
+        self.offsets.extend(ends)
+
+    def finish(self):
+        """Drop the build-time string index."""
+        self.index = None
+
+    def get(self, i):
+        if self.data is None:
+            return self.strings[self.codes[i]]
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def get_slice(self, start, stop):
+        if self.data is None:
+            return list(map(self.strings.__getitem__, self.codes[start:stop]))
+        data = self.data
+        offsets = self.offsets[start:stop + 1]
+        values = [data[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        if self.nulls is not None:
+            for i in compress(range(len(values)), self.nulls[start:stop]):
+                values[i] = None
+        return values
+
+    def fragments(self, prefix, start, stop):
+        if self.data is not None:
+            return [None if v is None else prefix + dumps(v) for v in self.get_slice(start, stop)]
+        if self.encoded is None or self.encoded[0] != prefix:
+            # Each distinct string is encoded once
+            self.encoded = (prefix, [None] + [prefix + dumps(s) for s in self.strings[1:]])
+        return list(map(self.encoded[1].__getitem__, self.codes[start:stop]))
+
+    def nbytes(self):
+        if self.data is not None:
+            return (len(self.data) + self.offsets.itemsize * len(self.offsets)
+                    + (len(self.nulls) if self.nulls is not None else 0))
+        return (self.codes.itemsize * len(self.codes) + sys.getsizeof(self.strings)
+                + sum(map(sys.getsizeof, self.strings)))
+
+
+def make_column(data_type):
+    typecode = TYPECODES.get(data_type)
+    return NumberColumn(typecode) if typecode else StringColumn()
+
+
+# ─── Table ──────────────────────────────────────────────────────────────────
+
+class EntityTable:
+    """A category's entities as typed columns, in fetch_data's entity key order.
+
+    keys are the entity keys (fetch_data.plan_keys) and types their data
+    types; fill it with extend() batch by batch, then call finish().
+    """
+
+    def __init__(self, keys, types):
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"duplicate entity keys {sorted(k for k in set(keys) if keys.count(k) > 1)}")
+        self.keys = tuple(keys)
+        self.columns = [make_column(t) for t in types]
+        self.position = {key: j for j, key in enumerate(self.keys)}
+        self.extras = {}
+        self.count = 0
+
+    @classmethod
+    def from_batches(cls, keys, types, batches):
+        """Build from fetch_data.iter_parsed_batches() output."""
+        table = cls(keys, types)
+        for converted, extras in batches:
+            table.extend(converted, extras)
+        table.finish()
+        return table
+
+    def extend(self, converted, extras=None):
+        """Append a batch: one value list per key, extras {batch row: surplus cells}."""
+        for column, values in zip(self.columns, converted):
+            column.extend(values)
+        for i, extra in (extras or {}).items():
+            # DictReader files surplus cells under a None key
+            self.extras[self.count + i] = str(extra)
+        self.count += len(converted[0]) if converted else 0
+
+    def finish(self):
+        for column in self.columns:
+            if isinstance(column, StringColumn):
+                column.finish()
+        return self
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not -self.count <= i < self.count:
+            raise IndexError("entity index out of range")
+        return EntityRow(self, i % self.count)
+
+    def __iter__(self):
+        return map(EntityRow, repeat(self), range(self.count))
+
+    def entity(self, i):
+        """Entity i as the dict parse_entity_data() would return."""
+        return dict(EntityRow(self, i))
+
+    def to_dicts(self):
+        return list(map(self.entity, range(self.count)))
+
+    def nbytes(self):
+        """Approximate bytes held by the columns."""
+        return sum(column.nbytes() for column in self.columns)
+
+    # ─── Serialisation ──────────────────────────────────────────────────────
+
+    def iter_json(self, compact=False, start=0, stop=None):
+        """Yield fetch_data.dump_json(entity, compact) for entities start..stop, in order."""
+        # json.dumps writes the None key of surplus cells as "null"
+        if compact:
+            prefixes = [dumps(key) + ":" for key in self.keys]
+            extra_prefix, sep, open_, close = '"null":', ",", "{", "}"
+        else:
+            prefixes = ["  " + dumps(key) + ": " for key in self.keys]
+            extra_prefix, sep, open_, close = '  "null": ', ",\n", "{\n", "\n}"
+        stop = self.count if stop is None else min(stop, self.count)
+        for begin in range(start, stop, JSON_BATCH_ROWS):
+            end = min(begin + JSON_BATCH_ROWS, stop)
+            frags = [column.fragments(prefix, begin, end) for column, prefix in zip(self.columns, prefixes)]
+            for offset, parts in enumerate(zip(*frags)):
+                parts = list(filter(None, parts))
+                extra = self.extras.get(begin + offset)
+                if extra is not None:
+                    parts.append(extra_prefix + dumps(extra))
+                yield open_ + sep.join(parts) + close
+
+    def entity_json(self, i, compact=False):
+        return next(self.iter_json(compact, i, i + 1))
+
+
+class EntityRow(Mapping):
+    """Read-only view of one entity; reads its table's columns on access."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        j = self.table.position.get(key) if key is not None else None
+        value = self.table.columns[j].get(self.index) if j is not None else self.table.extras.get(self.index)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key, column in zip(self.table.keys, self.table.columns):
+            if column.get(self.index) is not None:
+                yield key
+        if self.index in self.table.extras:
+            yield None
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"EntityRow({dict(self)!r})"
+
+
+# ─── CLI ────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    import fetch_data  # fetch_data imports this module at load time
+
+    tasks = fetch_data.collect_categories()
+    if argv:
+        tasks = [("file", argv[1], argv[0])]
+    for cat_key, schema_path, data_path in tasks:
+        schema = fetch_data.parse_schema_config(schema_path)
+        entities = fetch_data.parse_entity_data(data_path, schema)
+        table = fetch_data.parse_entity_table(data_path, schema)
+        identical = all(
+            list(table.iter_json(compact)) == [fetch_data.dump_json(e, compact) for e in entities]
+            for compact in (False, True)
+        ) and table.to_dicts() == entities
+        dict_bytes = sum(sys.getsizeof(e) + sum(map(sys.getsizeof, e.values())) for e in entities)
+        print(f"  {cat_key}: {len(table)} entities, dicts ~{dict_bytes:,} bytes, table ~{table.nbytes():,} bytes; "
+              f"{'JSON and dicts identical' if identical else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+feedback.py
+───────────
+Batch port of the feedback engine in src/utils/gameLogic.ts plus a greedy
+entropy solver used to measure how hard each target is to find.
+
+evaluate_category() computes the full N×N×F status and direction tensors
+(target × guess × feedback field) with NumPy instead of calling getFeedback()
+once per pair, so the solver can be rerun in seconds while tuning schemas.
+
+The solver observes what a player sees on the board — each visible column's
+tile colour (status) and arrow (direction) plus whether the guess won — and
+always guesses the entity that maximises the entropy of that observation
+over the remaining candidates. Visible columns follow getDisplayColumns()
+and the hiddenColumns of each difficulty in difficultyConfig.ts.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.feedback
+    python -m pipeline.feedback --category countries --difficulty prodigy
+"""
+
+import argparse
+import json
+import math
+import re
+import time
+
+import numpy as np
+
+from pipeline import distances
+
+GAME_DATA_FILE = "./src/assets/data/gameData.json"
+DIFFICULTY_CONFIG_FILE = "./src/utils/difficultyConfig.ts"
+
+# FeedbackStatus / FeedbackDirection, ordered so a higher status is warmer
+MISS, NEAR, HOT, EXACT = 0, 1, 2, 3
+STATUS_NAMES = ("MISS", "NEAR", "HOT", "EXACT")
+DIR_NONE, DIR_EQUAL, DIR_UP, DIR_DOWN = 0, 1, 2, 3
+DIRECTION_NAMES = ("NONE", "EQUAL", "UP", "DOWN")
+
+FEEDBACK_LOGIC_TYPES = ("EXACT_MATCH", "CATEGORY_MATCH", "HIGHER_LOWER", "GEO_DISTANCE", "SET_INTERSECTION")
+
+
+# ─── JS value coercions ─────────────────────────────────────────────────────
+
+def js_string(value, missing="undefined"):
+    """String(value) for the JSON value types gameData can hold.
+
+    ``missing`` is what an absent key turns into: "undefined" for String(v),
+    "" for String(v ?? '').
+    """
+    if value is None:
+        return missing
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e21:
+        return str(int(value))
+    return str(value)
+
+
+def js_number(value):
+    """Number(value); absent keys are undefined and become NaN."""
+    if value is None:
+        return math.nan
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = value.strip()
+    if not s:
+        return 0.0
+    if re.fullmatch(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|[+-]?Infinity", s):
+        return float(s)
+    return math.nan
+
+
+def js_to_bool(value):
+    """toBool() from handleExactMatch()."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    return js_string(value, "").lower().strip() in ("true", "1", "yes")
+
+
+def js_round(x):
+    """Math.round over an array: nearest integer, halves toward +Infinity."""
+    r = np.floor(x)
+    return r + (x - r >= 0.5)
+
+
+def codes(values):
+    """Factorise a list of hashables into int codes for vectorised equality."""
+    _, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return inverse.reshape(-1)
+
+
+def equal_matrix(column_codes):
+    return column_codes[:, np.newaxis] == column_codes[np.newaxis, :]
+
+
+# ─── Per-logic-type kernels (rows = target, columns = guess) ────────────────
+
+def exact_match(entities, field):
+    key = field["attributeKey"]
+    if field["dataType"] == "BOOLEAN":
+        flags = np.array([js_to_bool(e.get(key)) for e in entities])
+        match = flags[:, np.newaxis] == flags[np.newaxis, :]
+    else:
+        match = equal_matrix(codes([js_string(e.get(key)).lower() for e in entities]))
+    return np.where(match, EXACT, MISS), None
+
+
+def category_match(entities, field):
+    key = field["attributeKey"]
+    match = equal_matrix(codes([js_string(e.get(key), "").lower() for e in entities]))
+    return np.where(match, EXACT, MISS), None
+
+
+def higher_lower(entities, field):
+    key = field["attributeKey"]
+    values = np.array([js_number(e.get(key)) for e in entities], dtype=np.float64)
+    t = values[:, np.newaxis]
+    g = values[np.newaxis, :]
+    t_nan, g_nan = np.isnan(t), np.isnan(g)
+
+    direction = np.full((len(values), len(values)), DIR_EQUAL, dtype=np.uint8)
+    direction[np.broadcast_to(g < t, direction.shape)] = DIR_UP
+    direction[np.broadcast_to(g > t, direction.shape)] = DIR_DOWN
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if field.get("displayFormat") == "ALPHA_POSITION":
+            abs_diff = np.abs(t - g)
+            status = np.where(abs_diff == 1, HOT, np.where(abs_diff == 2, NEAR, MISS))
+        else:
+            larger = np.maximum(np.abs(t), np.abs(g))
+            smaller = np.minimum(np.abs(t), np.abs(g))
+            safe_denom = np.where(smaller > 0, smaller, 1)
+            near = js_round((larger / safe_denom - 1) * 100) <= 25
+
+            linked = field.get("linkedCategoryCol")
+            if linked:
+                cat_match = equal_matrix(codes([js_string(e.get(linked), "").lower() for e in entities]))
+            else:
+                cat_match = near
+            status = np.where(cat_match, HOT, np.where(near, NEAR, MISS))
+
+    status = np.where(g == t, EXACT, status)
+    either_nan = t_nan | g_nan
+    status = np.where(either_nan, np.where(t_nan & g_nan, EXACT, MISS), status)
+    direction[either_nan] = DIR_NONE
+    return status, direction
+
+
+def geo_distance(entities, field):
+    km = distances.distance_matrix(entities).astype(np.int64)
+    km[km == distances.MISSING_KM] = distances.UNKNOWN_DISTANCE_KM
+    status = np.select([km == 0, km < 1000, km < 3000], [EXACT, HOT, NEAR], MISS)
+    return status, None
+
+
+def set_intersection(entities, field):
+    key = field["attributeKey"]
+    items = [
+        [s.strip().lower() for s in js_string(e.get(key), "").split(",") if s.strip()]
+        for e in entities
+    ]
+    vocab = {item: i for i, item in enumerate(sorted({s for row in items for s in row}))}
+    present = np.zeros((len(entities), max(len(vocab), 1)), dtype=np.int64)
+    counts = np.zeros_like(present)
+    for row, entity_items in enumerate(items):
+        for item in entity_items:
+            present[row, vocab[item]] = 1
+            counts[row, vocab[item]] += 1
+
+    # matched counts the guess's items (duplicates included) found in the target
+    matched = present @ counts.T
+    shared = present @ present.T
+    sizes = present.sum(axis=1)
+    union = sizes[:, np.newaxis] + sizes[np.newaxis, :] - shared
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.where(union > 0, matched / np.maximum(union, 1), 0.0)
+    status = np.select([(union > 0) & (ratio == 1), ratio > 0.5, ratio > 0], [EXACT, HOT, NEAR], MISS)
+    return status, None
+
+
+KERNELS = {
+    "EXACT_MATCH": exact_match,
+    "CATEGORY_MATCH": category_match,
+    "HIGHER_LOWER": higher_lower,
+    "GEO_DISTANCE": geo_distance,
+    "SET_INTERSECTION": set_intersection,
+}
+
+
+def feedback_fields(schema):
+    """Fields getFeedback() produces feedback for, in schema order."""
+    return [f for f in schema if f["logicType"] in FEEDBACK_LOGIC_TYPES]
+
+
+def evaluate_category(entities, schema):
+    """Return (fields, status, direction) for every (target, guess) pair.
+
+    status and direction are uint8 arrays of shape (N, N, F) indexed
+    [target, guess, field]; fields is the list of schema fields along F.
+    """
+    fields = feedback_fields(schema)
+    n = len(entities)
+    status = np.empty((n, n, len(fields)), dtype=np.uint8)
+    direction = np.zeros((n, n, len(fields)), dtype=np.uint8)
+    for k, field in enumerate(fields):
+        field_status, field_direction = KERNELS[field["logicType"]](entities, field)
+        status[:, :, k] = field_status
+        if field_direction is not None:
+            direction[:, :, k] = field_direction
+    return fields, status, direction
+
+
+# ─── Solver ─────────────────────────────────────────────────────────────────
+
+def load_hidden_columns(path=DIFFICULTY_CONFIG_FILE):
+    """Read {difficulty: {category: [hidden keys]}} from difficultyConfig.ts."""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    hidden = {}
+    for name, body in re.findall(r"\n    (\w+): \{(.*?)\n    \},", source, re.S):
+        block = re.search(r"hiddenColumns:\s*\{(.*?)\}", body, re.S)
+        if not block:
+            continue
+        hidden[name] = {
+            cat_key: re.findall(r"'([^']+)'", keys)
+            for cat_key, keys in re.findall(r"(\w+):\s*\[(.*?)\]", block.group(1), re.S)
+        }
+    return hidden
+
+
+def visible_mask(fields, hidden_keys=()):
+    """getDisplayColumns(): non-HIDDEN fields not hidden by the difficulty."""
+    return np.array(
+        [f["displayFormat"] != "HIDDEN" and f["attributeKey"] not in hidden_keys for f in fields],
+        dtype=bool,
+    )
+
+
+def observation_ids(status, direction, visible):
+    """Dense id per (target, guess) of what the player observes.
+
+    Two pairs share an id when every visible tile has the same colour and
+    arrow and both did or did not win (checkWinCondition over all fields).
+    """
+    n = status.shape[0]
+    won = (status == EXACT).all(axis=2)
+    observed = np.concatenate(
+        [
+            status[:, :, visible] * 4 + direction[:, :, visible],
+            won[:, :, np.newaxis].astype(np.uint8),
+        ],
+        axis=2,
+    ).reshape(n * n, -1)
+    _, inverse = np.unique(observed, axis=0, return_inverse=True)
+    return inverse.reshape(n, n), won
+
+
+def observation_entropy(obs, candidates):
+    """Entropy (bits) of the observation over candidates, for every guess at once."""
+    m = len(candidates)
+    n_guesses = obs.shape[1]
+    column_sorted = np.sort(obs[candidates], axis=0)
+    starts = np.ones_like(column_sorted, dtype=bool)
+    starts[1:] = column_sorted[1:] != column_sorted[:-1]
+    run_ids = np.cumsum(starts, axis=0) - 1 + np.arange(n_guesses) * m
+    sizes = np.bincount(run_ids.ravel(), minlength=m * n_guesses).reshape(n_guesses, m)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted = np.where(sizes > 0, sizes * np.log2(np.maximum(sizes, 1)), 0.0)
+    return math.log2(m) - weighted.sum(axis=1) / m
+
+
+def solve(obs, won):
+    """Greedy entropy solver; returns the number of moves to find each target.
+
+    The decision tree is shared by all targets, so each candidate set is
+    solved once and its subsets are split by the chosen guess's observation.
+    """
+    n = obs.shape[0]
+    moves = np.zeros(n, dtype=np.int64)
+    first_guess = None
+    stack = [(np.arange(n), 1)]
+    while stack:
+        candidates, depth = stack.pop()
+        entropy = observation_entropy(obs, candidates)
+        # Prefer a guess that could itself be the answer when it splits as well
+        entropy[candidates] += 1e-9
+        guess = int(np.argmax(entropy))
+        if first_guess is None:
+            first_guess = guess
+
+        solved = won[candidates, guess]
+        moves[candidates[solved]] = depth
+        remaining = candidates[~solved]
+        if len(remaining) == 0:
+            continue
+        if entropy[guess] <= 1e-9 and len(remaining) == len(candidates):
+            # Indistinguishable candidates: the player guesses them one by one
+            moves[remaining] = depth + np.arange(1, len(remaining) + 1)
+            continue
+        groups = obs[remaining, guess]
+        order = np.argsort(groups, kind="stable")
+        boundaries = np.flatnonzero(np.diff(groups[order])) + 1
+        for group in np.split(remaining[order], boundaries):
+            stack.append((group, depth + 1))
+    return moves, first_guess
+
+
+def difficulty_report(entities, schema, hidden_by_difficulty, cat_key):
+    """Expected moves per target for every difficulty level."""
+    fields, status, direction = evaluate_category(entities, schema)
+    report = {}
+    for difficulty, hidden in hidden_by_difficulty.items():
+        obs, won = observation_ids(status, direction, visible_mask(fields, hidden.get(cat_key, [])))
+        moves, first_guess = solve(obs, won)
+        report[difficulty] = {
+            "expectedMoves": float(moves.mean()),
+            "worstMoves": int(moves.max()),
+            "firstGuess": entities[first_guess]["id"],
+            "histogram": {int(k): int(v) for k, v in zip(*np.unique(moves, return_counts=True))},
+            "moves": {e["id"]: int(m) for e, m in zip(entities, moves)},
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=GAME_DATA_FILE)
+    parser.add_argument("--category", action="append", help="Limit to these categories (repeatable).")
+    parser.add_argument("--difficulty", action="append", help="Limit to these difficulty levels (repeatable).")
+    parser.add_argument("--hardest", type=int, default=5, help="Number of hardest targets to list.")
+    parser.add_argument("--out", help="Also write the full per-target report as JSON.")
+    args = parser.parse_args(argv)
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    hidden_by_difficulty = load_hidden_columns()
+    if args.difficulty:
+        hidden_by_difficulty = {d: hidden_by_difficulty[d] for d in args.difficulty}
+
+    full_report = {}
+    for cat_key, entities in payload["categories"].items():
+        if args.category and cat_key not in args.category:
+            continue
+        start = time.perf_counter()
+        report = difficulty_report(entities, payload["schemaConfig"][cat_key], hidden_by_difficulty, cat_key)
+        elapsed = time.perf_counter() - start
+        full_report[cat_key] = report
+
+        fields = len(feedback_fields(payload["schemaConfig"][cat_key]))
+        print(f"\n{cat_key}: {len(entities)}×{len(entities)}×{fields} feedback tensor, solved in {elapsed:.2f}s")
+        for difficulty, stats in report.items():
+            hardest = sorted(stats["moves"].items(), key=lambda kv: -kv[1])[:args.hardest]
+            print(
+                f"  {difficulty:<8s} expected {stats['expectedMoves']:.2f} moves, "
+                f"worst {stats['worstMoves']}, opener {stats['firstGuess']}"
+            )
+            print(f"           histogram {stats['histogram']}")
+            print(f"           hardest   {', '.join(f'{k} ({v})' for k, v in hardest)}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(full_report, f, indent=2)
+        print(f"\nReport saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
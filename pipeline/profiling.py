@@ -0,0 +1,137 @@
+"""
+profiling.py
+────────────
+Per-stage instrumentation for the build scripts. Each stage (schema parse,
+CSV read, value cleaning, categorization, serialization, write) runs through
+StageProfiler.run(), which records for that category and stage:
+
+  seconds        wall time
+  rows, rowsPerSec
+  bytesRead      input bytes the stage consumed from disk
+  bytesWritten   output bytes the stage produced
+  peakAllocBytes peak Python allocations above the stage's starting point
+                 (tracemalloc; allocations by C extensions such as pandas
+                 buffers are only partly visible)
+
+tracemalloc slows allocation-heavy code down, so compare timings between
+profiled runs rather than against unprofiled ones. The report names the
+hottest stage; dump_hottest() re-runs just that stage under cProfile, with
+tracemalloc off, and saves the stats for `python -m pstats` or snakeviz.
+"""
+
+import cProfile
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+
+class StageProfiler:
+    """Collects one record per (category, stage); a disabled profiler just calls through."""
+
+    def __init__(self, enabled=True, trace_memory=True):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.records = []
+        self._calls = []
+        self._start = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def run(self, category, stage, fn, *args, rows=None, bytes_read=0, bytes_written=None):
+        """Run fn(*args) as one stage and return its result.
+
+        rows and bytes_written may be numbers or callables applied to the result.
+        """
+        if not self.enabled:
+            return fn(*args)
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - base if self.trace_memory else None
+
+        rows = rows(result) if callable(rows) else rows
+        bytes_written = bytes_written(result) if callable(bytes_written) else bytes_written
+        self.records.append({
+            "category": category,
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "rowsPerSec": round(rows / seconds) if rows and seconds else None,
+            "bytesRead": bytes_read or 0,
+            "bytesWritten": bytes_written or 0,
+            "peakAllocBytes": peak,
+        })
+        self._calls.append((fn, args))
+        return result
+
+    def hottest(self):
+        """Index of the slowest recorded stage, or None."""
+        if not self.records:
+            return None
+        return max(range(len(self.records)), key=lambda i: self.records[i]["seconds"])
+
+    def report(self):
+        hottest = self.hottest()
+        return {
+            "python": platform.python_version(),
+            "tracemalloc": self.trace_memory,
+            "totalSeconds": round(time.perf_counter() - self._start, 6),
+            "stages": self.records,
+            "hottest": None if hottest is None else {
+                key: self.records[hottest][key] for key in ("category", "stage", "seconds")
+            },
+        }
+
+    def dump_hottest(self, path):
+        """Re-run the hottest stage under cProfile and write its stats to path."""
+        hottest = self.hottest()
+        if hottest is None:
+            return None
+        fn, args = self._calls[hottest]
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.stop()
+        profile = cProfile.Profile()
+        try:
+            profile.runcall(fn, *args)
+        finally:
+            if tracing:
+                tracemalloc.start()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profile.dump_stats(path)
+        return self.records[hottest]
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def fmt_bytes(n):
+    if n is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def print_report(report):
+    print(f"\n  {'category':<12s} {'stage':<12s} {'seconds':>9s} {'rows/s':>12s} "
+          f"{'read':>10s} {'written':>10s} {'peak alloc':>11s}")
+    for r in report["stages"]:
+        rate = f"{r['rowsPerSec']:,}" if r["rowsPerSec"] else "-"
+        print(f"  {r['category']:<12s} {r['stage']:<12s} {r['seconds']:>9.4f} {rate:>12s} "
+              f"{fmt_bytes(r['bytesRead']):>10s} {fmt_bytes(r['bytesWritten']):>10s} "
+              f"{fmt_bytes(r['peakAllocBytes']):>11s}")
+    if report["hottest"]:
+        h = report["hottest"]
+        print(f"  Hottest stage: {h['category']} / {h['stage']} ({h['seconds']:.4f}s)")
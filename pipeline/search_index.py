@@ -0,0 +1,279 @@
+"""
+search_index.py
+───────────────
+Precomputed autocompletion index per category, so a keystroke no longer
+scans every entity.
+
+getSuggestions() in gameLogic.ts keeps the entities whose lower-cased name
+or id contains the lower-cased query, drops guessed ids, keeps the first
+entity of each name and returns the first `limit` in entity order. The
+index answers the same substring question from n-gram postings:
+
+    {
+      "version": 1,
+      "normalization": "lower",
+      "gram": 3,
+      "ids":      ["IND", ...],          entity order of gameData.json
+      "nameOf":   [0, ...],              index into "names" per entity
+      "names":    ["India", ...],        unique names, first occurrence order
+      "nameKeys": ["india", ...],        normalised name per entity
+      "idKeys":   ["ind", ...],          normalised id per entity
+      "postings": {"ind": [0, 41], ...}  ascending entity indices
+    }
+
+Every 1- and 2-gram and every 3-gram of each normalised name and id has a
+posting list. A query of up to 3 characters reads its own posting list.
+A longer query intersects the lists of its 3-grams, smallest first, then
+confirms each candidate with a substring test. Query cost therefore depends
+on how rare the query's 3-grams are, not on the size of the category.
+
+"lower" normalisation (str.lower, same as toLowerCase for the data we ship)
+gives results identical to getSuggestions; search_linear() is the
+reference port and build_search_indexes() checks both agree on every
+substring of every name and id before writing. "fold" (case-folded and
+accent-stripped) is available for accent-insensitive matching.
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.search_index            # parity check + latency vs category size
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import unicodedata
+
+FORMAT_VERSION = 1
+GRAM = 3
+DEFAULT_LIMIT = 8
+
+
+# ─── Normalisation ──────────────────────────────────────────────────────────
+
+def fold(text):
+    """Case-fold and strip accents: 'Curaçao' → 'curacao'."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+NORMALIZERS = {
+    "lower": str.lower,
+    "fold": fold,
+}
+
+
+def grams(key):
+    """Every 1- and 2-gram of key plus its GRAM-grams."""
+    out = set()
+    for n in range(1, GRAM + 1):
+        out.update(key[i:i + n] for i in range(len(key) - n + 1))
+    return out
+
+
+def query_grams(q):
+    """Postings to intersect for a normalised query."""
+    if len(q) <= GRAM:
+        return {q}
+    return {q[i:i + GRAM] for i in range(len(q) - GRAM + 1)}
+
+
+# ─── Reference: getSuggestions() from gameLogic.ts ──────────────────────────
+
+def search_linear(entities, query, guessed_ids=frozenset(), limit=DEFAULT_LIMIT):
+    """Straight port of getSuggestions(): scan, filter, dedupe names, slice."""
+    if limit == 0 or not query.strip():
+        return []
+    lower_q = query.lower()
+    matches = [
+        e for e in entities
+        if e["id"] not in guessed_ids and (lower_q in e["name"].lower() or lower_q in e["id"].lower())
+    ]
+    seen = set()
+    unique = []
+    for e in matches:
+        if e["name"] not in seen:
+            seen.add(e["name"])
+            unique.append(e)
+    return unique[:limit]
+
+
+# ─── Index ──────────────────────────────────────────────────────────────────
+
+def build_search_index(entities, normalization="lower"):
+    normalize = NORMALIZERS[normalization]
+    names, name_index, name_of = [], {}, []
+    name_keys, id_keys = [], []
+    postings = {}
+    for i, entity in enumerate(entities):
+        name = entity["name"]
+        if name not in name_index:
+            name_index[name] = len(names)
+            names.append(name)
+        name_of.append(name_index[name])
+
+        name_key, id_key = normalize(name), normalize(entity["id"])
+        name_keys.append(name_key)
+        id_keys.append(id_key)
+        for gram in grams(name_key) | grams(id_key):
+            postings.setdefault(gram, []).append(i)
+
+    return {
+        "version": FORMAT_VERSION,
+        "normalization": normalization,
+        "gram": GRAM,
+        "ids": [e["id"] for e in entities],
+        "nameOf": name_of,
+        "names": names,
+        "nameKeys": name_keys,
+        "idKeys": id_keys,
+        "postings": dict(sorted(postings.items())),
+    }
+
+
+def candidates(index, q):
+    """Ascending entity indices whose keys may contain q (a superset of the matches)."""
+    lists = []
+    for gram in query_grams(q):
+        posting = index["postings"].get(gram)
+        if not posting:
+            return []
+        lists.append(posting)
+    lists.sort(key=len)
+    if len(lists) == 1:
+        return lists[0]
+    rest = [set(p) for p in lists[1:]]
+    return [i for i in lists[0] if all(i in s for s in rest)]
+
+
+def search(index, query, guessed_ids=frozenset(), limit=DEFAULT_LIMIT):
+    """Entity indices getSuggestions() would return, in the same order."""
+    if limit == 0 or not query.strip():
+        return []
+    q = NORMALIZERS[index["normalization"]](query)
+    ids, name_of = index["ids"], index["nameOf"]
+    name_keys, id_keys = index["nameKeys"], index["idKeys"]
+    seen = set()
+    out = []
+    for i in candidates(index, q):
+        if ids[i] in guessed_ids or not (q in name_keys[i] or q in id_keys[i]):
+            continue
+        if name_of[i] in seen:
+            continue
+        seen.add(name_of[i])
+        out.append(i)
+        if len(out) == limit:
+            break
+    return out if limit > 0 else out[:limit]
+
+
+# ─── Verification ───────────────────────────────────────────────────────────
+
+def parity_queries(entities, max_len=4):
+    """Every substring (up to max_len) of every name and id, in original case."""
+    queries = set()
+    for e in entities:
+        for text in (e["name"], e["id"]):
+            for n in range(1, max_len + 1):
+                queries.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return sorted(queries)
+
+
+def verify_search_index(entities, index, queries, guessed_ids=frozenset(), limit=DEFAULT_LIMIT):
+    """Compare search() with search_linear() for every query; return mismatches."""
+    mismatches = []
+    for query in queries:
+        expected = [e["id"] for e in search_linear(entities, query, guessed_ids, limit)]
+        got = [index["ids"][i] for i in search(index, query, guessed_ids, limit)]
+        if got != expected:
+            mismatches.append((query, expected, got))
+    return mismatches
+
+
+def build_search_indexes(payload, out_dir, normalization="lower"):
+    """Build, verify and write <cat>.search.json for every category.
+
+    Returns {cat_key: (file_path, entity_count, postings)}. Raises ValueError
+    if the "lower" index disagrees with getSuggestions() on any query.
+    """
+    written = {}
+    for cat_key, entities in payload["categories"].items():
+        index = build_search_index(entities, normalization)
+        if normalization == "lower":
+            mismatches = verify_search_index(entities, index, parity_queries(entities))
+            if mismatches:
+                raise ValueError(f"{cat_key}: {len(mismatches)} search mismatches, e.g. {mismatches[:3]}")
+        path = os.path.join(out_dir, f"{cat_key}.search.json")
+        os.makedirs(out_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        written[cat_key] = (path, len(entities), len(index["postings"]))
+    return written
+
+
+# ─── Latency comparison ─────────────────────────────────────────────────────
+
+def scaled_entities(entities, factor):
+    """Replicate a category `factor` times with distinct ids and names."""
+    if factor == 1:
+        return entities
+    return [
+        {**e, "id": f"{e['id']}{k}", "name": f"{e['name']} {k}"}
+        for k in range(factor) for e in entities
+    ]
+
+
+def mean_query_us(fn, queries, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+
+def compare_latency(entities, factors=(1, 10, 100), samples=200, seed=0):
+    pool = parity_queries(entities)
+    queries = random.Random(seed).sample(pool, min(samples, len(pool)))
+    rows = []
+    for factor in factors:
+        scaled = scaled_entities(entities, factor)
+        index = build_search_index(scaled)
+        rows.append({
+            "entities": len(scaled),
+            "linear_us": mean_query_us(lambda q: search_linear(scaled, q), queries),
+            "index_us": mean_query_us(lambda q: search(index, q), queries),
+        })
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else "./src/assets/data/gameData.json"
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    rng = random.Random(0)
+    for cat_key, entities in payload["categories"].items():
+        index = build_search_index(entities)
+        queries = parity_queries(entities)
+        guessed = frozenset(rng.sample([e["id"] for e in entities], min(10, len(entities))))
+        mismatches = []
+        for limit in (DEFAULT_LIMIT, 3, 1, 0):
+            mismatches += verify_search_index(entities, index, queries, frozenset(), limit)
+            mismatches += verify_search_index(entities, index, queries, guessed, limit)
+        status = "identical to getSuggestions" if not mismatches else f"{len(mismatches)} MISMATCHES"
+        print(f"{cat_key}: {len(queries):,} queries × 8 variants — {status}")
+        for m in mismatches[:5]:
+            print(f"  {m}")
+
+        print(f"  {'entities':>9} {'linear µs':>10} {'index µs':>9}")
+        for row in compare_latency(entities):
+            print(f"  {row['entities']:>9,} {row['linear_us']:>10.1f} {row['index_us']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
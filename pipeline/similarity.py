@@ -0,0 +1,299 @@
+"""
+similarity.py
+─────────────
+Precomputed k-nearest-neighbour index per category: for every entity, the
+entities most similar to it across the schema's HIGHER_LOWER and
+CATEGORY_MATCH columns, for hints and "closest guess" features.
+
+Each column becomes one feature:
+
+  HIGHER_LOWER    numeric value, log-scaled (log1p) when the column is shown
+                  as PERCENTAGE_DIFF, then standardised to unit variance
+  CATEGORY_MATCH  lower-cased value one-hot encoded and scaled by 1/√2, so
+                  two different values are exactly 1 apart
+
+The distance between two entities is the root mean squared feature
+difference over the columns both of them have, so a missing value (absent,
+or the -1 sentinel) neither helps nor hurts. Pairs with no column in common
+are never neighbours.
+
+All pairwise distances come from one masked matrix product per block of
+target rows (plus one counting the shared columns), and the top k of
+each row is taken with argpartition on the mean squares; only the k winners
+get a square root. A block holds about BLOCK_CELLS distances
+however large N is, so memory stays flat and the time grows as N², about
+10 s for 20,000 entities on one core.
+
+<cat>.neighbors.json:
+
+    {
+      "version": 1,
+      "k": 10,
+      "fields": ["continent", "area", ...],
+      "ids": ["AFG", ...],                  entity order of gameData.json
+      "neighbors": [[17, 160, ...], ...],   per entity, most similar first
+      "distance":  [[0.412, 0.5, ...], ...] matching RMS distances
+    }
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.similarity           # verify, show examples, time 10× / 100× scaling
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from pipeline.continuum_ranks import MISSING_SENTINEL
+
+GAME_DATA_FILE = "./src/assets/data/gameData.json"
+FORMAT_VERSION = 1
+DEFAULT_K = 10
+# Distance cells (rows × entities) evaluated at once, about 64 MB of float64
+BLOCK_CELLS = 1 << 23
+DISTANCE_DIGITS = 3
+
+SIMILARITY_LOGIC_TYPES = ("HIGHER_LOWER", "CATEGORY_MATCH")
+
+
+# ─── Features ───────────────────────────────────────────────────────────────
+
+def similarity_fields(schema):
+    return [f for f in schema if f["logicType"] in SIMILARITY_LOGIC_TYPES and not f.get("isVirtual")]
+
+
+def numeric_feature(entities, field):
+    """(N×1 standardised values, N presence mask)."""
+    key = field["attributeKey"]
+    values = np.array([
+        v if isinstance(v, (int, float)) and not isinstance(v, bool) and v != MISSING_SENTINEL else np.nan
+        for v in (e.get(key) for e in entities)
+    ], dtype=np.float64)
+    present = np.isfinite(values)
+    if field.get("displayFormat") == "PERCENTAGE_DIFF":
+        values = np.sign(values) * np.log1p(np.abs(values))
+    if present.any():
+        std = values[present].std()
+        values = (values - values[present].mean()) / (std if std > 0 else 1)
+    return np.where(present, values, 0)[:, np.newaxis], present
+
+
+def category_feature(entities, field):
+    """(N×C one-hot scaled by 1/√2, N presence mask)."""
+    key = field["attributeKey"]
+    labels = [str(e.get(key, "") if e.get(key) is not None else "").strip().lower() for e in entities]
+    present = np.array([label != "" for label in labels])
+    _, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    one_hot = np.zeros((len(entities), codes.max() + 1 if len(codes) else 0))
+    one_hot[np.arange(len(entities)), codes] = 1 / math.sqrt(2)
+    one_hot[~present] = 0
+    return one_hot, present
+
+
+def feature_matrix(entities, fields):
+    """X (N×D features), column_mask (N×D), field_mask (N×F)."""
+    blocks, masks, field_masks = [], [], []
+    for field in fields:
+        if field["logicType"] == "HIGHER_LOWER":
+            x, present = numeric_feature(entities, field)
+        else:
+            x, present = category_feature(entities, field)
+        blocks.append(x)
+        masks.append(np.repeat(present[:, np.newaxis], x.shape[1], axis=1))
+        field_masks.append(present)
+    n = len(entities)
+    if not blocks:
+        return np.zeros((n, 0)), np.zeros((n, 0)), np.zeros((n, 0))
+    return (np.hstack(blocks), np.hstack(masks).astype(np.float64),
+            np.column_stack(field_masks).astype(np.float64))
+
+
+# ─── Neighbours ─────────────────────────────────────────────────────────────
+
+def pair_operands(x, column_mask):
+    """Left/right operands whose product is the masked squared distance.
+
+    Missing features are already 0 in x, so for entities a and b the sum
+    Σ m_a m_b (x_a - x_b)² expands to x²_a·m_b + m_a·x²_b - 2 x_a·x_b, one
+    matrix product of the stacked operands.
+    """
+    x2 = x * x
+    return np.hstack([x2, column_mask, x]), np.hstack([column_mask, x2, -2 * x])
+
+
+def block_mean_squares(left, right, field_mask, rows):
+    """Mean squared difference over shared columns from entities `rows` to every entity.
+
+    Pairs without a shared column come out as NaN (0 / 0), which
+    argpartition sorts after every number, as does each entity to itself.
+    """
+    ms = left[rows] @ right.T
+    np.maximum(ms, 0, out=ms)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        np.divide(ms, field_mask[rows] @ field_mask.T, out=ms)
+    ms[np.arange(len(rows)), rows] = np.nan
+    return ms
+
+
+def nearest_neighbors(entities, fields, k=DEFAULT_K, block_cells=BLOCK_CELLS):
+    """(N×k neighbour indices, N×k distances), nearest first; -1 / inf pad short rows."""
+    x, column_mask, field_mask = feature_matrix(entities, fields)
+    left, right = pair_operands(x, column_mask)
+    n = len(entities)
+    k = min(k, max(n - 1, 0))
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    dist = np.full((n, k), np.inf)
+    if k == 0:
+        return neighbors, dist
+    block_rows = max(1, block_cells // n)
+    for start in range(0, n, block_rows):
+        rows = np.arange(start, min(start + block_rows, n))
+        ms = block_mean_squares(left, right, field_mask, rows)
+        top = np.argpartition(ms, k - 1, axis=1)[:, :k]
+        # The square root is monotonic, so it is only taken for the winners
+        top_d = np.sqrt(np.take_along_axis(ms, top, axis=1))
+        top_d[np.isnan(top_d)] = np.inf
+        # Nearest first, ties by entity index
+        order = np.lexsort((top, top_d), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_d = np.take_along_axis(top_d, order, axis=1)
+        neighbors[rows] = np.where(np.isfinite(top_d), top, -1)
+        dist[rows] = top_d
+    return neighbors, dist
+
+
+def reference_distances(entities, fields, target):
+    """Distance from one entity to every entity, one pair at a time."""
+    x, column_mask, field_mask = feature_matrix(entities, fields)
+    out = np.full(len(entities), np.inf)
+    for j in range(len(entities)):
+        shared_fields = field_mask[target] * field_mask[j]
+        if j == target or not shared_fields.any():
+            continue
+        shared = column_mask[target] * column_mask[j]
+        out[j] = math.sqrt(float((shared * (x[target] - x[j]) ** 2).sum()) / shared_fields.sum())
+    return out
+
+
+def verify_neighbors(entities, fields, neighbors, dist, samples=50, seed=0):
+    """Check sampled rows against reference_distances(); return mismatches.
+
+    The listed distances must match, and no unlisted entity may be closer
+    than the last listed one.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(entities), size=min(samples, len(entities)), replace=False)
+    mismatches = []
+    for i in rows:
+        ref = reference_distances(entities, fields, i)
+        listed = neighbors[i][neighbors[i] >= 0]
+        if not np.allclose(ref[listed], dist[i][:len(listed)], rtol=1e-9, atol=1e-9):
+            mismatches.append((entities[i]["id"], "distance"))
+            continue
+        rest = np.setdiff1d(np.arange(len(entities)), np.append(listed, i))
+        bound = dist[i][len(listed) - 1] if len(listed) else np.inf
+        if len(listed) == neighbors.shape[1] and rest.size and ref[rest].min() < bound - 1e-9:
+            mismatches.append((entities[i]["id"], "missed a closer entity"))
+    return mismatches
+
+
+# ─── Scaling ────────────────────────────────────────────────────────────────
+
+def jittered_entities(entities, fields, factor, seed=0):
+    """Replicate a category `factor` times, numeric values scaled by ±10%.
+
+    Exact copies would make every row full of ties, which is not what a
+    large real category looks like.
+    """
+    if factor == 1:
+        return entities
+    rng = np.random.default_rng(seed)
+    numeric = [f["attributeKey"] for f in fields if f["logicType"] == "HIGHER_LOWER"]
+    out = []
+    for k in range(factor):
+        for e in entities:
+            copy = {**e, "id": f"{e['id']}{k}", "name": f"{e['name']} {k}"}
+            for key in numeric:
+                v = e.get(key)
+                if isinstance(v, (int, float)) and not isinstance(v, bool) and v != MISSING_SENTINEL:
+                    copy[key] = v * rng.uniform(0.9, 1.1)
+            out.append(copy)
+    return out
+
+
+# ─── Output ─────────────────────────────────────────────────────────────────
+
+def neighbor_index(entities, fields, neighbors, dist):
+    rounded = np.round(dist, DISTANCE_DIGITS)
+    return {
+        "version": FORMAT_VERSION,
+        "k": neighbors.shape[1],
+        "fields": [f["attributeKey"] for f in fields],
+        "ids": [e["id"] for e in entities],
+        "neighbors": [[int(j) for j in row if j >= 0] for row in neighbors],
+        "distance": [[float(d) for d in row if np.isfinite(d)] for row in rounded],
+    }
+
+
+def build_neighbor_indexes(payload, out_dir, k=DEFAULT_K):
+    """Build, verify and write <cat>.neighbors.json for every category.
+
+    Returns {cat_key: (file_path, entity_count, field_count)}. Raises
+    ValueError if a sampled row disagrees with the pairwise reference.
+    """
+    written = {}
+    for cat_key, schema in payload["schemaConfig"].items():
+        fields = similarity_fields(schema)
+        if not fields:
+            continue
+        entities = payload["categories"][cat_key]
+        neighbors, dist = nearest_neighbors(entities, fields, k)
+        mismatches = verify_neighbors(entities, fields, neighbors, dist)
+        if mismatches:
+            raise ValueError(f"{cat_key}: {len(mismatches)} neighbour mismatches, e.g. {mismatches[:3]}")
+        path = os.path.join(out_dir, f"{cat_key}.neighbors.json")
+        os.makedirs(out_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(neighbor_index(entities, fields, neighbors, dist), f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        written[cat_key] = (path, len(entities), len(fields))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=GAME_DATA_FILE)
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--scale", type=int, nargs="*", default=[1, 10, 100],
+                        help="Time the index on each category replicated this many times (values jittered).")
+    args = parser.parse_args(argv)
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    for cat_key, schema in payload["schemaConfig"].items():
+        fields = similarity_fields(schema)
+        entities = payload["categories"][cat_key]
+        neighbors, dist = nearest_neighbors(entities, fields, args.k)
+        mismatches = verify_neighbors(entities, fields, neighbors, dist)
+        status = "matches the pairwise reference" if not mismatches else f"{len(mismatches)} MISMATCHES"
+        print(f"{cat_key}: {len(fields)} fields, k={neighbors.shape[1]} — {status}")
+        for i in range(min(3, len(entities))):
+            names = ", ".join(entities[j]["name"] for j in neighbors[i][:5] if j >= 0)
+            print(f"  {entities[i]['name']}: {names}")
+
+        print(f"  {'entities':>9} {'seconds':>9}")
+        for factor in args.scale:
+            scaled = jittered_entities(entities, fields, factor)
+            start = time.perf_counter()
+            nearest_neighbors(scaled, fields, args.k)
+            print(f"  {len(scaled):>9,} {time.perf_counter() - start:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+world_map.py
+────────────
+Builds the world map asset from a world-atlas TopoJSON file: geometries
+re-keyed to entity ids, simplified, quantized, with per-country bounding
+boxes and centroids.
+
+  join      each geometry's M49 code goes through M49_TO_ISO3 in
+            countryCodeMap.ts to an entity id of the countries category.
+            Territories that are not game entities (NON_ENTITY_TERRITORIES)
+            are dropped; any other geometry that does not resolve to an
+            entity fails the build, instead of rendering as a blank region.
+  simplify  Visvalingam–Whyatt on every arc, keeping its end points. Shared
+            borders are one arc in TopoJSON, so neighbours stay seamless.
+            Points whose triangle area is below `tolerance` (square
+            degrees) are removed. A ring that would drop below 4 points
+            keeps its arcs unsimplified.
+  quantize  coordinates are snapped to a `quantization`×`quantization`
+            grid over the bounding box and delta-encoded, as in
+            topojson-client's transform.
+  measure   bbox ([west, south, east, north]; west > east when a country
+            crosses the antimeridian) and the area-weighted centroid of
+            each country are computed from the unsimplified rings.
+  verify    the decoded output must have closed, joined rings, and each
+            country's area must stay within MAX_AREA_CHANGE of its source
+            area; small states lose the most, so a looser tolerance fails
+            the build instead of quietly deforming them.
+
+Output (<out>/countries.map.json) is a TopoJSON Topology with one object,
+"countries". Each geometry has the entity id as "id", plus "bbox" and
+properties {name, centroid}. Entities without a shape at the source
+resolution, usually small island states, are listed in "unshaped".
+
+Usage (from the repo root, after python fetch_data.py):
+    python -m pipeline.world_map [--tolerance 0.02] [--quantization 10000]
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import os
+import re
+
+import numpy as np
+
+GAME_DATA_FILE = "./src/assets/data/gameData.json"
+TOPOLOGY_FILE = "./src/assets/data/countries-110m.json"
+COUNTRY_CODE_MAP_FILE = "./src/utils/countryCodeMap.ts"
+OUTPUT_NAME = "countries.map.json"
+MAP_CATEGORY = "countries"
+
+DEFAULT_TOLERANCE = 0.02
+DEFAULT_QUANTIZATION = 10_000
+MAX_AREA_CHANGE = 0.05  # relative; LUX, the worst case at the defaults, moves 4.8%
+COORD_DIGITS = 4
+
+# Geometries that are deliberately not game entities, by M49 code or, for
+# the world-atlas shapes without a code, by name
+NON_ENTITY_TERRITORIES = {
+    "010": "Antarctica",
+    "158": "Taiwan",
+    "238": "Falkland Is.",
+    "260": "Fr. S. Antarctic Lands",
+    "304": "Greenland",
+    "540": "New Caledonia",
+    "630": "Puerto Rico",
+    "732": "W. Sahara",
+    "Kosovo": "Kosovo",
+    "N. Cyprus": "N. Cyprus",
+    "Somaliland": "Somaliland",
+}
+
+
+# ─── Input ──────────────────────────────────────────────────────────────────
+
+def load_m49_to_iso3(path=COUNTRY_CODE_MAP_FILE):
+    """Read M49_TO_ISO3 from countryCodeMap.ts (the client's join table)."""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    block = re.search(r"M49_TO_ISO3[^=]*=\s*\{(.*?)\n\};", source, re.S)
+    if not block:
+        raise ValueError(f"M49_TO_ISO3 not found in {path}")
+    return dict(re.findall(r"['\"](\d{3})['\"]\s*:\s*['\"]([A-Z]{3})['\"]", block.group(1)))
+
+
+def decode_arcs(topology):
+    """Absolute [lon, lat] float arrays, one per arc."""
+    transform = topology.get("transform")
+    arcs = []
+    for arc in topology["arcs"]:
+        points = np.asarray(arc, dtype=np.float64)
+        if transform:
+            points = np.cumsum(points, axis=0) * transform["scale"] + transform["translate"]
+        arcs.append(points)
+    return arcs
+
+
+def polygons_of(geometry):
+    """A Polygon or MultiPolygon's arc indices as a list of polygons of rings."""
+    if geometry["type"] == "Polygon":
+        return [geometry["arcs"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["arcs"]
+    return []
+
+
+def ring_points(arcs, ring):
+    """Join a ring's arcs (~i means arc i reversed), dropping shared end points."""
+    parts = []
+    for k, index in enumerate(ring):
+        points = arcs[~index][::-1] if index < 0 else arcs[index]
+        parts.append(points if k == 0 else points[1:])
+    return np.concatenate(parts)
+
+
+# ─── Join ───────────────────────────────────────────────────────────────────
+
+def territory_key(geometry):
+    code = geometry.get("id")
+    return str(code).zfill(3) if code is not None else geometry.get("properties", {}).get("name", "")
+
+
+def join_geometries(geometries, m49_to_iso3, entity_ids):
+    """[(entity_id, geometry)] for the game's countries; raises on unmatched ids."""
+    joined, seen, unmatched = [], {}, []
+    for geometry in geometries:
+        key = territory_key(geometry)
+        entity_id = m49_to_iso3.get(key)
+        if entity_id in entity_ids:
+            if entity_id in seen:
+                raise ValueError(f"{entity_id} matches two geometries ({seen[entity_id]} and {key})")
+            seen[entity_id] = key
+            joined.append((entity_id, geometry))
+        elif key not in NON_ENTITY_TERRITORIES:
+            name = geometry.get("properties", {}).get("name", "?")
+            unmatched.append(f"{key} ({name}) → {entity_id or 'no M49_TO_ISO3 entry'}")
+    if unmatched:
+        raise ValueError(f"{len(unmatched)} map geometries match no entity: {'; '.join(unmatched)}. "
+                         "Fix M49_TO_ISO3 or add them to NON_ENTITY_TERRITORIES.")
+    return joined
+
+
+# ─── Simplification ─────────────────────────────────────────────────────────
+
+def triangle_area(a, b, c):
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def visvalingam(points, tolerance):
+    """Indices of the points of one arc that survive; end points always do.
+
+    A removed point's area is carried to its neighbours when theirs would
+    be smaller, so removal follows the effective-area order.
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return list(range(n))
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    area = [np.inf] * n
+    heap = []
+    for i in range(1, n - 1):
+        area[i] = triangle_area(points[i - 1], points[i], points[i + 1])
+        heap.append((area[i], i))
+    heapq.heapify(heap)
+    removed = [False] * n
+    floor = 0.0
+    while heap:
+        a, i = heapq.heappop(heap)
+        if removed[i] or a != area[i]:
+            continue
+        if a >= tolerance:
+            break
+        floor = max(floor, a)
+        removed[i] = True
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                area[j] = max(triangle_area(points[prev[j]], points[j], points[nxt[j]]), floor)
+                heapq.heappush(heap, (area[j], j))
+    return [i for i in range(n) if not removed[i]]
+
+
+def simplify_arcs(arcs, rings, tolerance):
+    """Simplify every arc; arcs of rings that would collapse are kept whole."""
+    kept = [visvalingam(points, tolerance) for points in arcs]
+    for ring in rings:
+        size = 1 + sum(len(kept[~i if i < 0 else i]) - 1 for i in ring)
+        if size < 4:
+            for i in ring:
+                kept[~i if i < 0 else i] = list(range(len(arcs[~i if i < 0 else i])))
+    return [points[idx] for points, idx in zip(arcs, kept)]
+
+
+# ─── Quantization ───────────────────────────────────────────────────────────
+
+def quantize_arcs(arcs, quantization):
+    """(delta-encoded integer arcs, transform, bbox)."""
+    stacked = np.concatenate(arcs)
+    lo, hi = stacked.min(axis=0), stacked.max(axis=0)
+    scale = np.where(hi > lo, (hi - lo) / (quantization - 1), 1)
+    encoded = []
+    for points in arcs:
+        q = np.round((points - lo) / scale).astype(np.int64)
+        # Drop points that now fall on the previous one, keeping both ends
+        keep = np.ones(len(q), dtype=bool)
+        keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+        keep[-1] = True
+        if keep.sum() < 4 and np.array_equal(q[0], q[-1]):
+            keep[:] = True
+        q = q[keep]
+        encoded.append(np.vstack([q[:1], np.diff(q, axis=0)]).tolist())
+    transform = {"scale": scale.tolist(), "translate": lo.tolist()}
+    return encoded, transform, [*lo.tolist(), *hi.tolist()]
+
+
+# ─── Measurements ───────────────────────────────────────────────────────────
+
+def ring_area_centroid(points):
+    """Shoelace area (unsigned) and centroid of a closed ring."""
+    x, y = points[:-1, 0], points[:-1, 1]
+    x1, y1 = points[1:, 0], points[1:, 1]
+    cross = x * y1 - x1 * y
+    a = cross.sum() / 2
+    if a == 0:
+        return 0.0, points[:-1].mean(axis=0)
+    c = np.array([((x + x1) * cross).sum(), ((y + y1) * cross).sum()]) / (6 * a)
+    return abs(a), c
+
+
+def country_area(arcs, geometry):
+    """Area in square degrees: outer rings minus holes."""
+    total = 0.0
+    for polygon in polygons_of(geometry):
+        for k, ring in enumerate(polygon):
+            a, _ = ring_area_centroid(ring_points(arcs, ring))
+            total += a if k == 0 else -a
+    return total
+
+
+def source_areas(topology, m49_to_iso3, entity_ids):
+    """{entity_id: country_area()} over the unsimplified source topology."""
+    arcs = decode_arcs(topology)
+    joined = join_geometries(topology["objects"]["countries"]["geometries"], m49_to_iso3, entity_ids)
+    return {entity_id: country_area(arcs, geometry) for entity_id, geometry in joined}
+
+
+def area_changes(topology, areas):
+    """{entity_id: relative area change} of each output country against areas."""
+    arcs = decode_arcs(topology)
+    return {
+        g["id"]: abs(country_area(arcs, g) / areas[g["id"]] - 1) if areas[g["id"]] else 0.0
+        for g in topology["objects"]["countries"]["geometries"]
+    }
+
+
+def measure(arcs, geometry):
+    """(bbox, centroid) of a country from its full-resolution rings."""
+    rings = [[ring_points(arcs, ring) for ring in polygon] for polygon in polygons_of(geometry)]
+    lons = np.concatenate([r[:, 0] for polygon in rings for r in polygon])
+    # Countries spanning the antimeridian are measured on 0..360° longitudes
+    wraps = lons.max() - lons.min() > 180
+    total, weighted = 0.0, np.zeros(2)
+    west, south, east, north = np.inf, np.inf, -np.inf, -np.inf
+    for polygon in rings:
+        for k, ring in enumerate(polygon):
+            if wraps:
+                ring = ring.copy()
+                ring[ring[:, 0] < 0, 0] += 360
+            a, c = ring_area_centroid(ring)
+            sign = 1 if k == 0 else -1  # later rings are holes
+            total += sign * a
+            weighted += sign * a * c
+            west, east = min(west, ring[:, 0].min()), max(east, ring[:, 0].max())
+            south, north = min(south, ring[:, 1].min()), max(north, ring[:, 1].max())
+    centroid = weighted / total if total else np.array([(west + east) / 2, (south + north) / 2])
+    wrap = lambda lon: round(float(lon - 360 if lon > 180 else lon), COORD_DIGITS)
+    bbox = [wrap(west), round(float(south), COORD_DIGITS), wrap(east), round(float(north), COORD_DIGITS)]
+    return bbox, [wrap(centroid[0]), round(float(centroid[1]), COORD_DIGITS)]
+
+
+# ─── Build ──────────────────────────────────────────────────────────────────
+
+def build_world_map(topology, entities, m49_to_iso3, tolerance=DEFAULT_TOLERANCE,
+                    quantization=DEFAULT_QUANTIZATION):
+    names = {e["id"]: e["name"] for e in entities}
+    geometries = topology["objects"]["countries"]["geometries"]
+    joined = join_geometries(geometries, m49_to_iso3, set(names))
+    arcs = decode_arcs(topology)
+
+    # Keep only the arcs the game's countries use, renumbered in first-use order
+    renumber = {}
+    for _, geometry in joined:
+        for polygon in polygons_of(geometry):
+            for ring in polygon:
+                for i in ring:
+                    renumber.setdefault(~i if i < 0 else i, len(renumber))
+    remap = lambda i: ~renumber[~i] if i < 0 else renumber[i]
+    used = [arcs[i] for i in renumber]
+
+    out_geometries, rings = [], []
+    for entity_id, geometry in joined:
+        polygons = [[[remap(i) for i in ring] for ring in polygon] for polygon in polygons_of(geometry)]
+        rings.extend(ring for polygon in polygons for ring in polygon)
+        bbox, centroid = measure(arcs, geometry)
+        out_geometries.append({
+            "type": geometry["type"],
+            "arcs": polygons[0] if geometry["type"] == "Polygon" else polygons,
+            "id": entity_id,
+            "bbox": bbox,
+            "properties": {"name": names[entity_id], "centroid": centroid},
+        })
+    out_geometries.sort(key=lambda g: g["id"])
+
+    simplified = simplify_arcs(used, rings, tolerance)
+    encoded, transform, bbox = quantize_arcs(simplified, quantization)
+    shaped = {g["id"] for g in out_geometries}
+    return {
+        "type": "Topology",
+        "bbox": bbox,
+        "transform": transform,
+        "objects": {
+            "countries": {
+                "type": "GeometryCollection",
+                "geometries": out_geometries,
+                "unshaped": sorted(set(names) - shaped),
+            },
+        },
+        "arcs": encoded,
+    }
+
+
+def verify_world_map(topology, source_points, areas, max_area_change=MAX_AREA_CHANGE):
+    """Decode the output and check every ring; return a list of problems.
+
+    Rings must close, each arc must start where the previous one ended, and
+    every country needs a ring with a non-zero area. Each country's area
+    may differ from its source area (`areas`, see source_areas()) by at
+    most max_area_change. The point count may not exceed the source's.
+    """
+    problems = []
+    arcs = decode_arcs(topology)
+    step = max(topology["transform"]["scale"])
+    for geometry in topology["objects"]["countries"]["geometries"]:
+        rings_area = []
+        for polygon in polygons_of(geometry):
+            for ring in polygon:
+                pieces = [arcs[~i][::-1] if i < 0 else arcs[i] for i in ring]
+                for a, b in zip(pieces, pieces[1:]):
+                    if np.abs(a[-1] - b[0]).max() > step:
+                        problems.append(f"{geometry['id']}: arcs of a ring do not join")
+                points = ring_points(arcs, ring)
+                if np.abs(points[0] - points[-1]).max() > step:
+                    problems.append(f"{geometry['id']}: ring is not closed")
+                rings_area.append(ring_area_centroid(points)[0])
+        if not any(a > 0 for a in rings_area):
+            problems.append(f"{geometry['id']}: no ring with an area")
+    for entity_id, change in sorted(area_changes(topology, areas).items()):
+        if change > max_area_change:
+            problems.append(f"{entity_id}: area changed by {change:.1%}, more than {max_area_change:.0%}")
+    points = sum(len(a) for a in topology["arcs"])
+    if points > source_points:
+        problems.append(f"{points} points, more than the source's {source_points}")
+    return problems
+
+
+def write_world_map(payload, out_dir, topology_path=TOPOLOGY_FILE, tolerance=DEFAULT_TOLERANCE,
+                    quantization=DEFAULT_QUANTIZATION):
+    """Build, verify and write countries.map.json; return (path, stats).
+
+    Raises ValueError on unmatched geometries or a broken output topology.
+    """
+    with open(topology_path, "r", encoding="utf-8") as f:
+        source_text = f.read()
+    source = json.loads(source_text)
+    entities = payload["categories"][MAP_CATEGORY]
+    m49_to_iso3 = load_m49_to_iso3()
+    world = build_world_map(source, entities, m49_to_iso3, tolerance, quantization)
+    source_points = sum(len(a) for a in source["arcs"])
+    areas = source_areas(source, m49_to_iso3, {e["id"] for e in entities})
+    problems = verify_world_map(world, source_points, areas)
+    if problems:
+        raise ValueError(f"world map: {len(problems)} problems, e.g. {problems[:3]}")
+
+    text = json.dumps(world, ensure_ascii=False, separators=(",", ":"))
+    path = os.path.join(out_dir, OUTPUT_NAME)
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+    collection = world["objects"]["countries"]
+    changes = area_changes(world, areas)
+    worst = max(changes, key=changes.get) if changes else None
+    stats = {
+        "countries": len(collection["geometries"]),
+        "unshaped": collection["unshaped"],
+        "sourcePoints": source_points,
+        "points": sum(len(a) for a in world["arcs"]),
+        "sourceBytes": len(source_text.encode("utf-8")),
+        "bytes": len(text.encode("utf-8")),
+        "sourceGzipBytes": len(gzip.compress(source_text.encode("utf-8"), 9, mtime=0)),
+        "gzipBytes": len(gzip.compress(text.encode("utf-8"), 9, mtime=0)),
+        "maxAreaChange": [worst, changes[worst]] if worst else None,
+    }
+    return path, stats
+
+
+def print_stats(path, stats):
+    print(f"  World map: {stats['countries']} countries, {stats['points']:,} of {stats['sourcePoints']:,} points, "
+          f"{stats['bytes']:,} bytes (was {stats['sourceBytes']:,}; gzip {stats['gzipBytes']:,}, "
+          f"was {stats['sourceGzipBytes']:,}) → {path}")
+    if stats["maxAreaChange"]:
+        entity_id, change = stats["maxAreaChange"]
+        print(f"    Largest area change: {change:.1%} ({entity_id}), limit {MAX_AREA_CHANGE:.0%}")
+    if stats["unshaped"]:
+        print(f"    No shape at this resolution: {', '.join(stats['unshaped'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=GAME_DATA_FILE)
+    parser.add_argument("--input", default=TOPOLOGY_FILE, help=f"world-atlas TopoJSON (default: {TOPOLOGY_FILE})")
+    parser.add_argument("--out", default="./public/data")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Minimum triangle area kept, in square degrees (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--quantization", type=int, default=DEFAULT_QUANTIZATION,
+                        help=f"Grid size per axis (default: {DEFAULT_QUANTIZATION})")
+    args = parser.parse_args(argv)
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    path, stats = write_world_map(payload, args.out, args.input, args.tolerance, args.quantization)
+    print_stats(path, stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Round trips of pipeline/columnar.py, key order included."""
+
+import json
+
+import pytest
+
+from pipeline import columnar
+
+
+def round_trip(entities):
+    payload = {"schemaConfig": {}, "categories": {"things": entities}}
+    encoded = json.loads(columnar.dumps_compact(columnar.encode_payload(payload)))
+    return columnar.decode_payload(encoded)["categories"]["things"]
+
+
+def assert_exact(entities):
+    decoded = round_trip(entities)
+    assert json.dumps(decoded, ensure_ascii=False) == json.dumps(entities, ensure_ascii=False)
+
+
+def test_missing_leading_column():
+    entities = [
+        {"id": "X", "name": "Ex", "b": 2},
+        {"id": "Y", "name": "Why", "a": 1, "b": 3},
+    ]
+    assert columnar.column_order(entities) == ["a", "b"]
+    assert "keyOrders" not in columnar.encode_category(entities)
+    assert_exact(entities)
+
+
+def test_missing_columns_everywhere():
+    keys = ["continent", "population", "landlocked", "capital", "area"]
+    entities = [
+        {"id": f"E{i}", "name": f"Entity {i}", **{k: v for j, (k, v) in
+                                                 enumerate(zip(keys, ["Asia", i * 10, i % 2 == 0, f"C{i}", 1.5]))
+                                                 if (i >> j) & 1}}
+        for i in range(40)
+    ]
+    assert columnar.column_order(entities) == keys
+    encoded = columnar.encode_category(entities)
+    assert "keyOrders" not in encoded
+    assert all("nulls" in column for column in encoded["columns"])
+    assert_exact(entities)
+
+
+def test_conflicting_orders_are_stored():
+    entities = [
+        {"id": "X", "name": "Ex", "a": 1, "b": 2},
+        {"id": "Y", "name": "Why", "b": 3, "a": 4},
+        {"id": "Z", "name": "Zed", "a": 5},
+    ]
+    encoded = columnar.encode_category(entities)
+    assert list(encoded["keyOrders"]) == ["1"]
+    assert_exact(entities)
+
+
+@pytest.mark.parametrize("values", [[True, 1, 1.0, "1"], [0, False, None, "x"], [[1, 2], "a;b", 3.25, -1]])
+def test_mixed_value_types(values):
+    entities = [{"id": str(i), "name": str(i), "v": v} for i, v in enumerate(values) if v is not None]
+    assert_exact(entities)
+
+
+def test_game_data_round_trip():
+    with open("src/assets/data/gameData.json", "r", encoding="utf-8") as f:
+        text = f.read()
+    payload = json.loads(text)
+    decoded = columnar.decode_payload(json.loads(columnar.dumps_compact(columnar.encode_payload(payload))))
+    assert json.dumps(decoded, indent=2, ensure_ascii=False) == text
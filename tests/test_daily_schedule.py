@@ -0,0 +1,159 @@
+"""Cross-check of pipeline/daily_schedule.py against the client's seeding.
+
+The expected values come from the TypeScript functions in dailyUtils.ts and
+continuumStore.ts run under Node: hashString(), mulberry32(),
+getDailyEntity()'s index and startDailyGameForCategory() + startGame() on
+the synthetic deck below.
+"""
+
+import pytest
+
+from pipeline.daily_schedule import (
+    build_schedule,
+    continuum_round,
+    daily_index,
+    hash_string,
+    lookup,
+    mulberry32,
+    self_check,
+)
+
+TS_HASHES = [
+    ("", 0),
+    ("abc", 96354),
+    ("2026-03-01:countries", 1010360634),
+    ("2026-03-01:continuum:elements:attr-picker", 1605578117),
+    ("\u00e9\u2713\U0001f600", 18327085),  # surrogate pair hashes as two code units
+    ("2027-12-31:continuum:countries:attr-picker", 997340934),
+]
+
+# First five outputs per seed
+TS_MULBERRY32 = {
+    0: [
+        0.26642920868471265,
+        0.0003297457005828619,
+        0.2232720274478197,
+        0.1462021479383111,
+        0.46732782293111086,
+    ],
+    1: [
+        0.6270739405881613,
+        0.002735721180215478,
+        0.5274470399599522,
+        0.9810509674716741,
+        0.9683778982143849,
+    ],
+    988413714: [
+        0.5857063818257302,
+        0.24147327174432576,
+        0.6780377498362213,
+        0.6363511974923313,
+        0.48092199000529945,
+    ],
+    2087226002: [
+        0.4743060111068189,
+        0.610588263720274,
+        0.26114590815268457,
+        0.21371901710517704,
+        0.7602372639812529,
+    ],
+    4294967295: [
+        0.8964226141106337,
+        0.189478256739676,
+        0.7156526781618595,
+        0.9440599093213677,
+        0.8452364315744489,
+    ],
+}
+
+# getDailyEntity() index per date for 197 countries and 118 elements
+TS_DAILY_INDEX = {
+    "2026-03-01": (1, 100),
+    "2026-07-04": (171, 69),
+    "2027-01-15": (118, 68),
+    "2030-12-31": (120, 95),
+}
+
+# date -> (attribute, anchor ids, deal order) for category "synthetic"
+TS_CONTINUUM = {
+    "2026-03-01": (
+        "mass",
+        "E00 E01 E36",
+        "E17 E02 E39 E14 E15 E27 E26 E33 E30 E34 E05 E20 E12 E22 E32 E19 E29 E21 E08"
+        " E09 E10 E28 E18 E11 E06 E23 E24 E07 E04 E35 E31 E03 E25 E37 E16 E38 E13",
+    ),
+    "2026-07-04": (
+        "mass",
+        "E05 E14 E18",
+        "E07 E26 E06 E17 E38 E32 E11 E25 E22 E19 E21 E08 E10 E20 E12 E04 E24 E16 E13"
+        " E09 E28 E23 E02 E00 E29 E30 E01 E31 E03 E36 E35 E39 E34 E33 E15 E27 E37",
+    ),
+    "2027-01-15": (
+        "size",
+        "E26 E11 E15",
+        "E08 E13 E09 E01 E36 E07 E35 E12 E28 E04 E05 E25 E22 E06 E14 E00 E20 E23 E02"
+        " E39 E37 E27 E34 E29 E21 E30 E16 E33 E19 E32 E18",
+    ),
+    "2030-12-31": (
+        "mass",
+        "E00 E32 E36",
+        "E35 E21 E10 E24 E02 E17 E29 E20 E04 E14 E39 E03 E05 E15 E30 E22 E19 E34 E31"
+        " E37 E06 E18 E26 E11 E01 E33 E16 E38 E09 E08 E12 E23 E28 E27 E13 E25 E07",
+    ),
+}
+
+
+def synthetic_deck():
+    """40 cards; "mass" has ties and -1 sentinels, "size" has null cells."""
+    return [
+        {
+            "id": f"E{i:02d}",
+            "mass": (i * 37) % 23 - 1,
+            "size": None if i % 7 == 3 else (i * i * 13) % 101 * 0.25,
+        }
+        for i in range(40)
+    ]
+
+
+@pytest.mark.parametrize("s, expected", TS_HASHES)
+def test_hash_string(s, expected):
+    assert hash_string(s) == expected
+
+
+@pytest.mark.parametrize("seed", sorted(TS_MULBERRY32))
+def test_mulberry32(seed):
+    rand = mulberry32(seed)
+    assert [rand() for _ in range(5)] == TS_MULBERRY32[seed]
+
+
+def test_self_check_vectors():
+    self_check()
+
+
+@pytest.mark.parametrize("date_string", sorted(TS_DAILY_INDEX))
+def test_daily_index(date_string):
+    countries, elements = TS_DAILY_INDEX[date_string]
+    assert daily_index("countries", list(range(197)), date_string) == countries
+    assert daily_index("elements", list(range(118)), date_string) == elements
+
+
+@pytest.mark.parametrize("date_string", sorted(TS_CONTINUUM))
+def test_continuum_round(date_string):
+    attribute, anchors, deal = continuum_round("synthetic", synthetic_deck(), ["mass", "size"], date_string)
+    expected_attribute, expected_anchors, expected_deal = TS_CONTINUUM[date_string]
+    assert attribute == expected_attribute
+    assert [e["id"] for e in anchors] == expected_anchors.split()
+    assert [e["id"] for e in deal] == expected_deal.split()
+
+
+@pytest.mark.parametrize("date_string", sorted(TS_CONTINUUM))
+def test_schedule_lookup(date_string):
+    payload = {"categories": {"synthetic": synthetic_deck()}}
+    schedule = build_schedule(payload, {"synthetic": ["mass", "size"]}, start=date_string, days=1)
+    day = lookup(schedule, date_string)["continuum"]["synthetic"]
+    expected_attribute, expected_anchors, expected_deal = TS_CONTINUUM[date_string]
+    assert day == {
+        "attribute": expected_attribute,
+        "anchors": expected_anchors.split(),
+        "deal": expected_deal.split(),
+    }
@@ -0,0 +1,72 @@
+"""Parity of pipeline/distances.py with haversineDistance() in src/utils/geo.ts."""
+
+import numpy as np
+import pytest
+
+from pipeline.distances import (
+    MISSING_KM,
+    UNKNOWN_DISTANCE_KM,
+    compute_distance,
+    distance_matrix,
+    haversine_distance,
+    verify_distance_matrix,
+)
+
+# (lat1, lon1, lat2, lon2, km) — haversineDistance() under Node
+GEO_TS_VECTORS = [
+    (51.5074, -0.1278, 48.8566, 2.3522, 344),
+    (40.7128, -74.006, -33.8688, 151.2093, 15989),
+    (0, 179.9, 0, -179.9, 22),
+    (90, 0, -90, 0, 20015),
+    (35.6762, 139.6503, 35.6762, 139.6503, 0),
+    (-34.6037, -58.3816, 55.7558, 37.6173, 13476),
+    (64.1466, -21.9426, -41.2865, 174.7762, 17255),
+    (1.3521, 103.8198, 1.2903, 103.8517, 8),
+    (0, 0, 0, 0.004496608, 0),
+    (12.5, -70, -12.5, 110, 20015),
+]
+
+
+def entities():
+    points = {(p[0], p[1]) for p in GEO_TS_VECTORS} | {(p[2], p[3]) for p in GEO_TS_VECTORS}
+    deck = [{"id": f"P{i:02d}", "Latitude": lat, "Longitude": lon} for i, (lat, lon) in enumerate(sorted(points))]
+    deck.append({"id": "NOCOORD", "Latitude": None, "Longitude": 12.0})
+    return deck
+
+
+@pytest.mark.parametrize("lat1, lon1, lat2, lon2, km", GEO_TS_VECTORS)
+def test_haversine_matches_geo_ts(lat1, lon1, lat2, lon2, km):
+    assert haversine_distance(lat1, lon1, lat2, lon2) == km
+
+
+@pytest.mark.parametrize("lat1, lon1, lat2, lon2, km", GEO_TS_VECTORS)
+def test_compute_distance_argument_order(lat1, lon1, lat2, lon2, km):
+    # computeDistance(target, guess) calls haversineDistance(guess, target)
+    guess = {"Latitude": lat1, "Longitude": lon1}
+    target = {"Latitude": lat2, "Longitude": lon2}
+    assert compute_distance(target, guess) == km
+
+
+def test_compute_distance_without_coordinates():
+    known = {"Latitude": 10.0, "Longitude": 20.0}
+    assert compute_distance(known, {"Latitude": None, "Longitude": 20.0}) == UNKNOWN_DISTANCE_KM
+    assert compute_distance({"Longitude": 20.0}, known) == UNKNOWN_DISTANCE_KM
+
+
+def test_matrix_matches_scalar_port():
+    deck = entities()
+    matrix = distance_matrix(deck)
+    assert matrix.dtype == np.dtype("<u2")
+    assert matrix.shape == (len(deck), len(deck))
+    assert verify_distance_matrix(deck, matrix) == []
+
+
+def test_matrix_layout_and_missing():
+    deck = entities()
+    matrix = distance_matrix(deck)
+    ids = {(e["Latitude"], e["Longitude"]): i for i, e in enumerate(deck)}
+    for lat1, lon1, lat2, lon2, km in GEO_TS_VECTORS:
+        # Row is the target (lat2), column the guess (lat1)
+        assert matrix[ids[(lat2, lon2)], ids[(lat1, lon1)]] == km
+    assert (matrix[-1, :] == MISSING_KM).all()
+    assert (matrix[:, -1] == MISSING_KM).all()
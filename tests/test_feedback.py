@@ -0,0 +1,284 @@
+"""Parity of pipeline/feedback.py with getFeedback() in src/utils/gameLogic.ts."""
+
+import math
+
+import numpy as np
+import pytest
+
+from pipeline.feedback import (
+    DIRECTION_NAMES,
+    STATUS_NAMES,
+    evaluate_category,
+    feedback_fields,
+    js_number,
+    js_string,
+    js_to_bool,
+)
+
+# Columns: id, is_flag, code, region, Latitude, Longitude, size, population,
+# population_cat, first_letter, tags. MISSING leaves the key out of the
+# entity, as fetch_data.py does for empty cells; -1 is the repo's "unknown"
+# sentinel and is compared as a number like any other value.
+MISSING = object()
+ROWS = [
+    ("E0", True, "AB", "Europe", 51.5074, -0.1278, 100, 10, "Small", 1, "a,b"),
+    ("E1", "yes", "ab", "europe", 48.8566, 2.3522, 125, 12, "small", 2, "A, b"),
+    ("E2", 0, "AB ", MISSING, 40.4168, -3.7038, 80, 30, "Large", 3, "a,a,b"),
+    ("E3", "1", MISSING, "", MISSING, 10.0, -1, -1, "Unknown", 4, ""),
+    ("E4", MISSING, "undefined", -1, -1, 36.8, MISSING, -1, MISSING, -1, MISSING),
+    ("E5", "No", 5, "-1", 51.5074, -0.1278, 0, MISSING, "Unknown", MISSING, "c"),
+    ("E6", 1, 5.0, "Asia", 35.6762, 139.6503, -100, 11, "Large", 26, "b,c,d"),
+    ("E7", False, True, "Asia", -1, MISSING, "125", 10.0, "Small", "x", "a,b,c"),
+]
+KEYS = [
+    "id", "is_flag", "code", "region", "Latitude", "Longitude",
+    "size", "population", "population_cat", "first_letter", "tags",
+]
+
+SCHEMA = [
+    {"attributeKey": "id", "logicType": "TARGET", "dataType": "STRING", "displayFormat": "HIDDEN"},
+    {"attributeKey": "is_flag", "logicType": "EXACT_MATCH", "dataType": "BOOLEAN", "displayFormat": "TEXT"},
+    {"attributeKey": "code", "logicType": "EXACT_MATCH", "dataType": "STRING", "displayFormat": "TEXT"},
+    {"attributeKey": "region", "logicType": "CATEGORY_MATCH", "dataType": "STRING", "displayFormat": "TEXT"},
+    {"attributeKey": "distance_km", "logicType": "GEO_DISTANCE", "dataType": "FLOAT", "displayFormat": "DISTANCE"},
+    {"attributeKey": "size", "logicType": "HIGHER_LOWER", "dataType": "INT", "displayFormat": "NUMBER"},
+    {
+        "attributeKey": "population", "logicType": "HIGHER_LOWER", "dataType": "INT",
+        "displayFormat": "PERCENTAGE_DIFF", "linkedCategoryCol": "population_cat",
+    },
+    {"attributeKey": "first_letter", "logicType": "HIGHER_LOWER", "dataType": "INT", "displayFormat": "ALPHA_POSITION"},
+    {"attributeKey": "tags", "logicType": "SET_INTERSECTION", "dataType": "STRING", "displayFormat": "TEXT"},
+    {"attributeKey": "population_cat", "logicType": "NONE", "dataType": "STRING", "displayFormat": "HIDDEN"},
+]
+
+# getFeedback(target, guess, SCHEMA) under Node, one row per target and one
+# cell per guess: status M/N/H/E (MISS/NEAR/HOT/EXACT) then direction
+# -/=/^/v (NONE/EQUAL/UP/DOWN).
+GAME_LOGIC_TS = {
+    "is_flag": [
+        "E- E- M- E- M- M- E- M-",
+        "E- E- M- E- M- M- E- M-",
+        "M- M- E- M- E- E- M- E-",
+        "E- E- M- E- M- M- E- M-",
+        "M- M- E- M- E- E- M- E-",
+        "M- M- E- M- E- E- M- E-",
+        "E- E- M- E- M- M- E- M-",
+        "M- M- E- M- E- E- M- E-",
+    ],
+    "code": [
+        "E- E- M- M- M- M- M- M-",
+        "E- E- M- M- M- M- M- M-",
+        "M- M- E- M- M- M- M- M-",
+        "M- M- M- E- E- M- M- M-",
+        "M- M- M- E- E- M- M- M-",
+        "M- M- M- M- M- E- E- M-",
+        "M- M- M- M- M- E- E- M-",
+        "M- M- M- M- M- M- M- E-",
+    ],
+    "region": [
+        "E- E- M- M- M- M- M- M-",
+        "E- E- M- M- M- M- M- M-",
+        "M- M- E- E- M- M- M- M-",
+        "M- M- E- E- M- M- M- M-",
+        "M- M- M- M- E- E- M- M-",
+        "M- M- M- M- E- E- M- M-",
+        "M- M- M- M- M- M- E- E-",
+        "M- M- M- M- M- M- E- E-",
+    ],
+    "distance_km": [
+        "E- H- N- M- M- E- M- M-",
+        "H- E- N- M- M- H- M- M-",
+        "N- N- E- M- M- N- M- M-",
+        "M- M- M- M- M- M- M- M-",
+        "M- M- M- M- E- M- M- M-",
+        "E- H- N- M- M- E- M- M-",
+        "M- M- M- M- M- M- E- M-",
+        "M- M- M- M- M- M- M- M-",
+    ],
+    "size": [
+        "E= Hv H^ M^ M- M^ H^ Hv",
+        "H^ E= M^ M^ M- M^ H^ E=",
+        "Hv Mv E= M^ M- M^ H^ Mv",
+        "Mv Mv Mv E= M- Hv M^ Mv",
+        "M- M- M- M- E- M- M- M-",
+        "Mv Mv Mv H^ M- E= M^ Mv",
+        "Hv Hv Hv Mv M- Mv E= Hv",
+        "H^ E= M^ M^ M- M^ H^ E=",
+    ],
+    "population": [
+        "E= Hv Mv M^ M^ M- Nv E=",
+        "H^ E= Mv M^ M^ M- N^ H^",
+        "M^ M^ E= M^ M^ M- H^ M^",
+        "Mv Mv Mv E= E= M- Mv Mv",
+        "Mv Mv Mv E= E= M- Mv Mv",
+        "M- M- M- M- M- E- M- M-",
+        "N^ Nv Hv M^ M^ M- E= N^",
+        "E= Hv Mv M^ M^ M- Nv E=",
+    ],
+    "first_letter": [
+        "E= Hv Nv Mv N^ M- Mv M-",
+        "H^ E= Hv Nv M^ M- Mv M-",
+        "N^ H^ E= Hv M^ M- Mv M-",
+        "M^ N^ H^ E= M^ M- Mv M-",
+        "Nv Mv Mv Mv E= M- Mv M-",
+        "M- M- M- M- M- E- M- E-",
+        "M^ M^ M^ M^ M^ M- E= M-",
+        "M- M- M- M- M- E- M- E-",
+    ],
+    "tags": [
+        "E- E- H- M- M- M- N- H-",
+        "E- E- H- M- M- M- N- H-",
+        "E- E- H- M- M- M- N- H-",
+        "M- M- M- M- M- M- M- M-",
+        "M- M- M- M- M- M- M- M-",
+        "M- M- M- M- M- E- N- N-",
+        "N- N- N- M- M- N- E- N-",
+        "H- H- E- M- M- N- N- E-",
+    ],
+}
+
+STATUS_CODES = {name[0]: name for name in STATUS_NAMES}
+DIRECTION_CODES = {"-": "NONE", "=": "EQUAL", "^": "UP", "v": "DOWN"}
+
+
+def deck():
+    return [{k: v for k, v in zip(KEYS, row) if v is not MISSING} for row in ROWS]
+
+
+@pytest.fixture(scope="module")
+def evaluated():
+    fields, status, direction = evaluate_category(deck(), SCHEMA)
+    return {f["attributeKey"]: (status[:, :, k], direction[:, :, k]) for k, f in enumerate(fields)}
+
+
+def feedback(evaluated, key, target, guess):
+    """(status, direction) names for one pair, as getFeedback() spells them."""
+    status, direction = evaluated[key]
+    return STATUS_NAMES[status[target, guess]], DIRECTION_NAMES[direction[target, guess]]
+
+
+def expected(key, target, guess):
+    cell = GAME_LOGIC_TS[key][target].split()[guess]
+    return STATUS_CODES[cell[0]], DIRECTION_CODES[cell[1]]
+
+
+def test_fields_follow_get_feedback():
+    # TARGET and NONE columns get no feedback; the rest keep schema order
+    assert [f["attributeKey"] for f in feedback_fields(SCHEMA)] == list(GAME_LOGIC_TS)
+
+
+@pytest.mark.parametrize("key", list(GAME_LOGIC_TS))
+def test_matrix_matches_game_logic_ts(evaluated, key):
+    n = len(ROWS)
+    got = [[feedback(evaluated, key, t, g) for g in range(n)] for t in range(n)]
+    want = [[expected(key, t, g) for g in range(n)] for t in range(n)]
+    assert got == want
+
+
+def test_output_dtypes():
+    fields, status, direction = evaluate_category(deck(), SCHEMA)
+    assert status.shape == direction.shape == (len(ROWS), len(ROWS), len(fields))
+    assert status.dtype == direction.dtype == np.uint8
+
+
+def test_exact_match_edge_cases(evaluated):
+    # BOOLEAN: "yes"/"1"/1 are true; a missing value and "No" are false
+    assert feedback(evaluated, "is_flag", 0, 3) == ("EXACT", "NONE")
+    assert feedback(evaluated, "is_flag", 4, 5) == ("EXACT", "NONE")
+    # STRING: case-insensitive but not trimmed; 5 and 5.0 both read "5";
+    # a missing value is String(undefined) and equals the text "undefined"
+    assert feedback(evaluated, "code", 0, 1) == ("EXACT", "NONE")
+    assert feedback(evaluated, "code", 0, 2) == ("MISS", "NONE")
+    assert feedback(evaluated, "code", 5, 6) == ("EXACT", "NONE")
+    assert feedback(evaluated, "code", 3, 4) == ("EXACT", "NONE")
+
+
+def test_category_match_edge_cases(evaluated):
+    # A missing value reads as '' (String(v ?? '')); -1 equals the text "-1"
+    assert feedback(evaluated, "region", 2, 3) == ("EXACT", "NONE")
+    assert feedback(evaluated, "region", 4, 5) == ("EXACT", "NONE")
+    assert feedback(evaluated, "region", 3, 4) == ("MISS", "NONE")
+
+
+def test_higher_lower_missing_values(evaluated):
+    # Missing on one side: MISS with no arrow; missing on both: EXACT
+    assert feedback(evaluated, "size", 0, 4) == ("MISS", "NONE")
+    assert feedback(evaluated, "size", 4, 0) == ("MISS", "NONE")
+    assert feedback(evaluated, "size", 4, 4) == ("EXACT", "NONE")
+    # Number("x") is NaN as well, so it matches a missing value
+    assert feedback(evaluated, "first_letter", 5, 7) == ("EXACT", "NONE")
+
+
+def test_higher_lower_minus_one(evaluated):
+    # -1 is a number: it gets an arrow and compares by magnitude
+    assert feedback(evaluated, "size", 0, 3) == ("MISS", "UP")
+    assert feedback(evaluated, "size", 3, 5) == ("HOT", "DOWN")
+    assert feedback(evaluated, "first_letter", 0, 4) == ("NEAR", "UP")
+    # Both -1 with different linked categories is still EXACT
+    assert feedback(evaluated, "population", 3, 4) == ("EXACT", "EQUAL")
+
+
+def test_higher_lower_ratio_edges(evaluated):
+    # 125 vs 100 and 80 vs 100 are exactly 25% apart: within range → HOT
+    assert feedback(evaluated, "size", 0, 1) == ("HOT", "DOWN")
+    assert feedback(evaluated, "size", 0, 2) == ("HOT", "UP")
+    # The ratio uses magnitudes, so -100 is "within 25%" of 100
+    assert feedback(evaluated, "size", 0, 6) == ("HOT", "UP")
+    # A numeric string compares as its number
+    assert feedback(evaluated, "size", 1, 7) == ("EXACT", "EQUAL")
+
+
+def test_higher_lower_linked_category(evaluated):
+    # Linked categories decide HOT (case-insensitive), within 25% otherwise NEAR
+    assert feedback(evaluated, "population", 0, 1) == ("HOT", "DOWN")
+    assert feedback(evaluated, "population", 0, 6) == ("NEAR", "DOWN")
+    assert feedback(evaluated, "population", 2, 6) == ("HOT", "UP")
+    assert feedback(evaluated, "population", 0, 7) == ("EXACT", "EQUAL")
+
+
+def test_geo_distance_without_coordinates(evaluated):
+    # computeDistance() returns 99999 when any coordinate is missing, even
+    # when the target is compared with itself; -1 is a real latitude
+    assert feedback(evaluated, "distance_km", 3, 3) == ("MISS", "NONE")
+    assert feedback(evaluated, "distance_km", 7, 7) == ("MISS", "NONE")
+    assert feedback(evaluated, "distance_km", 4, 4) == ("EXACT", "NONE")
+    assert feedback(evaluated, "distance_km", 0, 5) == ("EXACT", "NONE")
+
+
+def test_set_intersection_edge_cases(evaluated):
+    # Duplicate guess items all count as matched, so the ratio passes 1
+    assert feedback(evaluated, "tags", 0, 2) == ("HOT", "NONE")
+    assert feedback(evaluated, "tags", 2, 0) == ("EXACT", "NONE")
+    # Empty and missing sets never match, not even each other
+    assert feedback(evaluated, "tags", 3, 4) == ("MISS", "NONE")
+    assert feedback(evaluated, "tags", 3, 3) == ("MISS", "NONE")
+
+
+@pytest.mark.parametrize(
+    "value, string, number",
+    [
+        (None, "undefined", math.nan),
+        (-1, "-1", -1.0),
+        (5.0, "5", 5.0),
+        (2.5, "2.5", 2.5),
+        (True, "true", 1.0),
+        ("", "", 0.0),
+        ("  ", "  ", 0.0),
+        (" 12 ", " 12 ", 12.0),
+        ("-1", "-1", -1.0),
+        ("1e3", "1e3", 1000.0),
+        ("12abc", "12abc", math.nan),
+    ],
+)
+def test_js_coercions(value, string, number):
+    assert js_string(value) == string
+    got = js_number(value)
+    assert (math.isnan(got) and math.isnan(number)) or got == number
+
+
+@pytest.mark.parametrize(
+    "value, flag",
+    [(None, False), (0, False), (-1, True), ("Yes", True), (" TRUE ", True), ("1", True), ("0", False), ("no", False)],
+)
+def test_js_to_bool(value, flag):
+    assert js_to_bool(value) is flag
@@ -0,0 +1,48 @@
+"""Area check of pipeline/world_map.py on the bundled world-atlas topology."""
+
+import json
+
+import numpy as np
+import pytest
+
+from pipeline import world_map
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    with open(world_map.TOPOLOGY_FILE, "r", encoding="utf-8") as f:
+        source = json.load(f)
+    with open(world_map.GAME_DATA_FILE, "r", encoding="utf-8") as f:
+        entities = json.load(f)["categories"][world_map.MAP_CATEGORY]
+    m49_to_iso3 = world_map.load_m49_to_iso3()
+    areas = world_map.source_areas(source, m49_to_iso3, {e["id"] for e in entities})
+    return source, entities, m49_to_iso3, areas
+
+
+def build(inputs, tolerance):
+    source, entities, m49_to_iso3, areas = inputs
+    world = world_map.build_world_map(source, entities, m49_to_iso3, tolerance)
+    return world, sum(len(a) for a in source["arcs"]), areas
+
+
+def test_defaults_keep_every_area(inputs):
+    world, source_points, areas = build(inputs, world_map.DEFAULT_TOLERANCE)
+    assert world_map.verify_world_map(world, source_points, areas) == []
+    changes = world_map.area_changes(world, areas)
+    assert max(changes.values()) <= world_map.MAX_AREA_CHANGE
+    assert changes["LUX"] > changes["FRA"]
+
+
+def test_looser_tolerance_fails_on_small_states(inputs):
+    world, source_points, areas = build(inputs, 0.05)
+    problems = world_map.verify_world_map(world, source_points, areas)
+    assert any(p.startswith("CYP: area changed") for p in problems)
+
+
+def test_country_area_subtracts_holes():
+    arcs = [
+        np.array([[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]], dtype=float),
+        np.array([[1, 1], [1, 2], [2, 2], [2, 1], [1, 1]], dtype=float),
+    ]
+    assert world_map.country_area(arcs, {"type": "Polygon", "arcs": [[0], [1]]}) == 15
+    assert world_map.country_area(arcs, {"type": "MultiPolygon", "arcs": [[[0]], [[1]]]}) == 17